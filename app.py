@@ -1,35 +1,88 @@
 import asyncio
-import logging
+import sys
 
-from aiogram import Bot, Dispatcher
+from aiogram import Bot
 from aiogram.enums import ParseMode
-from aiogram.fsm.storage.memory import MemoryStorage
 
 from app.config import load_settings
-from app.features.admin.handlers import router as admin_router, setup_handlers as setup_admin_handlers
-from app.features.user.handlers import router as navigation_router, setup_handlers
+from app.dispatcher import build_dispatcher
+from app.services.archiving import run_archiver
+from app.services.backup import run_backups
+from app.services.blocking import setup_blocking_io
 from app.services.db import init_db
+from app.services.logs import setup_logging
+from app.services.scheduler import run_scheduler
+from app.services.sweeper import run_sweeper
 
 
 async def main() -> None:
-    logging.basicConfig(
-        level=logging.INFO,
-        format="%(asctime)s %(levelname)s [%(name)s] %(message)s",
-    )
     settings = load_settings()
+    setup_logging(settings)
+    setup_blocking_io(settings)
     await init_db(settings.db_path)
 
     bot = Bot(token=settings.bot_token, parse_mode=ParseMode.HTML)
-    setup_handlers(settings)
-    setup_admin_handlers(settings)
+    # Runs once per deployment, next to the poller, whatever the number of workers.
+    scheduler = asyncio.create_task(run_scheduler(bot, settings))
+    sweeper = asyncio.create_task(run_sweeper(settings))
+    archiver = asyncio.create_task(run_archiver(settings))
+    backups = asyncio.create_task(run_backups(settings))
+    try:
+        if settings.workers > 1:
+            from app.services.sharding import run_sharded
 
-    storage = MemoryStorage()
-    dp = Dispatcher(storage=storage)
-    dp.include_router(admin_router)
-    dp.include_router(navigation_router)
+            await run_sharded(settings)
+            return
 
-    await dp.start_polling(bot)
+        dp = build_dispatcher(settings)
+        await dp.start_polling(bot)
+    finally:
+        scheduler.cancel()
+        sweeper.cancel()
+        archiver.cancel()
+        backups.cancel()
+
+
+async def rebuild_daily_sales() -> int:
+    from app.services import db
+
+    settings = load_settings()
+    await init_db(settings.db_path)
+    return await db.rebuild_daily_sales(settings.db_path)
+
+
+async def migrate_offline() -> list[int]:
+    from app.services.migrations import migrate
+
+    settings = load_settings()
+    settings.db_path.parent.mkdir(parents=True, exist_ok=True)
+    return await migrate(settings.db_path, offline=True)
+
+
+async def archive_now() -> dict[str, int]:
+    import datetime as dt
+
+    from app.services.archiving import archive
+
+    settings = load_settings()
+    await init_db(settings.db_path)
+    return await archive(settings.db_path, settings.archive_db_path, dt.timedelta(days=settings.archive_after_days))
 
 
 if __name__ == "__main__":
+    if "--rebuild-daily-sales" in sys.argv:
+        print(f"daily_sales: {asyncio.run(rebuild_daily_sales())} days")
+        sys.exit(0)
+    if "--migrate" in sys.argv:
+        print(f"migrations applied: {asyncio.run(migrate_offline()) or 'none'}")
+        sys.exit(0)
+    if "--archive" in sys.argv:
+        moved = asyncio.run(archive_now())
+        print(", ".join(f"{table}: {count}" for table, count in moved.items()))
+        sys.exit(0)
+    if "--profile-startup" in sys.argv:
+        from app.services.startup import profile_startup
+
+        print(profile_startup())
+        sys.exit(0)
     asyncio.run(main())
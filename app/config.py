@@ -55,6 +55,25 @@ class Settings(BaseSettings):
     pricing_path: Path = Field(Path("data/pricing.json"), alias="PRICING_PATH")
     photo_after_review_dir: Path = Field(Path("data/photo-after-review"), alias="PHOTO_AFTER_REVIEW_DIR")
     admin_ids: List[int] = Field(default_factory=list, alias="ADMIN_IDS")
+    workers: int = Field(1, alias="WORKERS", ge=1)
+    log_format: str = Field("json", alias="LOG_FORMAT", pattern="^(json|text)$")
+    log_level: str = Field("INFO", alias="LOG_LEVEL")
+    log_queue_size: int = Field(10000, alias="LOG_QUEUE_SIZE", ge=1)
+    blocking_io_threads: int = Field(4, alias="BLOCKING_IO_THREADS", ge=1)
+    slow_callback_ms: int = Field(0, alias="SLOW_CALLBACK_MS", ge=0)
+    image_optimization: bool = Field(True, alias="IMAGE_OPTIMIZATION")
+    image_quality: int = Field(82, alias="IMAGE_QUALITY", ge=1, le=100)
+    image_max_dimension: int = Field(2560, alias="IMAGE_MAX_DIMENSION", ge=1)
+    image_workers: int = Field(1, alias="IMAGE_WORKERS", ge=1)
+    schedule_timezone: str = Field("Europe/Moscow", alias="SCHEDULE_TIMEZONE")
+    broadcast_spread_minutes: int = Field(60, alias="BROADCAST_SPREAD_MINUTES", ge=0)
+    order_ttl_hours: int = Field(24, alias="ORDER_TTL_HOURS", ge=1)
+    sweep_interval_minutes: int = Field(10, alias="SWEEP_INTERVAL_MINUTES", ge=1)
+    archive_db_path: Path = Field(Path("data/archive.sqlite3"), alias="ARCHIVE_DB_PATH")
+    archive_after_days: int = Field(180, alias="ARCHIVE_AFTER_DAYS", ge=0)
+    backup_dir: Path = Field(Path("data/backups"), alias="BACKUP_DIR")
+    backup_interval_hours: int = Field(6, alias="BACKUP_INTERVAL_HOURS", ge=0)
+    backup_keep: int = Field(7, alias="BACKUP_KEEP", ge=1)
 
     model_config = SettingsConfigDict(
         env_file=".env",
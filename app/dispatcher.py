@@ -0,0 +1,23 @@
+from aiogram import Dispatcher
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from app.config import Settings
+from app.features.admin.handlers import router as admin_router, setup_handlers as setup_admin_handlers
+from app.features.user.handlers import router as navigation_router, setup_handlers
+from app.services import events
+from app.services.reachability import setup_reachability
+
+
+def build_dispatcher(settings: Settings) -> Dispatcher:
+    setup_handlers(settings)
+    setup_admin_handlers(settings)
+    setup_reachability(settings.db_path)
+    events.setup_events(settings.db_path)
+
+    storage = MemoryStorage()
+    dp = Dispatcher(storage=storage)
+    dp.update.outer_middleware(events.FunnelMiddleware())
+    dp.shutdown.register(events.flush)
+    dp.include_router(admin_router)
+    dp.include_router(navigation_router)
+    return dp
@@ -1,4 +1,6 @@
 import asyncio
+import logging
+from typing import Optional
 
 from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
@@ -14,37 +16,104 @@ from app.features.admin.keyboards import (
     build_admin_signs_keyboard,
     build_admin_type_keyboard,
 )
+from app.features.admin.media_groups import MediaGroupCollector
 from app.features.admin.states import AdminUpload
-from app.features.admin.utils import destination_path, detect_extension, save_media
-from app.services import media
+from app.features.admin.utils import detect_extension, incoming_path, save_media
+from app.services import blobstore, images, media, media_io
+from app.services.blocking import run_blocking
+
+logger = logging.getLogger(__name__)
 
 router = Router()
-_MEDIA_GROUP_TASKS: dict[tuple[int, int, str], asyncio.Task] = {}
+_albums = MediaGroupCollector(delay=1.0)
+
+
+async def _store_uploads(
+    messages: list[Message],
+    kind: str,
+    year: str,
+    month: str | None,
+    sign: str,
+) -> Optional[tuple[blobstore.IngestResult, list[images.ImageOptimization]]]:
+    """
+    Downloads all files concurrently into `.incoming/` and ingests them into the
+    product with a single manifest write. If any download fails nothing is
+    published and None is returned; the same if the media directory can't be written.
+    """
+    settings = get_settings(messages[0].bot)
+    uploads = [
+        await run_blocking(
+            incoming_path,
+            settings.media_dir,
+            detect_extension(message),
+            unique=str(message.message_id),
+        )
+        for message in messages
+    ]
+    saved = await asyncio.gather(*(save_media(message, upload) for message, upload in zip(messages, uploads)))
+    if not all(saved):
+        for upload in uploads:
+            await run_blocking(upload.unlink, missing_ok=True)
+        return None
+    optimizations = await asyncio.gather(*(images.optimize_upload(upload, settings) for upload in uploads))
+    try:
+        ingested = await run_blocking(
+            blobstore.ingest,
+            settings.media_dir,
+            media.product_dir(settings.media_dir, kind, year, sign, month),
+            [blobstore.IngestItem(upload, original=media.original_path(upload)) for upload in uploads],
+        )
+    except OSError:
+        logger.exception("Failed to store uploads kind=%s year=%s month=%s sign=%s", kind, year, month, sign)
+        for upload in uploads:
+            await run_blocking(upload.unlink, missing_ok=True)
+            await run_blocking(media.original_path(upload).unlink, missing_ok=True)
+        return None
+    await media_io.invalidate_catalog(settings.media_dir)
+    return ingested, [optimization for optimization in optimizations if optimization]
 
 
-def _media_group_key(message: Message) -> tuple[int, int, str]:
-    return (message.chat.id, message.from_user.id, message.media_group_id or "")
+def _savings_text(optimizations: list[images.ImageOptimization]) -> str:
+    return texts.admin_image_savings(
+        sum(item.original_bytes for item in optimizations),
+        sum(item.optimized_bytes for item in optimizations),
+    )
 
 
-async def _finish_media_group(
-    message: Message,
+async def _finish_album(
+    messages: list[Message],
     state: FSMContext,
     kind: str,
     year: str,
     month: str | None,
     sign: str,
 ) -> None:
+    message = messages[0]
     try:
-        await asyncio.sleep(1.0)
-        await state.clear()
-        if kind == "year":
-            await message.bot.send_message(message.chat.id, texts.admin_upload_finished_year(year, sign))
-        else:
-            await message.bot.send_message(message.chat.id, texts.admin_upload_finished_month(year, month or "01", sign))
-        await message.bot.send_message(message.chat.id, texts.admin_menu(), reply_markup=build_admin_menu())
-    except asyncio.CancelledError:
+        stored = await _store_uploads(messages, kind, year, month, sign)
+    except Exception:
+        # Runs outside the update handler, so nothing else would tell the admin.
+        logger.exception("Album upload failed items=%s", len(messages))
+        await message.answer(texts.admin_save_failed())
+        return
+    if stored is None:
+        # Like a failed single file: the state stays on the upload step so the album can be resent.
+        await message.answer(texts.admin_album_save_failed(len(messages)))
         return
-    _MEDIA_GROUP_TASKS.pop(_media_group_key(message), None)
+    await state.clear()
+    ingested, optimizations = stored
+    if kind == "year":
+        lines = [texts.admin_upload_finished_year(year, sign)]
+    else:
+        lines = [texts.admin_upload_finished_month(year, month or "01", sign)]
+    lines.append(texts.admin_album_saved(len(ingested.added)))
+    if ingested.duplicates:
+        lines.append(texts.admin_upload_duplicates(ingested.duplicates))
+    if optimizations:
+        lines.append(_savings_text(optimizations))
+    lines.append(texts.admin_menu())
+    await message.answer("\n\n".join(lines), reply_markup=build_admin_menu())
+
 
 @router.callback_query(F.data == ADMIN_ADD_FORECAST_CALLBACK)
 async def handle_admin_add(callback: CallbackQuery, state: FSMContext):
@@ -178,7 +247,6 @@ async def handle_admin_file(message: Message, state: FSMContext):
     year = data.get("year")
     month = data.get("month")
     sign = data.get("sign")
-    settings = get_settings(message.bot)
     if kind not in {"year", "month"} or not year or not sign:
         await state.clear()
         await message.answer(texts.admin_session_reset())
@@ -187,31 +255,24 @@ async def handle_admin_file(message: Message, state: FSMContext):
         await state.clear()
         await message.answer(texts.admin_session_reset())
         return
-    destination = destination_path(
-        kind,
-        settings.media_dir,
-        year,
-        sign,
-        extension,
-        month,
-        unique=str(message.message_id),
-    )
-    success = await save_media(message, destination)
-    if not success:
-        await message.answer(texts.admin_save_failed())
-        return
     if message.media_group_id:
-        key = _media_group_key(message)
-        existing_task = _MEDIA_GROUP_TASKS.get(key)
-        if existing_task:
-            existing_task.cancel()
-        _MEDIA_GROUP_TASKS[key] = asyncio.create_task(
-            _finish_media_group(message, state, kind, year, month, sign)
+        _albums.add(
+            message,
+            lambda messages: _finish_album(messages, state, kind, year, month, sign),
         )
         return
+    stored = await _store_uploads([message], kind, year, month, sign)
+    if stored is None:
+        await message.answer(texts.admin_save_failed())
+        return
+    ingested, optimizations = stored
     await state.clear()
-    if kind == "year":
+    if ingested.duplicates:
+        await message.answer(texts.admin_upload_duplicates(ingested.duplicates))
+    elif kind == "year":
         await message.answer(texts.admin_save_success_year(year, sign))
     else:
         await message.answer(texts.admin_save_success_month(year, month, sign))
+    if optimizations and not ingested.duplicates:
+        await message.answer(_savings_text(optimizations))
     await message.answer(texts.admin_menu(), reply_markup=build_admin_menu())
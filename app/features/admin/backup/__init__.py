@@ -0,0 +1,64 @@
+import datetime as dt
+import logging
+
+import aiosqlite
+from aiogram import Router
+from aiogram.filters import Command, CommandObject
+from aiogram.fsm.context import FSMContext
+from aiogram.types import Message
+
+from app import texts
+from app.features.admin.dependencies import get_settings, is_admin
+from app.features.admin.utils import format_dt
+from app.services import backup
+from app.services.blocking import run_blocking
+
+logger = logging.getLogger(__name__)
+
+router = Router()
+
+
+async def _answer_status(message: Message, backup_dir) -> None:
+    snapshots = await run_blocking(backup.list_snapshots, backup_dir)
+    if not snapshots:
+        await message.answer(texts.admin_backup_status(None, 0, 0, 0))
+        return
+    last = snapshots[0]
+    age = dt.datetime.utcnow() - last.created_at
+    await message.answer(
+        texts.admin_backup_status(
+            format_dt(last.created_at.isoformat()),
+            max(0, int(age.total_seconds()) // 60),
+            max(1, last.size // 1024),
+            len(snapshots),
+        )
+    )
+
+
+@router.message(Command("backup"))
+async def handle_backup_command(message: Message, state: FSMContext, command: CommandObject):
+    if not is_admin(message.bot, message.from_user.id):
+        await state.clear()
+        await message.answer(texts.admin_forbidden())
+        return
+    await state.clear()
+    settings = get_settings(message.bot)
+    if (command.args or "").strip().lower() == "status":
+        await _answer_status(message, settings.backup_dir)
+        return
+    await message.answer(texts.admin_backup_running())
+    try:
+        snapshot = await backup.create_backup(settings.db_path, settings.backup_dir, keep=settings.backup_keep)
+    except (backup.BackupError, aiosqlite.Error, OSError):
+        logger.exception("Backup from admin command failed user_id=%s", message.from_user.id)
+        last = await backup.last_success(settings.backup_dir)
+        await message.answer(texts.admin_backup_failed(format_dt(last.created_at.isoformat()) if last else None))
+        return
+    snapshots = await run_blocking(backup.list_snapshots, settings.backup_dir)
+    await message.answer(
+        texts.admin_backup_done(
+            format_dt(snapshot.created_at.isoformat()),
+            max(1, snapshot.size // 1024),
+            len(snapshots),
+        )
+    )
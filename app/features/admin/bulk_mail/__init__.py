@@ -1,10 +1,9 @@
 import asyncio
+import datetime as dt
 import logging
-import secrets
-import time
+from zoneinfo import ZoneInfo
 
 from aiogram import F, Router
-from aiogram.exceptions import TelegramForbiddenError
 from aiogram.fsm.context import FSMContext
 from aiogram.types import CallbackQuery, Message
 
@@ -21,28 +20,27 @@ from app.features.admin.keyboards import (
     ADMIN_BROADCAST_STATS_PREFIX,
     ADMIN_BROADCAST_RESPONSES_PREFIX,
     ADMIN_BROADCAST_RESPONSES_ITEM_PREFIX,
+    ADMIN_BROADCAST_SEGMENT_PREFIX,
+    ADMIN_BROADCAST_SCHEDULE_PREFIX,
+    ADMIN_BROADCAST_SCHEDULE_SEGMENT_PREFIX,
+    ADMIN_BROADCAST_UNSCHEDULE_PREFIX,
     build_broadcast_body_keyboard,
     build_broadcast_item_menu_keyboard,
     build_broadcast_responses_list_keyboard,
+    build_broadcast_schedule_keyboard,
     build_broadcast_response_detail_keyboard,
+    build_broadcast_segments_keyboard,
     build_broadcast_stats_keyboard,
     build_broadcasts_list_keyboard,
     build_broadcasts_menu_keyboard,
 )
-from app.features.admin.states import AdminBroadcastCreate
-from app.services import db
-from app.services.messaging import send_with_retry
+from app.features.admin.states import AdminBroadcastCreate, AdminBroadcastSchedule
+from app.services import broadcasts, callback_tokens, db, reachability, scheduler, segments
 
 logger = logging.getLogger(__name__)
 
 router = Router()
 
-DEFAULT_BROADCAST_DELAY_SECONDS = 0.5
-
-_campaign_token_map: dict[str, str] = {}
-_campaign_token_reverse: dict[str, str] = {}
-_response_token_map: dict[str, tuple[str, str]] = {}
-
 
 def _ensure_admin(callback_or_message) -> bool:
     bot = callback_or_message.bot
@@ -64,9 +62,10 @@ async def handle_broadcasts_menu(callback: CallbackQuery, state: FSMContext):
     await state.clear()
     await callback.answer()
     db_path = get_settings(callback.bot).db_path
-    audience_size = len(await db.fetch_paid_user_ids(db_path))
+    audience_size = await db.count_segment(db_path, segments.Segment())
+    unreachable, due = await reachability.counts(db_path)
     await callback.message.answer(
-        texts.admin_broadcasts_menu(audience_size),
+        texts.admin_broadcasts_menu(audience_size, unreachable, due),
         reply_markup=build_broadcasts_menu_keyboard(),
     )
 
@@ -74,72 +73,35 @@ async def handle_broadcasts_menu(callback: CallbackQuery, state: FSMContext):
 RESPONSES_PAGE_SIZE = 5
 
 
-def _get_campaign_token(campaign_id: str) -> str:
-    existing = _campaign_token_reverse.get(campaign_id)
-    if existing:
-        return existing
-    token = secrets.token_hex(4)
-    _campaign_token_map[token] = campaign_id
-    _campaign_token_reverse[campaign_id] = token
-    return token
-
-
-def _resolve_campaign_token(token: str) -> str:
-    return _campaign_token_map.get(token, "")
-
-
-def _register_response_token(campaign_id: str, response_id: str) -> str:
-    token = response_id[:8]
-    if token in _response_token_map and _response_token_map[token] != (campaign_id, response_id):
-        token = secrets.token_hex(4)
-    _response_token_map[token] = (campaign_id, response_id)
-    return token
-
-
-def _resolve_response_token(token: str) -> tuple[str, str]:
-    return _response_token_map.get(token, ("", ""))
-
-
-
-
-def _parse_responses_list_payload(data: str) -> tuple[str, str, int]:
+def _parse_responses_list_payload(data: str) -> tuple[str, int]:
     if not data or not data.startswith(f"{ADMIN_BROADCAST_RESPONSES_PREFIX}:"):
-        return "", "", 1
-    suffix = data[len(ADMIN_BROADCAST_RESPONSES_PREFIX) + 1 :]
-    if not suffix:
-        return "", "", 1
-    parts = suffix.split(":")
+        return "", 1
+    parts = data[len(ADMIN_BROADCAST_RESPONSES_PREFIX) + 1 :].split(":")
     page = 1
     if len(parts) > 1:
         try:
             page = int(parts[1])
         except ValueError:
             page = 1
-    key = parts[0]
-    if key in _campaign_token_map:
-        campaign_token = key
-        campaign_id = _campaign_token_map[key]
-        return campaign_id, campaign_token, max(1, page)
-    campaign_id = key
-    campaign_token = _get_campaign_token(campaign_id)
-    return campaign_id, campaign_token, max(1, page)
+    return parts[0], max(1, page)
 
 
 def _parse_response_detail_payload(data: str) -> tuple[str, int, str]:
     if not data or not data.startswith(f"{ADMIN_BROADCAST_RESPONSES_ITEM_PREFIX}:"):
         return "", 1, ""
-    suffix = data[len(ADMIN_BROADCAST_RESPONSES_ITEM_PREFIX) + 1 :]
-    parts = suffix.split(":")
+    parts = data[len(ADMIN_BROADCAST_RESPONSES_ITEM_PREFIX) + 1 :].split(":")
     if len(parts) < 3:
         return "", 1, ""
-    campaign_token = parts[0]
     try:
         page = int(parts[1])
     except ValueError:
         page = 1
-    response_token = parts[2]
-    campaign_id = _resolve_campaign_token(campaign_token)
-    return campaign_id, max(1, page), response_token
+    return parts[0], max(1, page), parts[2]
+
+
+async def _campaign_id_from_callback(callback: CallbackQuery) -> str:
+    token = (callback.data or "").rsplit(":", 1)[-1]
+    return await callback_tokens.decode(get_settings(callback.bot).db_path, token) or ""
 
 
 @router.callback_query(F.data == ADMIN_BROADCAST_LIST_CALLBACK)
@@ -165,7 +127,10 @@ async def handle_broadcasts_list(callback: CallbackQuery, state: FSMContext):
     await callback.message.answer(
         texts.admin_broadcasts_list_title(),
         reply_markup=build_broadcasts_list_keyboard(
-            [(_format_campaign_button_text(item), item["id"]) for item in campaigns],
+            [
+                (_format_campaign_button_text(item), await callback_tokens.encode(db_path, item["id"]))
+                for item in campaigns
+            ],
             prefix=ADMIN_BROADCAST_ITEM_PREFIX,
         ),
     )
@@ -181,7 +146,7 @@ async def handle_broadcast_item_select(callback: CallbackQuery, state: FSMContex
 
     await state.clear()
     await callback.answer()
-    campaign_id = (callback.data or "").rsplit(":", 1)[-1]
+    campaign_id = await _campaign_id_from_callback(callback)
     db_path = get_settings(callback.bot).db_path
 
     campaign = await db.get_campaign(db_path, campaign_id)
@@ -191,7 +156,7 @@ async def handle_broadcast_item_select(callback: CallbackQuery, state: FSMContex
 
     await callback.message.answer(
         texts.admin_broadcast_item_detail(campaign["title"]),
-        reply_markup=build_broadcast_item_menu_keyboard(campaign_id),
+        reply_markup=build_broadcast_item_menu_keyboard(await callback_tokens.encode(db_path, campaign_id)),
     )
 
 
@@ -202,7 +167,7 @@ async def handle_broadcast_body(callback: CallbackQuery, state: FSMContext):
         return
 
     await state.clear()
-    campaign_id = (callback.data or "").split(":", maxsplit=3)[-1]
+    campaign_id = await _campaign_id_from_callback(callback)
     db_path = get_settings(callback.bot).db_path
 
     campaign = await db.get_campaign(db_path, campaign_id)
@@ -213,7 +178,7 @@ async def handle_broadcast_body(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
     await callback.message.answer(
         texts.admin_broadcast_body_detail(campaign["title"], campaign["body"]),
-        reply_markup=build_broadcast_body_keyboard(campaign_id),
+        reply_markup=build_broadcast_body_keyboard(await callback_tokens.encode(db_path, campaign_id)),
     )
 
 
@@ -224,7 +189,7 @@ async def handle_broadcast_stats(callback: CallbackQuery, state: FSMContext):
         return
 
     await state.clear()
-    campaign_id = (callback.data or "").split(":", maxsplit=3)[-1]
+    campaign_id = await _campaign_id_from_callback(callback)
     db_path = get_settings(callback.bot).db_path
 
     campaign = await db.get_campaign(db_path, campaign_id)
@@ -232,7 +197,11 @@ async def handle_broadcast_stats(callback: CallbackQuery, state: FSMContext):
         await callback.answer("Рассылка не найдена", show_alert=True)
         return
 
-    stats = await db.fetch_campaign_audience_stats(db_path, campaign_id)
+    stats = await db.fetch_campaign_audience_stats(
+        db_path,
+        campaign_id,
+        archive_path=get_settings(callback.bot).archive_db_path,
+    )
     delivered = sum(stats.get(key, 0) for key in ("sent", "interested", "declined"))
     total = sum(stats.values())
     not_delivered = max(0, total - delivered)
@@ -244,7 +213,7 @@ async def handle_broadcast_stats(callback: CallbackQuery, state: FSMContext):
             delivered,
             not_delivered,
         ),
-        reply_markup=build_broadcast_stats_keyboard(campaign_id),
+        reply_markup=build_broadcast_stats_keyboard(await callback_tokens.encode(db_path, campaign_id)),
     )
 
 
@@ -256,7 +225,7 @@ async def handle_broadcast_delete(callback: CallbackQuery, state: FSMContext):
 
     await state.clear()
     await callback.answer()
-    campaign_id = (callback.data or "").split(":", maxsplit=3)[-1]
+    campaign_id = await _campaign_id_from_callback(callback)
     db_path = get_settings(callback.bot).db_path
 
     campaign = await db.get_campaign(db_path, campaign_id)
@@ -333,7 +302,7 @@ async def handle_broadcast_launch(callback: CallbackQuery, state: FSMContext):
         return
 
     await state.clear()
-    campaign_id = (callback.data or "").split(":", maxsplit=3)[-1]
+    campaign_id = await _campaign_id_from_callback(callback)
     db_path = get_settings(callback.bot).db_path
 
     campaign = await db.get_campaign(db_path, campaign_id)
@@ -341,151 +310,225 @@ async def handle_broadcast_launch(callback: CallbackQuery, state: FSMContext):
         await callback.answer("Рассылка не найдена", show_alert=True)
         return
 
-    already_launched = await db.campaign_has_audience(db_path, campaign_id)
+    counts = {name: await db.count_segment(db_path, segments.preset(name)) for name in segments.PRESETS}
+    await callback.answer()
+    await callback.message.answer(
+        texts.admin_broadcast_choose_segment(campaign["title"]),
+        reply_markup=build_broadcast_segments_keyboard(await callback_tokens.encode(db_path, campaign_id), counts),
+    )
 
-    audience = await db.fetch_paid_user_ids(db_path)
-    if not audience:
+
+@router.callback_query(F.data.startswith(f"{ADMIN_BROADCAST_SEGMENT_PREFIX}:"))
+async def handle_broadcast_segment(callback: CallbackQuery, state: FSMContext):
+    if not _ensure_admin(callback):
+        await callback.answer(texts.admin_forbidden(), show_alert=True)
+        return
+
+    await state.clear()
+    parts = (callback.data or "")[len(ADMIN_BROADCAST_SEGMENT_PREFIX) + 1 :].split(":")
+    segment = segments.preset(parts[0]) if len(parts) == 2 else None
+    campaign_id = await _campaign_id_from_callback(callback)
+    db_path = get_settings(callback.bot).db_path
+
+    campaign = await db.get_campaign(db_path, campaign_id)
+    if not campaign or segment is None:
+        await callback.answer("Рассылка не найдена", show_alert=True)
+        return
+
+    already_launched = await db.campaign_has_audience(db_path, campaign_id)
+    launch_id, total = await broadcasts.prepare(db_path, campaign_id, segment)
+    if not total:
         await callback.answer()
         await callback.message.answer(
-            "Нет аудитории с оплаченными заказами.",
+            texts.admin_broadcast_segment_empty(),
             reply_markup=build_broadcasts_menu_keyboard(),
         )
         return
 
-    await db.add_campaign_audience(db_path, campaign_id, audience)
-    audience_status_rows = await db.get_campaign_audience(db_path, campaign_id)
-    status_map: dict[int, str] = {row["user_id"]: row["status"] for row in audience_status_rows}
-
     await callback.answer()
     await callback.message.answer(
         texts.admin_broadcast_launch_repeat_ack() if already_launched else texts.admin_broadcast_launch_ack()
     )
-    delay_seconds = DEFAULT_BROADCAST_DELAY_SECONDS
-
-    async def _send():
-        sent = failed = 0
-        interested = declined = 0
-        total = len(audience)
-        started_at = time.monotonic()
-        logger.info(
-            "Broadcast start campaign_id=%s audience=%s delay=%.2fs",
-            campaign_id,
-            total,
-            delay_seconds,
-        )
+    asyncio.create_task(
+        broadcasts.send_campaign(callback.bot, db_path, campaign, launch_id=launch_id, total=total, label=parts[0])
+    )
+
+
+def _describe_schedule(
+    repeat: str,
+    run_at: str | None,
+    tz: ZoneInfo,
+    day_of_month: int | None = None,
+    time_of_day: str | None = None,
+) -> str:
+    next_run = "—"
+    if run_at:
+        local = dt.datetime.fromisoformat(run_at).replace(tzinfo=dt.timezone.utc).astimezone(tz)
+        next_run = local.strftime("%d.%m.%Y %H:%M")
+    return texts.admin_broadcast_schedule_description(repeat, next_run, day_of_month, time_of_day)
+
 
-        for index, user_id in enumerate(audience, start=1):
-            if status_map.get(user_id) in {"interested", "declined"}:
-                logger.info(
-                    "Broadcast skip user_id=%s campaign_id=%s status=%s index=%s/%s",
-                    user_id,
-                    campaign_id,
-                    status_map.get(user_id),
-                    index,
-                    total,
-                )
-                continue
-            try:
-                text = texts.campaign_offer(campaign["body"])
-
-                msg = await send_with_retry(
-                    lambda: callback.bot.send_message(
-                        user_id,
-                        text,
-                    )
-                )
-
-                message_id = getattr(msg, "message_id", None)
-
-                if message_id is not None:
-                    sent += 1
-                    await db.update_campaign_audience_status(
-                        db_path,
-                        campaign_id,
-                        user_id,
-                        "sent",
-                        message_id=message_id,
-                    )
-                    status_map[user_id] = "sent"
-                    logger.info(
-                        "Broadcast sent user_id=%s campaign_id=%s message_id=%s index=%s/%s",
-                        user_id,
-                        campaign_id,
-                        message_id,
-                        index,
-                        total,
-                    )
-                else:
-                    failed += 1
-                    await db.update_campaign_audience_status(
-                        db_path,
-                        campaign_id,
-                        user_id,
-                        "failed",
-                        error="Delivery failed",
-                    )
-                    status_map[user_id] = "failed"
-                    logger.warning(
-                        "Broadcast failed user_id=%s campaign_id=%s reason=no_message_id index=%s/%s",
-                        user_id,
-                        campaign_id,
-                        index,
-                        total,
-                    )
-
-            except TelegramForbiddenError:
-                failed += 1
-                await db.update_campaign_audience_status(
-                    db_path,
-                    campaign_id,
-                    user_id,
-                    "failed",
-                    error="blocked_by_user",
-                )
-                status_map[user_id] = "failed"
-                logger.warning(
-                    "Broadcast blocked user_id=%s campaign_id=%s index=%s/%s",
-                    user_id,
-                    campaign_id,
-                    index,
-                    total,
-                )
-            except Exception as exc:
-                logger.exception(
-                    "Campaign send failed user_id=%s campaign_id=%s",
-                    user_id,
-                    campaign_id,
-                )
-                failed += 1
-                await db.update_campaign_audience_status(
-                    db_path,
-                    campaign_id,
-                    user_id,
-                    "failed",
-                    error=str(exc),
-                )
-                status_map[user_id] = "failed"
-
-            await asyncio.sleep(delay_seconds)
-
-        audience_rows = await db.get_campaign_audience(db_path, campaign_id)
-        for row in audience_rows:
-            if row["status"] == "interested":
-                interested += 1
-            elif row["status"] == "declined":
-                declined += 1
-        duration = time.monotonic() - started_at
-        logger.info(
-            "Broadcast finished campaign_id=%s sent=%s failed=%s interested=%s declined=%s duration=%.2fs",
-            campaign_id,
-            sent,
-            failed,
-            interested,
-            declined,
-            duration,
+@router.callback_query(F.data.startswith(f"{ADMIN_BROADCAST_SCHEDULE_PREFIX}:"))
+async def handle_broadcast_schedule(callback: CallbackQuery, state: FSMContext):
+    if not _ensure_admin(callback):
+        await callback.answer(texts.admin_forbidden(), show_alert=True)
+        return
+
+    await state.clear()
+    campaign_id = await _campaign_id_from_callback(callback)
+    settings = get_settings(callback.bot)
+
+    campaign = await db.get_campaign(settings.db_path, campaign_id)
+    if not campaign:
+        await callback.answer("Рассылка не найдена", show_alert=True)
+        return
+
+    schedule = await db.get_campaign_schedule(settings.db_path, campaign_id)
+    current = None
+    if schedule:
+        current = _describe_schedule(
+            schedule["repeat"],
+            schedule["run_at"],
+            ZoneInfo(settings.schedule_timezone),
+            schedule["day_of_month"],
+            schedule["time_of_day"],
         )
+    await state.set_state(AdminBroadcastSchedule.when)
+    await state.update_data(campaign_id=campaign_id)
+    await callback.answer()
+    await callback.message.answer(
+        texts.admin_broadcast_schedule_prompt(campaign["title"], current),
+        reply_markup=build_broadcast_schedule_keyboard(
+            await callback_tokens.encode(settings.db_path, campaign_id),
+            scheduled=schedule is not None,
+        ),
+    )
 
-    asyncio.create_task(_send())
+
+@router.message(AdminBroadcastSchedule.when)
+async def handle_broadcast_schedule_when(message: Message, state: FSMContext):
+    if not _ensure_admin(message):
+        await state.clear()
+        await message.answer(texts.admin_forbidden())
+        return
+
+    settings = get_settings(message.bot)
+    data = await state.get_data()
+    campaign = await db.get_campaign(settings.db_path, data.get("campaign_id", ""))
+    if not campaign:
+        await state.clear()
+        await message.answer(texts.admin_session_reset())
+        return
+
+    tz = ZoneInfo(settings.schedule_timezone)
+    spec = scheduler.parse_schedule(message.text or "", tz, dt.datetime.utcnow())
+    if spec is None:
+        await message.answer(texts.admin_broadcast_schedule_invalid())
+        return
+
+    await state.update_data(
+        repeat=spec.repeat,
+        run_at=spec.run_at.isoformat(),
+        day_of_month=spec.day_of_month,
+        time_of_day=spec.time_of_day,
+    )
+    when = _describe_schedule(spec.repeat, spec.run_at.isoformat(), tz, spec.day_of_month, spec.time_of_day)
+    counts = {name: await db.count_segment(settings.db_path, segments.preset(name)) for name in segments.PRESETS}
+    await message.answer(
+        texts.admin_broadcast_schedule_choose_segment(campaign["title"], when),
+        reply_markup=build_broadcast_segments_keyboard(
+            await callback_tokens.encode(settings.db_path, campaign["id"]),
+            counts,
+            prefix=ADMIN_BROADCAST_SCHEDULE_SEGMENT_PREFIX,
+        ),
+    )
+
+
+@router.callback_query(F.data.startswith(f"{ADMIN_BROADCAST_SCHEDULE_SEGMENT_PREFIX}:"))
+async def handle_broadcast_schedule_segment(callback: CallbackQuery, state: FSMContext):
+    if not _ensure_admin(callback):
+        await callback.answer(texts.admin_forbidden(), show_alert=True)
+        return
+
+    parts = (callback.data or "")[len(ADMIN_BROADCAST_SCHEDULE_SEGMENT_PREFIX) + 1 :].split(":")
+    segment_name = parts[0] if len(parts) == 2 and parts[0] in segments.PRESETS else None
+    campaign_id = await _campaign_id_from_callback(callback)
+    settings = get_settings(callback.bot)
+    data = await state.get_data()
+    await state.clear()
+
+    campaign = await db.get_campaign(settings.db_path, campaign_id)
+    if not campaign or segment_name is None:
+        await callback.answer("Рассылка не найдена", show_alert=True)
+        return
+    if data.get("campaign_id") != campaign_id or not data.get("run_at"):
+        await callback.answer(texts.admin_session_reset(), show_alert=True)
+        return
+
+    await db.upsert_campaign_schedule(
+        settings.db_path,
+        campaign_id,
+        segment=segment_name,
+        repeat=data["repeat"],
+        run_at=data["run_at"],
+        spread_seconds=settings.broadcast_spread_minutes * 60,
+        day_of_month=data.get("day_of_month"),
+        time_of_day=data.get("time_of_day"),
+    )
+    logger.info(
+        "Campaign scheduled id=%s repeat=%s run_at=%s segment=%s",
+        campaign_id,
+        data["repeat"],
+        data["run_at"],
+        segment_name,
+    )
+    when = _describe_schedule(
+        data["repeat"],
+        data["run_at"],
+        ZoneInfo(settings.schedule_timezone),
+        data.get("day_of_month"),
+        data.get("time_of_day"),
+    )
+    spread_seconds = settings.broadcast_spread_minutes * 60
+    audience = await db.count_segment(settings.db_path, segments.preset(segment_name))
+    duration = broadcasts.estimated_duration(audience, spread_seconds)
+    finish = dt.datetime.fromisoformat(data["run_at"]) + duration
+    finish_local = finish.replace(tzinfo=dt.timezone.utc).astimezone(ZoneInfo(settings.schedule_timezone))
+    await callback.answer()
+    await callback.message.answer(
+        texts.admin_broadcast_scheduled(
+            campaign["title"],
+            when,
+            audience,
+            finish_local.strftime("%d.%m.%Y %H:%M"),
+            stretched=duration.total_seconds() > spread_seconds,
+        ),
+        reply_markup=build_broadcasts_menu_keyboard(),
+    )
+
+
+@router.callback_query(F.data.startswith(f"{ADMIN_BROADCAST_UNSCHEDULE_PREFIX}:"))
+async def handle_broadcast_unschedule(callback: CallbackQuery, state: FSMContext):
+    if not _ensure_admin(callback):
+        await callback.answer(texts.admin_forbidden(), show_alert=True)
+        return
+
+    await state.clear()
+    campaign_id = await _campaign_id_from_callback(callback)
+    db_path = get_settings(callback.bot).db_path
+
+    campaign = await db.get_campaign(db_path, campaign_id)
+    if not campaign:
+        await callback.answer("Рассылка не найдена", show_alert=True)
+        return
+
+    await db.delete_campaign_schedule(db_path, campaign_id)
+    logger.info("Campaign schedule cancelled id=%s", campaign_id)
+    await callback.answer()
+    await callback.message.answer(
+        texts.admin_broadcast_schedule_cancelled(campaign["title"]),
+        reply_markup=build_broadcasts_menu_keyboard(),
+    )
 
 
 @router.callback_query(F.data.startswith(f"{ADMIN_BROADCAST_RESPONSES_PREFIX}:"))
@@ -495,19 +538,20 @@ async def handle_broadcast_responses(callback: CallbackQuery, state: FSMContext)
         return
 
     await state.clear()
-    campaign_id, campaign_token, page = _parse_responses_list_payload(callback.data or "")
+    campaign_token, page = _parse_responses_list_payload(callback.data or "")
+    db_path = get_settings(callback.bot).db_path
+    campaign_id = await callback_tokens.decode(db_path, campaign_token)
     if not campaign_id:
         await callback.answer("Рассылка не найдена", show_alert=True)
         return
 
-    db_path = get_settings(callback.bot).db_path
     campaign = await db.get_campaign(db_path, campaign_id)
     if not campaign:
         await callback.answer("Рассылка не найдена", show_alert=True)
         return
 
-    responses = await db.list_campaign_responses(db_path, campaign_id)
-    if not responses:
+    total = await db.count_campaign_responses(db_path, campaign_id)
+    if not total:
         await callback.answer()
         await callback.message.answer(
             texts.admin_broadcast_responses_empty(),
@@ -515,18 +559,22 @@ async def handle_broadcast_responses(callback: CallbackQuery, state: FSMContext)
         )
         return
 
-    total_pages = max(1, (len(responses) + RESPONSES_PAGE_SIZE - 1) // RESPONSES_PAGE_SIZE)
+    total_pages = max(1, (total + RESPONSES_PAGE_SIZE - 1) // RESPONSES_PAGE_SIZE)
     page = min(max(page, 1), total_pages)
-    start = (page - 1) * RESPONSES_PAGE_SIZE
-    chunk = responses[start : start + RESPONSES_PAGE_SIZE]
+    chunk = await db.fetch_campaign_responses_page(
+        db_path,
+        campaign_id,
+        limit=RESPONSES_PAGE_SIZE,
+        offset=(page - 1) * RESPONSES_PAGE_SIZE,
+    )
+    campaign_token = await callback_tokens.encode(db_path, campaign_id)
     for resp in chunk:
-        resp["_token"] = _register_response_token(campaign_id, resp["id"])
+        resp["_token"] = await callback_tokens.encode(db_path, resp["id"])
 
     await callback.answer()
     await callback.message.answer(
         texts.admin_broadcast_responses_list_title(campaign["title"], page, total_pages),
         reply_markup=build_broadcast_responses_list_keyboard(
-            campaign_id,
             campaign_token,
             chunk,
             page=page,
@@ -542,34 +590,28 @@ async def handle_broadcast_response_detail(callback: CallbackQuery, state: FSMCo
         return
 
     await state.clear()
-    campaign_id, page, response_token = _parse_response_detail_payload(callback.data or "")
-    if not campaign_id or not response_token:
+    campaign_token, page, response_token = _parse_response_detail_payload(callback.data or "")
+    db_path = get_settings(callback.bot).db_path
+    campaign_id = await callback_tokens.decode(db_path, campaign_token)
+    response_id = await callback_tokens.decode(db_path, response_token)
+    if not campaign_id or not response_id:
         await callback.answer("Данные ответа не найдены", show_alert=True)
         return
 
-    db_path = get_settings(callback.bot).db_path
     campaign = await db.get_campaign(db_path, campaign_id)
     if not campaign:
         await callback.answer("Рассылка не найдена", show_alert=True)
         return
 
-    response_campaign_id, response_id = _resolve_response_token(response_token)
-    if response_campaign_id != campaign_id or not response_id:
-        await callback.answer("Ответ не найден", show_alert=True)
-        return
-
-    responses = await db.list_campaign_responses(db_path, campaign_id)
-    response = next((item for item in responses if item["id"] == response_id), None)
-    if not response:
+    response = await db.get_campaign_response(db_path, response_id)
+    if not response or response["campaign_id"] != campaign_id:
         await callback.answer("Ответ не найден", show_alert=True)
         return
 
-    campaign_token = _get_campaign_token(campaign_id)
     await callback.answer()
     await callback.message.answer(
         texts.admin_broadcast_response_detail(campaign["title"], response),
         reply_markup=build_broadcast_response_detail_keyboard(
-            campaign_id=campaign_id,
             campaign_token=campaign_token,
             page=page,
         ),
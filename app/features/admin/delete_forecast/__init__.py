@@ -15,7 +15,7 @@ from app.features.admin.keyboards import (
     build_admin_years_keyboard,
 )
 from app.features.admin.states import AdminDelete
-from app.services import media
+from app.services import media_io
 
 router = Router()
 
@@ -42,7 +42,7 @@ async def handle_admin_delete_type(callback: CallbackQuery, state: FSMContext):
     await state.update_data(kind=kind)
     settings = get_settings(callback.bot)
     if kind == "year":
-        years = media.available_yearly_years(settings.media_dir)
+        years = await media_io.available_yearly_years(settings.media_dir)
         if not years:
             await state.clear()
             await callback.answer()
@@ -55,7 +55,7 @@ async def handle_admin_delete_type(callback: CallbackQuery, state: FSMContext):
             reply_markup=build_admin_years_keyboard(years, prefix="admin-del-y-year"),
         )
     else:
-        years = media.available_monthly_years(settings.media_dir)
+        years = await media_io.available_monthly_years(settings.media_dir)
         if not years:
             await state.clear()
             await callback.answer()
@@ -76,10 +76,10 @@ async def handle_admin_delete_year_choose(callback: CallbackQuery, state: FSMCon
         return
     year = (callback.data or "").split(":", maxsplit=1)[-1]
     settings = get_settings(callback.bot)
-    if year not in media.available_yearly_years(settings.media_dir):
+    if year not in await media_io.available_yearly_years(settings.media_dir):
         await callback.answer(texts.year_unavailable(), show_alert=True)
         return
-    signs = media.available_year_signs(settings.media_dir, year)
+    signs = await media_io.available_year_signs(settings.media_dir, year)
     if not signs:
         await state.clear()
         await callback.answer()
@@ -102,10 +102,10 @@ async def handle_admin_delete_month_year_choose(callback: CallbackQuery, state:
         return
     year = (callback.data or "").split(":", maxsplit=1)[-1]
     settings = get_settings(callback.bot)
-    if year not in media.available_monthly_years(settings.media_dir):
+    if year not in await media_io.available_monthly_years(settings.media_dir):
         await callback.answer(texts.year_unavailable(), show_alert=True)
         return
-    months = media.months_for_year(settings.media_dir, year)
+    months = await media_io.months_for_year(settings.media_dir, year)
     if not months:
         await state.clear()
         await callback.answer()
@@ -153,7 +153,7 @@ async def handle_admin_delete_month(callback: CallbackQuery, state: FSMContext):
     await callback.answer()
     settings = get_settings(callback.bot)
     ym = f"{year}-{month}"
-    signs = media.available_month_signs(settings.media_dir, ym)
+    signs = await media_io.available_month_signs(settings.media_dir, ym)
     if not signs:
         await state.clear()
         await callback.message.answer(texts.admin_delete_no_signs())
@@ -192,14 +192,14 @@ async def handle_admin_delete_confirm(callback: CallbackQuery, state: FSMContext
     settings = get_settings(callback.bot)
     await state.clear()
     if kind == "year":
-        success = media.delete_year_content(settings.media_dir, year, sign)
+        success = await media_io.delete_year_content(settings.media_dir, year, sign)
         text = texts.admin_delete_success_year(year, sign) if success else texts.admin_delete_missing()
     else:
         if not month:
             await callback.answer(texts.admin_session_reset(), show_alert=True)
             return
         ym = f"{year}-{month}"
-        success = media.delete_month_content(settings.media_dir, ym, sign)
+        success = await media_io.delete_month_content(settings.media_dir, ym, sign)
         text = texts.admin_delete_success_month(year, month, sign) if success else texts.admin_delete_missing()
     await callback.answer()
     await callback.message.answer(text)
@@ -0,0 +1,51 @@
+import logging
+import shutil
+import tempfile
+from pathlib import Path
+
+import aiosqlite
+from aiogram import Router
+from aiogram.filters import Command, CommandObject
+from aiogram.fsm.context import FSMContext
+from aiogram.types import FSInputFile, Message
+
+from app import texts
+from app.features.admin.dependencies import get_settings, is_admin
+from app.services import exports
+from app.services.blocking import run_blocking
+
+logger = logging.getLogger(__name__)
+
+router = Router()
+
+
+@router.message(Command("export"))
+async def handle_export_command(message: Message, state: FSMContext, command: CommandObject):
+    if not is_admin(message.bot, message.from_user.id):
+        await state.clear()
+        await message.answer(texts.admin_forbidden())
+        return
+    await state.clear()
+    kind = (command.args or "").strip().lower()
+    if kind not in exports.EXPORT_KINDS:
+        await message.answer(texts.admin_export_usage(exports.EXPORT_KINDS))
+        return
+    settings = get_settings(message.bot)
+    await message.answer(texts.admin_export_running(kind))
+    out_dir = Path(await run_blocking(tempfile.mkdtemp, prefix="export-"))
+    try:
+        try:
+            export = await exports.export_csv(settings.db_path, kind, out_dir)
+        except (aiosqlite.Error, OSError):
+            logger.exception("Export failed kind=%s user_id=%s", kind, message.from_user.id)
+            await message.answer(texts.admin_export_failed())
+            return
+        if export.size > exports.MAX_UPLOAD_BYTES:
+            await message.answer(texts.admin_export_too_large(export.size // (1024 * 1024)))
+            return
+        await message.answer_document(
+            FSInputFile(export.path, filename=export.path.name),
+            caption=texts.admin_export_done(kind, export.rows),
+        )
+    finally:
+        await run_blocking(shutil.rmtree, out_dir, True)
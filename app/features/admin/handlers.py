@@ -1,22 +1,58 @@
-from aiogram import Router
+import importlib
+from typing import Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware, Router
+from aiogram.types import TelegramObject
 
 from app.config import Settings
 
-from .dependencies import setup_admin_settings
-from .bulk_mail import router as broadcasts_router
-from .add_forecast import router as add_forecast_router
-from .delete_forecast import router as delete_forecast_router
+from .dependencies import is_admin, setup_admin_settings
 from app.features.user.admin_panel import router as menu_router
-from .reviews import router as reviews_router
-from .stats import router as stats_router
+
+# Admin-only features are imported on the first event from an admin, so a restart
+# doesn't pay for modules that regular users never reach.
+LAZY_FEATURE_MODULES = (
+    "app.features.admin.add_forecast",
+    "app.features.admin.import_archive",
+    "app.features.admin.delete_forecast",
+    "app.features.admin.stats",
+    "app.features.admin.reviews",
+    "app.features.admin.bulk_mail",
+    "app.features.admin.backup",
+    "app.features.admin.search",
+    "app.features.admin.export",
+)
 
 router = Router()
 router.include_router(menu_router)
-router.include_router(add_forecast_router)
-router.include_router(delete_forecast_router)
-router.include_router(stats_router)
-router.include_router(reviews_router)
-router.include_router(broadcasts_router)
+_features_router = Router(name="admin-features")
+router.include_router(_features_router)
+
+
+def load_feature_routers() -> None:
+    if _features_router.sub_routers:
+        return
+    for module_name in LAZY_FEATURE_MODULES:
+        module = importlib.import_module(module_name)
+        _features_router.include_router(module.router)
+
+
+class LazyFeatureRoutersMiddleware(BaseMiddleware):
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        if not _features_router.sub_routers:
+            user = data.get("event_from_user")
+            if user and is_admin(data["bot"], user.id):
+                load_feature_routers()
+        return await handler(event, data)
+
+
+_features_router.message.outer_middleware(LazyFeatureRoutersMiddleware())
+_features_router.callback_query.outer_middleware(LazyFeatureRoutersMiddleware())
 
 
 def setup_handlers(settings: Settings) -> None:
@@ -26,4 +62,5 @@ def setup_handlers(settings: Settings) -> None:
 __all__ = [
     "router",
     "setup_handlers",
+    "load_feature_routers",
 ]
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+
+from aiogram import F, Router
+from aiogram.filters import Command
+from aiogram.fsm.context import FSMContext
+from aiogram.types import CallbackQuery, Message
+
+from app import texts
+from app.features.admin.dependencies import get_settings, is_admin
+from app.features.admin.keyboards import ADMIN_IMPORT_ARCHIVE_CALLBACK, build_admin_menu
+from app.features.admin.states import AdminArchiveImport
+from app.features.admin.utils import incoming_path, save_media
+from app.services import archive_import, images
+from app.services.blocking import run_blocking
+
+logger = logging.getLogger(__name__)
+
+router = Router()
+
+
+async def _start_import(message: Message, state: FSMContext) -> None:
+    await state.clear()
+    await state.set_state(AdminArchiveImport.file)
+    await message.answer(texts.admin_archive_prompt())
+
+
+@router.callback_query(F.data == ADMIN_IMPORT_ARCHIVE_CALLBACK)
+async def handle_import_archive(callback: CallbackQuery, state: FSMContext):
+    if not is_admin(callback.bot, callback.from_user.id):
+        await callback.answer(texts.admin_forbidden(), show_alert=True)
+        return
+    await callback.answer()
+    await _start_import(callback.message, state)
+
+
+@router.message(Command("import"))
+async def handle_import_command(message: Message, state: FSMContext):
+    if not is_admin(message.bot, message.from_user.id):
+        await state.clear()
+        await message.answer(texts.admin_forbidden())
+        return
+    await _start_import(message, state)
+
+
+@router.message(AdminArchiveImport.file)
+async def handle_archive_file(message: Message, state: FSMContext):
+    if not is_admin(message.bot, message.from_user.id):
+        await state.clear()
+        await message.answer(texts.admin_forbidden())
+        return
+    file_name = (message.document.file_name or "") if message.document else ""
+    if not file_name.lower().endswith(".zip"):
+        await message.answer(texts.admin_archive_invalid_file())
+        return
+    settings = get_settings(message.bot)
+    upload = await run_blocking(incoming_path, settings.media_dir, "zip", unique=str(message.message_id))
+    if not await save_media(message, upload):
+        await message.answer(texts.admin_save_failed())
+        return
+    await state.clear()
+    await message.answer(texts.admin_archive_processing())
+    try:
+        staged = await run_blocking(archive_import.stage_archive, settings.media_dir, upload)
+    except archive_import.ArchiveImportError:
+        logger.warning("Archive import rejected file=%s", file_name, exc_info=True)
+        await message.answer(texts.admin_archive_failed())
+        await message.answer(texts.admin_menu(), reply_markup=build_admin_menu())
+        return
+    finally:
+        await run_blocking(upload.unlink, missing_ok=True)
+
+    optimizations = await asyncio.gather(*(images.optimize_upload(item.path, settings) for item in staged.files))
+    try:
+        report = await run_blocking(archive_import.commit_archive, settings.media_dir, staged)
+    except archive_import.ArchiveImportError:
+        logger.exception("Archive import failed to store files file=%s", file_name)
+        await message.answer(texts.admin_archive_failed())
+        await message.answer(texts.admin_menu(), reply_markup=build_admin_menu())
+        return
+    logger.info(
+        "Archive imported file=%s added=%s duplicates=%s skipped=%s",
+        file_name,
+        report.added_files,
+        report.duplicates,
+        len(report.skipped),
+    )
+    await message.answer(texts.admin_archive_report(report.added, report.duplicates, report.skipped))
+    optimized = [item for item in optimizations if item]
+    if optimized:
+        await message.answer(
+            texts.admin_image_savings(
+                sum(item.original_bytes for item in optimized),
+                sum(item.optimized_bytes for item in optimized),
+            )
+        )
+    await message.answer(texts.admin_menu(), reply_markup=build_admin_menu())
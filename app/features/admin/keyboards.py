@@ -22,6 +22,7 @@ SIGN_EMOJI = {
 
 ADMIN_ADD_FORECAST_CALLBACK = "admin:add_forecast"
 ADMIN_DELETE_FORECAST_CALLBACK = "admin:delete_forecast"
+ADMIN_IMPORT_ARCHIVE_CALLBACK = "admin:import_archive"
 ADMIN_STATS_CALLBACK = "admin:stats"
 ADMIN_REVIEWS_CALLBACK = "admin:reviews"
 ADMIN_BROADCASTS_CALLBACK = "admin:broadcasts"
@@ -30,6 +31,10 @@ ADMIN_BROADCAST_ITEM_PREFIX = "admin:broadcasts:item"
 ADMIN_BROADCAST_DELETE_PREFIX = "admin:broadcasts:delete"
 ADMIN_BROADCAST_CREATE_CALLBACK = "admin:broadcasts:create"
 ADMIN_BROADCAST_LAUNCH_PREFIX = "admin:broadcasts:launch"
+ADMIN_BROADCAST_SEGMENT_PREFIX = "admin:broadcasts:seg"
+ADMIN_BROADCAST_SCHEDULE_PREFIX = "admin:broadcasts:sched"
+ADMIN_BROADCAST_SCHEDULE_SEGMENT_PREFIX = "admin:broadcasts:sseg"
+ADMIN_BROADCAST_UNSCHEDULE_PREFIX = "admin:broadcasts:unsched"
 ADMIN_BROADCAST_STATS_PREFIX = "admin:broadcasts:stats"
 ADMIN_BROADCAST_BODY_PREFIX = "admin:broadcasts:body"
 ADMIN_BROADCAST_RESPONSES_PREFIX = "admin:br:list"
@@ -41,16 +46,20 @@ ADMIN_REVIEWS_FILTER_PAGE_PREFIX = "admin-reviews:pagef"
 ADMIN_REVIEWS_MONTHS_PAGE_PREFIX = "admin-reviews:months-page"
 ADMIN_REVIEWS_MONTH_OPEN_PREFIX = "admin-reviews:month-open"
 ADMIN_REVIEW_OPEN_PREFIX = "ar:o"
+ADMIN_FIND_PAGE_PREFIX = "admin:find"
 ADMIN_STATS_KIND_PREFIX = "admin-stats:kind"
 ADMIN_STATS_MONTHS_PAGE_PREFIX = "admin-stats:months-page"
 ADMIN_STATS_MONTH_OPEN_PREFIX = "admin-stats:month-open"
 ADMIN_STATS_YEARS_PAGE_PREFIX = "admin-stats:years-page"
 ADMIN_STATS_YEAR_OPEN_PREFIX = "admin-stats:year-open"
+ADMIN_STATS_TREND_PREFIX = "admin-stats:trend"
+ADMIN_STATS_FUNNEL_PREFIX = "admin-stats:funnel"
 
 
 def build_admin_menu() -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
     builder.button(text="➕ Добавить прогноз", callback_data=ADMIN_ADD_FORECAST_CALLBACK)
+    builder.button(text="📦 Загрузить архив", callback_data=ADMIN_IMPORT_ARCHIVE_CALLBACK)
     builder.button(text="🗑️ Удалить прогноз", callback_data=ADMIN_DELETE_FORECAST_CALLBACK)
     builder.button(text="📊 Статистика продаж", callback_data=ADMIN_STATS_CALLBACK)
     builder.button(text="💬 Отзывы", callback_data=ADMIN_REVIEWS_CALLBACK)
@@ -204,10 +213,29 @@ def build_admin_stats_kind_keyboard() -> InlineKeyboardMarkup:
     builder.button(text="📅 Годовые", callback_data=f"{ADMIN_STATS_KIND_PREFIX}:year")
     builder.button(text="🗓️ Месячные", callback_data=f"{ADMIN_STATS_KIND_PREFIX}:month")
     builder.adjust(2)
+    builder.row(InlineKeyboardButton(text="📈 Динамика по дням", callback_data=f"{ADMIN_STATS_TREND_PREFIX}:30"))
+    builder.row(InlineKeyboardButton(text="🔻 Воронка покупки", callback_data=f"{ADMIN_STATS_FUNNEL_PREFIX}:7"))
     builder.row(InlineKeyboardButton(text="⬅️ В меню", callback_data=ADMIN_BACK_MENU_CALLBACK))
     return builder.as_markup()
 
 
+def build_admin_stats_trend_keyboard(
+    periods: tuple[int, ...],
+    current: int,
+    prefix: str = ADMIN_STATS_TREND_PREFIX,
+) -> InlineKeyboardMarkup:
+    builder = InlineKeyboardBuilder()
+    for days in periods:
+        label = f"{days} дн."
+        builder.button(
+            text=f"• {label} •" if days == current else label,
+            callback_data=f"{prefix}:{days}",
+        )
+    builder.adjust(len(periods))
+    builder.row(InlineKeyboardButton(text="⬅️ К статистике", callback_data=ADMIN_STATS_CALLBACK))
+    return builder.as_markup()
+
+
 def build_admin_stats_months_keyboard(
     items: list[tuple[str, str]],
     *,
@@ -317,8 +345,8 @@ def build_broadcasts_menu_keyboard() -> InlineKeyboardMarkup:
 
 def build_broadcasts_list_keyboard(items: list[tuple[str, str]], prefix: str, *, include_back: bool = True) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
-    for text, campaign_id in items:
-        builder.button(text=text, callback_data=f"{prefix}:{campaign_id}")
+    for text, campaign_token in items:
+        builder.button(text=text, callback_data=f"{prefix}:{campaign_token}")
     builder.adjust(1)
     if include_back:
         builder.button(text="⬅️ Назад", callback_data=ADMIN_BROADCASTS_CALLBACK)
@@ -327,7 +355,6 @@ def build_broadcasts_list_keyboard(items: list[tuple[str, str]], prefix: str, *,
 
 
 def build_broadcast_responses_list_keyboard(
-    campaign_id: str,
     campaign_token: str,
     responses: list[dict],
     *,
@@ -367,7 +394,7 @@ def build_broadcast_responses_list_keyboard(
     builder.row(
         InlineKeyboardButton(
             text="⬅️ К рассылке",
-            callback_data=f"{ADMIN_BROADCAST_ITEM_PREFIX}:{campaign_id}",
+            callback_data=f"{ADMIN_BROADCAST_ITEM_PREFIX}:{campaign_token}",
         ),
         InlineKeyboardButton(text="⬅️ В меню", callback_data=ADMIN_BACK_MENU_CALLBACK),
     )
@@ -376,7 +403,6 @@ def build_broadcast_responses_list_keyboard(
 
 def build_broadcast_response_detail_keyboard(
     *,
-    campaign_id: str,
     campaign_token: str,
     page: int,
 ) -> InlineKeyboardMarkup:
@@ -391,7 +417,7 @@ def build_broadcast_response_detail_keyboard(
             [
                 InlineKeyboardButton(
                     text="⬅️ К рассылке",
-                    callback_data=f"{ADMIN_BROADCAST_ITEM_PREFIX}:{campaign_id}",
+                    callback_data=f"{ADMIN_BROADCAST_ITEM_PREFIX}:{campaign_token}",
                 )
             ],
             [InlineKeyboardButton(text="⬅️ В меню", callback_data=ADMIN_BACK_MENU_CALLBACK)],
@@ -399,13 +425,13 @@ def build_broadcast_response_detail_keyboard(
     )
 
 
-def build_broadcast_stats_keyboard(campaign_id: str) -> InlineKeyboardMarkup:
+def build_broadcast_stats_keyboard(campaign_token: str) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[
             [
                 InlineKeyboardButton(
                     text="⬅️ К рассылке",
-                    callback_data=f"{ADMIN_BROADCAST_ITEM_PREFIX}:{campaign_id}",
+                    callback_data=f"{ADMIN_BROADCAST_ITEM_PREFIX}:{campaign_token}",
                 )
             ],
             [InlineKeyboardButton(text="⬅️ В меню", callback_data=ADMIN_BACK_MENU_CALLBACK)],
@@ -413,13 +439,13 @@ def build_broadcast_stats_keyboard(campaign_id: str) -> InlineKeyboardMarkup:
     )
 
 
-def build_broadcast_body_keyboard(campaign_id: str) -> InlineKeyboardMarkup:
+def build_broadcast_body_keyboard(campaign_token: str) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[
             [
                 InlineKeyboardButton(
                     text="⬅️ К рассылке",
-                    callback_data=f"{ADMIN_BROADCAST_ITEM_PREFIX}:{campaign_id}",
+                    callback_data=f"{ADMIN_BROADCAST_ITEM_PREFIX}:{campaign_token}",
                 )
             ],
             [InlineKeyboardButton(text="⬅️ В меню", callback_data=ADMIN_BACK_MENU_CALLBACK)],
@@ -427,12 +453,50 @@ def build_broadcast_body_keyboard(campaign_id: str) -> InlineKeyboardMarkup:
     )
 
 
-def build_broadcast_item_menu_keyboard(campaign_id: str) -> InlineKeyboardMarkup:
+BROADCAST_SEGMENT_BUTTONS = (
+    ("all", "👥 Все покупатели"),
+    ("month", "🗓️ Покупали месячные"),
+    ("year", "📅 Покупали годовые"),
+    ("recent", "🕒 Покупали за 30 дней"),
+    ("never", "🌱 Еще не покупали"),
+)
+
+
+def build_broadcast_segments_keyboard(
+    campaign_token: str,
+    counts: dict[str, int],
+    prefix: str = ADMIN_BROADCAST_SEGMENT_PREFIX,
+) -> InlineKeyboardMarkup:
+    builder = InlineKeyboardBuilder()
+    for name, label in BROADCAST_SEGMENT_BUTTONS:
+        builder.button(
+            text=f"{label} ({counts.get(name, 0)})",
+            callback_data=f"{prefix}:{name}:{campaign_token}",
+        )
+    builder.button(text="⬅️ К рассылке", callback_data=f"{ADMIN_BROADCAST_ITEM_PREFIX}:{campaign_token}")
+    builder.adjust(1)
+    return builder.as_markup()
+
+
+def build_broadcast_schedule_keyboard(campaign_token: str, scheduled: bool) -> InlineKeyboardMarkup:
+    builder = InlineKeyboardBuilder()
+    if scheduled:
+        builder.button(
+            text="❌ Отменить расписание",
+            callback_data=f"{ADMIN_BROADCAST_UNSCHEDULE_PREFIX}:{campaign_token}",
+        )
+    builder.button(text="⬅️ К рассылке", callback_data=f"{ADMIN_BROADCAST_ITEM_PREFIX}:{campaign_token}")
+    builder.adjust(1)
+    return builder.as_markup()
+
+
+def build_broadcast_item_menu_keyboard(campaign_token: str) -> InlineKeyboardMarkup:
     builder = InlineKeyboardBuilder()
-    builder.button(text="🚀 Запустить", callback_data=f"{ADMIN_BROADCAST_LAUNCH_PREFIX}:{campaign_id}")
-    builder.button(text="👁️ Текст рассылки", callback_data=f"{ADMIN_BROADCAST_BODY_PREFIX}:{campaign_id}")
-    builder.button(text="📈 Статистика", callback_data=f"{ADMIN_BROADCAST_STATS_PREFIX}:{campaign_id}")
-    builder.button(text="🗑️ Удалить рассылку", callback_data=f"{ADMIN_BROADCAST_DELETE_PREFIX}:{campaign_id}")
+    builder.button(text="🚀 Запустить", callback_data=f"{ADMIN_BROADCAST_LAUNCH_PREFIX}:{campaign_token}")
+    builder.button(text="⏰ Расписание", callback_data=f"{ADMIN_BROADCAST_SCHEDULE_PREFIX}:{campaign_token}")
+    builder.button(text="👁️ Текст рассылки", callback_data=f"{ADMIN_BROADCAST_BODY_PREFIX}:{campaign_token}")
+    builder.button(text="📈 Статистика", callback_data=f"{ADMIN_BROADCAST_STATS_PREFIX}:{campaign_token}")
+    builder.button(text="🗑️ Удалить рассылку", callback_data=f"{ADMIN_BROADCAST_DELETE_PREFIX}:{campaign_token}")
     builder.button(text="⬅️ К списку", callback_data=ADMIN_BROADCAST_LIST_CALLBACK)
     builder.button(text="⬅️ В меню", callback_data=ADMIN_BACK_MENU_CALLBACK)
     builder.adjust(1)
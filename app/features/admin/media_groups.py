@@ -0,0 +1,59 @@
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+from aiogram.types import Message
+
+logger = logging.getLogger(__name__)
+
+AlbumHandler = Callable[[list[Message]], Awaitable[None]]
+
+
+@dataclass
+class _Album:
+    handler: AlbumHandler
+    messages: list[Message] = field(default_factory=list)
+    task: Optional[asyncio.Task] = None
+
+
+class MediaGroupCollector:
+    """
+    Collects the messages of a Telegram album and hands them to the handler as
+    one batch. Telegram doesn't mark the last item, so the album is considered
+    complete after `delay` seconds without a new item. Once the handler has
+    started, further items with the same key start a new album.
+    """
+
+    def __init__(self, delay: float = 1.0) -> None:
+        self.delay = delay
+        self._albums: dict[tuple[int, int, str], _Album] = {}
+        self._running: set[asyncio.Task] = set()
+
+    @staticmethod
+    def key(message: Message) -> tuple[int, int, str]:
+        return (message.chat.id, message.from_user.id, message.media_group_id or "")
+
+    def add(self, message: Message, handler: AlbumHandler) -> None:
+        key = self.key(message)
+        album = self._albums.get(key)
+        if album is None:
+            album = self._albums[key] = _Album(handler)
+        elif album.task:
+            album.task.cancel()
+        album.messages.append(message)
+        album.task = asyncio.create_task(self._flush(key))
+        self._running.add(album.task)
+        album.task.add_done_callback(self._running.discard)
+
+    async def _flush(self, key: tuple[int, int, str]) -> None:
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            return
+        album = self._albums.pop(key)
+        messages = sorted(album.messages, key=lambda message: message.message_id)
+        try:
+            await album.handler(messages)
+        except Exception:
+            logger.exception("Media group handler failed key=%s items=%s", key, len(messages))
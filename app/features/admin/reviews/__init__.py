@@ -20,7 +20,7 @@ from app.features.admin.keyboards import (
     build_admin_reviews_months_keyboard,
 )
 from app.features.admin.utils import REVIEWS_PAGE_SIZE, edit_or_send, format_dt, product_label
-from app.services import db
+from app.services import callback_tokens, db
 
 router = Router()
 
@@ -59,9 +59,9 @@ def _expand_ym(value: str) -> str | None:
     return value
 
 
-def _build_review_open_cb(review_id: str, page: int, kind: str, ym: str | None, month_page: int) -> str:
+def _build_review_open_cb(review_token: str, page: int, kind: str, ym: str | None, month_page: int) -> str:
     kind_code = "m" if kind == "month" else "y"
-    return f"{ADMIN_REVIEW_OPEN_PREFIX}:{review_id}:{page}:{kind_code}:{_compact_ym(ym)}:{month_page}"
+    return f"{ADMIN_REVIEW_OPEN_PREFIX}:{review_token}:{page}:{kind_code}:{_compact_ym(ym)}:{month_page}"
 
 
 async def _show_reviews_type_menu(callback: CallbackQuery) -> None:
@@ -112,7 +112,8 @@ async def _show_reviews_list(
         button_text = f"{idx}. {icon} {created} | {order_tag} | {review_title}"
         if len(button_text) > 64:
             button_text = f"{button_text[:61]}…"
-        items.append((button_text, _build_review_open_cb(review["id"], page, kind, ym, month_page)))
+        review_token = await callback_tokens.encode(settings.db_path, review["id"])
+        items.append((button_text, _build_review_open_cb(review_token, page, kind, ym, month_page)))
 
     prev_cb = _build_reviews_page_cb(page - 1, kind, ym, month_page) if page > 1 else None
     next_cb = _build_reviews_page_cb(page + 1, kind, ym, month_page) if has_next else None
@@ -262,8 +263,9 @@ async def handle_admin_review_open(callback: CallbackQuery, state: FSMContext):
         return
     review_id = ""
     back_callback = ADMIN_REVIEWS_CALLBACK
+    settings = get_settings(callback.bot)
     if len(parts) >= 7 and parts[0] == "ar" and parts[1] == "o":
-        review_id = parts[2]
+        review_id = await callback_tokens.decode(settings.db_path, parts[2]) or ""
         try:
             page = int(parts[3])
         except ValueError:
@@ -290,7 +292,6 @@ async def handle_admin_review_open(callback: CallbackQuery, state: FSMContext):
         await callback.answer(texts.invalid_choice(), show_alert=True)
         return
 
-    settings = get_settings(callback.bot)
     review = await db.get_review(settings.db_path, review_id)
     if not review:
         await callback.answer(texts.invalid_choice(), show_alert=True)
@@ -0,0 +1,86 @@
+import html
+
+from aiogram import F, Router
+from aiogram.filters import Command, CommandObject
+from aiogram.fsm.context import FSMContext
+from aiogram.types import CallbackQuery, Message
+
+from app import texts
+from app.features.admin.dependencies import get_settings, is_admin
+from app.features.admin.keyboards import (
+    ADMIN_BROADCAST_RESPONSES_ITEM_PREFIX,
+    ADMIN_FIND_PAGE_PREFIX,
+    ADMIN_REVIEW_OPEN_PREFIX,
+    build_admin_reviews_list_keyboard,
+)
+from app.features.admin.utils import edit_or_send, format_dt
+from app.services import callback_tokens, search
+
+router = Router()
+
+
+async def _open_callback(db_path, hit: dict) -> str:
+    token = await callback_tokens.encode(db_path, hit["id"])
+    if hit["source"] == "review":
+        return f"{ADMIN_REVIEW_OPEN_PREFIX}:{token}:1:y:-:1"
+    campaign_token = await callback_tokens.encode(db_path, hit["parent_id"])
+    return f"{ADMIN_BROADCAST_RESPONSES_ITEM_PREFIX}:{campaign_token}:1:{token}"
+
+
+async def _render(db_path, query: str, page: int):
+    hits, has_next = await search.find(db_path, query, page)
+    if not hits:
+        return None, None
+    lines = []
+    items = []
+    for index, hit in enumerate(hits, start=1 + (page - 1) * search.PAGE_SIZE):
+        created = format_dt(hit["created_at"])
+        lines.append(
+            texts.admin_find_hit(index, hit["source"], created, hit["user_id"], search.snippet_html(hit["snippet"]))
+        )
+        items.append((f"{index}. Открыть", await _open_callback(db_path, hit)))
+    query_token = await callback_tokens.encode(db_path, query)
+    markup = build_admin_reviews_list_keyboard(
+        items,
+        prev_callback=f"{ADMIN_FIND_PAGE_PREFIX}:{query_token}:{page - 1}" if page > 1 else None,
+        next_callback=f"{ADMIN_FIND_PAGE_PREFIX}:{query_token}:{page + 1}" if has_next else None,
+    )
+    return texts.admin_find_results(html.escape(query), page, lines), markup
+
+
+@router.message(Command("find"))
+async def handle_find_command(message: Message, state: FSMContext, command: CommandObject):
+    if not is_admin(message.bot, message.from_user.id):
+        await state.clear()
+        await message.answer(texts.admin_forbidden())
+        return
+    await state.clear()
+    query = (command.args or "").strip()
+    if not search.build_match(query):
+        await message.answer(texts.admin_find_usage())
+        return
+    text, markup = await _render(get_settings(message.bot).db_path, query, 1)
+    if text is None:
+        await message.answer(texts.admin_find_empty(html.escape(query)))
+        return
+    await message.answer(text, reply_markup=markup)
+
+
+@router.callback_query(F.data.startswith(f"{ADMIN_FIND_PAGE_PREFIX}:"))
+async def handle_find_page(callback: CallbackQuery, state: FSMContext):
+    if not is_admin(callback.bot, callback.from_user.id):
+        await callback.answer(texts.admin_forbidden(), show_alert=True)
+        return
+    await state.clear()
+    parts = (callback.data or "").split(":")
+    db_path = get_settings(callback.bot).db_path
+    query = await callback_tokens.decode(db_path, parts[2]) if len(parts) == 4 else None
+    if not query or not parts[3].isdigit():
+        await callback.answer(texts.invalid_choice(), show_alert=True)
+        return
+    text, markup = await _render(db_path, query, int(parts[3]))
+    if text is None:
+        await callback.answer(texts.invalid_choice(), show_alert=True)
+        return
+    await callback.answer()
+    await edit_or_send(callback, text, reply_markup=markup)
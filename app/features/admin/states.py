@@ -9,6 +9,10 @@ class AdminUpload(StatesGroup):
     file = State()
 
 
+class AdminArchiveImport(StatesGroup):
+    file = State()
+
+
 class AdminDelete(StatesGroup):
     kind = State()
     year = State()
@@ -20,3 +24,7 @@ class AdminDelete(StatesGroup):
 class AdminBroadcastCreate(StatesGroup):
     title = State()
     body = State()
+
+
+class AdminBroadcastSchedule(StatesGroup):
+    when = State()
@@ -1,30 +1,37 @@
+import datetime as dt
+
 from aiogram import F, Router
 from aiogram.fsm.context import FSMContext
-from aiogram.types import CallbackQuery
+from aiogram.types import BufferedInputFile, CallbackQuery, InputMediaPhoto
 
 from app.config import MONTH_NAMES_RU, SIGNS_RU
 from app import texts
 from app.features.admin.dependencies import get_settings, is_admin
 from app.features.admin.keyboards import (
     ADMIN_STATS_CALLBACK,
+    ADMIN_STATS_FUNNEL_PREFIX,
     ADMIN_STATS_KIND_PREFIX,
     ADMIN_STATS_MONTH_OPEN_PREFIX,
     ADMIN_STATS_MONTHS_PAGE_PREFIX,
+    ADMIN_STATS_TREND_PREFIX,
     ADMIN_STATS_YEAR_OPEN_PREFIX,
     ADMIN_STATS_YEARS_PAGE_PREFIX,
     build_admin_menu,
     build_admin_stats_kind_keyboard,
     build_admin_stats_month_detail_keyboard,
     build_admin_stats_months_keyboard,
+    build_admin_stats_trend_keyboard,
     build_admin_stats_year_detail_keyboard,
     build_admin_stats_years_keyboard,
 )
 from app.features.admin.keyboards import SIGN_EMOJI
 from app.features.admin.utils import edit_or_send
-from app.services import db, media
+from app.services import db, events, media, sales_chart
 
 router = Router()
 
+FUNNEL_PERIODS = (1, 7, 30)
+
 MONTHS_PAGE_SIZE = 8
 YEARS_PAGE_SIZE = 12
 
@@ -241,3 +248,64 @@ async def handle_admin_stats_year_open(callback: CallbackQuery, state: FSMContex
         "\n".join(lines),
         reply_markup=build_admin_stats_year_detail_keyboard(page=page),
     )
+
+
+@router.callback_query(F.data.startswith(f"{ADMIN_STATS_TREND_PREFIX}:"))
+async def handle_admin_stats_trend(callback: CallbackQuery, state: FSMContext):
+    if not is_admin(callback.bot, callback.from_user.id):
+        await callback.answer(texts.admin_forbidden(), show_alert=True)
+        return
+    await state.clear()
+
+    raw_days = (callback.data or "").split(":")[-1]
+    days = int(raw_days) if raw_days.isdigit() else 0
+    if days not in sales_chart.PERIODS:
+        await callback.answer(texts.invalid_choice(), show_alert=True)
+        return
+
+    settings = get_settings(callback.bot)
+    trend = await sales_chart.build_trend(settings.db_path, days)
+    markup = build_admin_stats_trend_keyboard(sales_chart.PERIODS, days)
+    await callback.answer()
+    if trend.png is None:
+        await edit_or_send(callback, texts.admin_stats_trend_empty(days), reply_markup=markup)
+        return
+
+    caption = texts.admin_stats_trend(days, trend.orders, trend.revenue_kopeks / 100)
+    photo = BufferedInputFile(trend.png, filename=f"sales-{days}d.png")
+    if callback.message and callback.message.photo:
+        await callback.message.edit_media(InputMediaPhoto(media=photo, caption=caption), reply_markup=markup)
+        return
+    if callback.message:
+        await callback.message.answer_photo(photo, caption=caption, reply_markup=markup)
+
+
+@router.callback_query(F.data.startswith(f"{ADMIN_STATS_FUNNEL_PREFIX}:"))
+async def handle_admin_stats_funnel(callback: CallbackQuery, state: FSMContext):
+    if not is_admin(callback.bot, callback.from_user.id):
+        await callback.answer(texts.admin_forbidden(), show_alert=True)
+        return
+    await state.clear()
+
+    raw_days = (callback.data or "").split(":")[-1]
+    days = int(raw_days) if raw_days.isdigit() else 0
+    if days not in FUNNEL_PERIODS:
+        await callback.answer(texts.invalid_choice(), show_alert=True)
+        return
+
+    settings = get_settings(callback.bot)
+    # Include what is still buffered in this process.
+    await events.flush()
+    now = dt.datetime.utcnow()
+    steps = await events.funnel(settings.db_path, now - dt.timedelta(days=days), now)
+    text = (
+        texts.admin_stats_funnel(days, steps)
+        if any(count for _, count, _ in steps)
+        else texts.admin_stats_funnel_empty(days)
+    )
+    await callback.answer()
+    await edit_or_send(
+        callback,
+        text,
+        reply_markup=build_admin_stats_trend_keyboard(FUNNEL_PERIODS, days, prefix=ADMIN_STATS_FUNNEL_PREFIX),
+    )
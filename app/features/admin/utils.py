@@ -63,22 +63,15 @@ def detect_extension(message: Message) -> Optional[str]:
     return None
 
 
-def destination_path(
-    kind: str,
-    media_dir: Path,
-    year: str,
-    sign: str,
-    extension: str,
-    month: str | None,
-    unique: str | None = None,
-) -> Path:
-    if kind == "year":
-        target_dir = media_dir / "year" / year / sign
-    else:
-        target_dir = media_dir / "month" / year / (month or "01") / sign
+INCOMING_DIRNAME = ".incoming"
+
+
+def incoming_path(media_dir: Path, extension: str, unique: str | None = None) -> Path:
+    """Temporary location for an upload until it is ingested into the blob store."""
+    target_dir = media_dir / INCOMING_DIRNAME
     target_dir.mkdir(parents=True, exist_ok=True)
     timestamp = dt.datetime.now().strftime("%Y%m%d%H%M%S")
-    base_name = f"{sign}-{timestamp}"
+    base_name = f"upload-{timestamp}"
     if unique:
         base_name = f"{base_name}-{unique}"
     destination = target_dir / f"{base_name}.{extension}"
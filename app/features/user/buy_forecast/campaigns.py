@@ -3,16 +3,16 @@ from aiogram.types import CallbackQuery
 
 from app import texts
 from app.features.user.dependencies import get_db_path
-from app.services import db
+from app.services import callback_tokens, db
 
 router = Router()
 
 
 @router.callback_query(F.data.startswith("campaign:interest:"))
 async def handle_campaign_interest(callback: CallbackQuery):
-    campaign_id = (callback.data or "").split(":", maxsplit=2)[-1]
     db_path = get_db_path(callback.bot)
-    campaign = await db.get_campaign(db_path, campaign_id)
+    campaign_id = await callback_tokens.decode(db_path, (callback.data or "").split(":", maxsplit=2)[-1])
+    campaign = await db.get_campaign(db_path, campaign_id) if campaign_id else None
     if not campaign:
         await callback.answer("Рассылка недоступна", show_alert=True)
         return
@@ -25,9 +25,9 @@ async def handle_campaign_interest(callback: CallbackQuery):
 
 @router.callback_query(F.data.startswith("campaign:decline:"))
 async def handle_campaign_decline(callback: CallbackQuery):
-    campaign_id = (callback.data or "").split(":", maxsplit=2)[-1]
     db_path = get_db_path(callback.bot)
-    campaign = await db.get_campaign(db_path, campaign_id)
+    campaign_id = await callback_tokens.decode(db_path, (callback.data or "").split(":", maxsplit=2)[-1])
+    campaign = await db.get_campaign(db_path, campaign_id) if campaign_id else None
     if not campaign:
         await callback.answer("Рассылка недоступна", show_alert=True)
         return
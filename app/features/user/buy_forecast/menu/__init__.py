@@ -4,9 +4,11 @@ from aiogram.types import Message
 
 from app import texts
 from app.menu_labels import BUY_FORECAST_LABEL
+from app.features.user.buy_forecast.screens import get_screens
 from app.features.user.dependencies import ensure_user, get_db_path, get_settings, is_admin
 from app.features.user.keyboards import build_layout_keyboard, build_start_keyboard
-from app.services import db, media, state_machine
+from app.services import db, media_io, state_machine
+from app.services.blocking import run_blocking
 from app.services.state_machine import UserState
 
 router = Router()
@@ -19,8 +21,12 @@ def build_user_start_markup(message: Message):
 
 async def show_catalog_menu(message: Message, *, show_empty_message: bool = True) -> None:
     settings = get_settings(message.bot)
-    year_years = media.available_yearly_years(settings.media_dir)
-    month_years = media.available_monthly_years(settings.media_dir)
+    screen = await run_blocking(get_screens(settings).layout)
+    if screen:
+        await message.answer(texts.choose_forecast_kind(), reply_markup=screen.reply_markup)
+        return
+    year_years = await media_io.available_yearly_years(settings.media_dir)
+    month_years = await media_io.available_monthly_years(settings.media_dir)
     if not year_years and not month_years:
         if show_empty_message:
             await message.answer(texts.no_content(), reply_markup=build_user_start_markup(message))
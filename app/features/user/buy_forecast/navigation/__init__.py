@@ -4,6 +4,7 @@ from aiogram import F, Router
 from aiogram.types import CallbackQuery, Message
 
 from app import texts
+from app.features.user.buy_forecast.screens import Screen, get_screens
 from app.features.user.dependencies import get_settings
 from app.features.user.keyboards import (
     build_layout_keyboard,
@@ -13,7 +14,8 @@ from app.features.user.keyboards import (
     build_year_signs_keyboard,
     build_years_keyboard,
 )
-from app.services import media
+from app.services import media, media_io
+from app.services.blocking import run_blocking
 from app.services.pricing import get_price_kopeks
 from app.services.parsing import (
     parse_layout_choice,
@@ -36,13 +38,26 @@ async def _edit_or_send(message: Message, text: str, reply_markup):
         await message.answer(text, reply_markup=reply_markup)
 
 
+async def _show(message: Message, screen: Screen) -> None:
+    await _edit_or_send(message, screen.text, reply_markup=screen.reply_markup)
+
+
 @router.callback_query(F.data.startswith("mode:"))
 async def handle_mode(callback: CallbackQuery):
     mode = parse_layout_choice(callback.data or "")
     await callback.answer()
     settings = get_settings(callback.bot)
-    year_years = media.available_yearly_years(settings.media_dir)
-    month_years = media.available_monthly_years(settings.media_dir)
+    screens = get_screens(settings)
+    screen = None
+    if mode == "year":
+        screen = await run_blocking(screens.year_years)
+    elif mode == "month":
+        screen = await run_blocking(screens.month_years)
+    if screen:
+        await _show(callback.message, screen)
+        return
+    year_years = await media_io.available_yearly_years(settings.media_dir)
+    month_years = await media_io.available_monthly_years(settings.media_dir)
     if mode == "year":
         if not year_years:
             await callback.message.answer(texts.year_section_empty())
@@ -64,8 +79,12 @@ async def handle_mode(callback: CallbackQuery):
 async def handle_back_mode(callback: CallbackQuery):
     await callback.answer()
     settings = get_settings(callback.bot)
-    year_years = media.available_yearly_years(settings.media_dir)
-    month_years = media.available_monthly_years(settings.media_dir)
+    screen = await run_blocking(get_screens(settings).layout)
+    if screen:
+        await _show(callback.message, screen)
+        return
+    year_years = await media_io.available_yearly_years(settings.media_dir)
+    month_years = await media_io.available_monthly_years(settings.media_dir)
     keyboard = build_layout_keyboard(has_year=bool(year_years), has_month=bool(month_years))
     await _edit_or_send(callback.message, texts.welcome(), reply_markup=keyboard)
 
@@ -78,15 +97,19 @@ async def handle_month_year(callback: CallbackQuery):
         await callback.message.answer(texts.invalid_year())
         return
     settings = get_settings(callback.bot)
-    years = media.available_monthly_years(settings.media_dir)
+    screen = await run_blocking(get_screens(settings).months, year)
+    if screen:
+        await _show(callback.message, screen)
+        return
+    years = await media_io.available_monthly_years(settings.media_dir)
     if year not in years:
         await callback.message.answer(texts.year_unavailable())
         return
-    months = media.months_for_year(settings.media_dir, year)
+    months = await media_io.months_for_year(settings.media_dir, year)
     if not months:
         await callback.message.answer(texts.months_missing())
         return
-    keyboard = build_months_keyboard(settings.media_dir, year, back="back:m-years")
+    keyboard = await run_blocking(build_months_keyboard, settings.media_dir, year, back="back:m-years")
     await _edit_or_send(callback.message, texts.year_prompt(year), reply_markup=keyboard)
 
 
@@ -94,7 +117,11 @@ async def handle_month_year(callback: CallbackQuery):
 async def handle_back_month_years(callback: CallbackQuery):
     await callback.answer()
     settings = get_settings(callback.bot)
-    month_years = media.available_monthly_years(settings.media_dir)
+    screen = await run_blocking(get_screens(settings).month_years)
+    if screen:
+        await _show(callback.message, screen)
+        return
+    month_years = await media_io.available_monthly_years(settings.media_dir)
     if not month_years:
         await callback.message.answer(texts.month_section_empty())
         return
@@ -111,18 +138,22 @@ async def handle_month(callback: CallbackQuery):
         return
     year = ym.split("-")[0]
     settings = get_settings(callback.bot)
+    screen = await run_blocking(get_screens(settings).month_signs, ym)
+    if screen:
+        await _show(callback.message, screen)
+        return
     media_dir = settings.media_dir
-    if year not in media.available_monthly_years(media_dir):
+    if year not in await media_io.available_monthly_years(media_dir):
         await callback.message.answer(texts.year_unavailable())
         return
-    if ym not in media.months_for_year(media_dir, year):
+    if ym not in await media_io.months_for_year(media_dir, year):
         await callback.message.answer(texts.month_unavailable())
         return
-    signs = media.available_month_signs(media_dir, ym)
+    signs = await media_io.available_month_signs(media_dir, ym)
     if not signs:
         await callback.message.answer(texts.month_content_missing())
         return
-    keyboard = build_month_signs_keyboard(media_dir, ym, back=f"back:m-months:{year}")
+    keyboard = await run_blocking(build_month_signs_keyboard, media_dir, ym, back=f"back:m-months:{year}")
     month_name = media.month_name_from_ym(ym) or "Месяц"
     await _edit_or_send(callback.message, texts.month_prompt(month_name, year), reply_markup=keyboard)
 
@@ -132,14 +163,18 @@ async def handle_back_months(callback: CallbackQuery):
     await callback.answer()
     year = (callback.data or "").split(":", maxsplit=2)[-1]
     settings = get_settings(callback.bot)
-    if year not in media.available_monthly_years(settings.media_dir):
+    screen = await run_blocking(get_screens(settings).months, year)
+    if screen:
+        await _show(callback.message, screen)
+        return
+    if year not in await media_io.available_monthly_years(settings.media_dir):
         await callback.message.answer(texts.year_unavailable())
         return
-    months = media.months_for_year(settings.media_dir, year)
+    months = await media_io.months_for_year(settings.media_dir, year)
     if not months:
         await callback.message.answer(texts.months_missing())
         return
-    keyboard = build_months_keyboard(settings.media_dir, year, back="back:m-years")
+    keyboard = await run_blocking(build_months_keyboard, settings.media_dir, year, back="back:m-years")
     await _edit_or_send(callback.message, texts.year_prompt(year), reply_markup=keyboard)
 
 
@@ -153,17 +188,21 @@ async def handle_month_sign(callback: CallbackQuery):
     ym, sign = parsed
     year = ym.split("-")[0]
     settings = get_settings(callback.bot)
+    screen = await run_blocking(get_screens(settings).month_price, ym, sign)
+    if screen:
+        await _show(callback.message, screen)
+        return
     media_dir = settings.media_dir
-    if year not in media.available_monthly_years(media_dir):
+    if year not in await media_io.available_monthly_years(media_dir):
         await callback.message.answer(texts.year_unavailable())
         return
-    if ym not in media.months_for_year(media_dir, year):
+    if ym not in await media_io.months_for_year(media_dir, year):
         await callback.message.answer(texts.month_unavailable())
         return
-    if sign not in media.available_month_signs(media_dir, ym):
+    if sign not in await media_io.available_month_signs(media_dir, ym):
         await callback.message.answer(texts.sign_unavailable())
         return
-    content_paths = media.find_month_content_paths(media_dir, ym, sign)
+    content_paths = await media_io.find_month_content_paths(media_dir, ym, sign)
     if not content_paths:
         await callback.message.answer(texts.content_missing())
         return
@@ -172,7 +211,7 @@ async def handle_month_sign(callback: CallbackQuery):
         await callback.message.answer(texts.invalid_product())
         return
     month_name = media.month_name_from_ym(ym) or ym
-    price_rub = get_price_kopeks("month", pricing_path=settings.pricing_path, ym=ym) / 100
+    price_rub = await run_blocking(get_price_kopeks, "month", pricing_path=settings.pricing_path, ym=ym) / 100
     text = texts.price_caption_month(month_name, ym.split("-")[0], sign, price_rub)
     back_cb = f"back:m-signs:{ym}"
     await _edit_or_send(callback.message, text, reply_markup=build_pay_keyboard(product_id, back=back_cb))
@@ -187,18 +226,22 @@ async def handle_back_month_signs(callback: CallbackQuery):
         await callback.message.answer(texts.invalid_month())
         return
     settings = get_settings(callback.bot)
+    screen = await run_blocking(get_screens(settings).month_signs, ym)
+    if screen:
+        await _show(callback.message, screen)
+        return
     media_dir = settings.media_dir
-    if year not in media.available_monthly_years(media_dir):
+    if year not in await media_io.available_monthly_years(media_dir):
         await callback.message.answer(texts.year_unavailable())
         return
-    if ym not in media.months_for_year(media_dir, year):
+    if ym not in await media_io.months_for_year(media_dir, year):
         await callback.message.answer(texts.month_unavailable())
         return
-    signs = media.available_month_signs(media_dir, ym)
+    signs = await media_io.available_month_signs(media_dir, ym)
     if not signs:
         await callback.message.answer(texts.month_content_missing())
         return
-    keyboard = build_month_signs_keyboard(media_dir, ym, back=f"back:m-months:{year}")
+    keyboard = await run_blocking(build_month_signs_keyboard, media_dir, ym, back=f"back:m-months:{year}")
     month_name = media.month_name_from_ym(ym) or "Месяц"
     await _edit_or_send(callback.message, texts.month_prompt(month_name, year), reply_markup=keyboard)
 
@@ -211,15 +254,19 @@ async def handle_year(callback: CallbackQuery):
         await callback.message.answer(texts.invalid_year())
         return
     settings = get_settings(callback.bot)
+    screen = await run_blocking(get_screens(settings).year_signs, year)
+    if screen:
+        await _show(callback.message, screen)
+        return
     media_dir = settings.media_dir
-    if year not in media.available_yearly_years(media_dir):
+    if year not in await media_io.available_yearly_years(media_dir):
         await callback.message.answer(texts.year_unavailable())
         return
-    signs = media.available_year_signs(media_dir, year)
+    signs = await media_io.available_year_signs(media_dir, year)
     if not signs:
         await callback.message.answer(texts.year_content_missing())
         return
-    keyboard = build_year_signs_keyboard(media_dir, year, back="back:y-years")
+    keyboard = await run_blocking(build_year_signs_keyboard, media_dir, year, back="back:y-years")
     await _edit_or_send(callback.message, texts.year_sign_prompt(year), reply_markup=keyboard)
 
 
@@ -227,7 +274,11 @@ async def handle_year(callback: CallbackQuery):
 async def handle_back_year_years(callback: CallbackQuery):
     await callback.answer()
     settings = get_settings(callback.bot)
-    year_years = media.available_yearly_years(settings.media_dir)
+    screen = await run_blocking(get_screens(settings).year_years)
+    if screen:
+        await _show(callback.message, screen)
+        return
+    year_years = await media_io.available_yearly_years(settings.media_dir)
     if not year_years:
         await callback.message.answer(texts.year_section_empty())
         return
@@ -244,14 +295,18 @@ async def handle_year_sign(callback: CallbackQuery):
         return
     year, sign = parsed
     settings = get_settings(callback.bot)
+    screen = await run_blocking(get_screens(settings).year_price, year, sign)
+    if screen:
+        await _show(callback.message, screen)
+        return
     media_dir = settings.media_dir
-    if year not in media.available_yearly_years(media_dir):
+    if year not in await media_io.available_yearly_years(media_dir):
         await callback.message.answer(texts.year_unavailable())
         return
-    if sign not in media.available_year_signs(media_dir, year):
+    if sign not in await media_io.available_year_signs(media_dir, year):
         await callback.message.answer(texts.sign_unavailable())
         return
-    content_paths = media.find_year_content_paths(media_dir, year, sign)
+    content_paths = await media_io.find_year_content_paths(media_dir, year, sign)
     if not content_paths:
         await callback.message.answer(texts.content_missing())
         return
@@ -259,7 +314,7 @@ async def handle_year_sign(callback: CallbackQuery):
     if not product_id:
         await callback.message.answer(texts.invalid_product())
         return
-    price_rub = get_price_kopeks("year", pricing_path=settings.pricing_path) / 100
+    price_rub = await run_blocking(get_price_kopeks, "year", pricing_path=settings.pricing_path) / 100
     text = texts.price_caption_year(year, sign, price_rub)
     back_cb = f"back:y-signs:{year}"
     await _edit_or_send(callback.message, text, reply_markup=build_pay_keyboard(product_id, back=back_cb))
@@ -270,13 +325,17 @@ async def handle_back_year_signs(callback: CallbackQuery):
     await callback.answer()
     year = (callback.data or "").split(":", maxsplit=2)[-1]
     settings = get_settings(callback.bot)
+    screen = await run_blocking(get_screens(settings).year_signs, year)
+    if screen:
+        await _show(callback.message, screen)
+        return
     media_dir = settings.media_dir
-    if year not in media.available_yearly_years(media_dir):
+    if year not in await media_io.available_yearly_years(media_dir):
         await callback.message.answer(texts.year_unavailable())
         return
-    signs = media.available_year_signs(media_dir, year)
+    signs = await media_io.available_year_signs(media_dir, year)
     if not signs:
         await callback.message.answer(texts.year_content_missing())
         return
-    keyboard = build_year_signs_keyboard(media_dir, year, back="back:y-years")
+    keyboard = await run_blocking(build_year_signs_keyboard, media_dir, year, back="back:y-years")
     await _edit_or_send(callback.message, texts.year_sign_prompt(year), reply_markup=keyboard)
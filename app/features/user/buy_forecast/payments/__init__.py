@@ -14,7 +14,8 @@ from app.features.user.keyboards import (
     build_review_cancel_keyboard,
 )
 from ..reviews import prompt_review
-from app.services import db, media, payments, state_machine
+from app.services import callback_tokens, db, events, media, media_io, payments, state_machine
+from app.services.blocking import run_blocking
 from app.services.messaging import send_contents, send_message_safe
 from app.services.payments import PaymentStatus
 from app.services.pricing import get_price_kopeks
@@ -73,6 +74,7 @@ async def send_invoice(
         currency=settings.currency,
         prices=prices,
     )
+    events.record(user_id, "invoice")
     logger.info("Invoice sent user=%s payload=%s", user_id, payload)
 
 
@@ -87,7 +89,8 @@ async def _start_payment_for_order(message: Message, *, product_id: str, order_i
     ym = None
     if parsed["kind"] == "month" and parsed["month"]:
         ym = f"{parsed['year']}-{parsed['month']}"
-    amount_kopeks = get_price_kopeks(
+    amount_kopeks = await run_blocking(
+        get_price_kopeks,
         parsed["kind"],
         pricing_path=get_settings(message.bot).pricing_path,
         ym=ym,
@@ -134,22 +137,22 @@ async def handle_pay(callback: CallbackQuery):
     content_paths: list[Path] = []
     if parsed["kind"] == "month" and parsed["month"]:
         ym = f"{parsed['year']}-{parsed['month']}"
-        if ym not in media.months_for_year(media_dir, parsed["year"]) or parsed["sign"] not in media.available_month_signs(media_dir, ym):
+        if ym not in await media_io.months_for_year(media_dir, parsed["year"]) or parsed["sign"] not in await media_io.available_month_signs(media_dir, ym):
             await callback.message.answer(texts.content_missing())
             return
-        content_paths = media.find_month_content_paths(media_dir, ym, parsed["sign"])
+        content_paths = await media_io.find_month_content_paths(media_dir, ym, parsed["sign"])
     else:
-        if parsed["year"] not in media.available_yearly_years(media_dir) or parsed["sign"] not in media.available_year_signs(media_dir, parsed["year"]):
+        if parsed["year"] not in await media_io.available_yearly_years(media_dir) or parsed["sign"] not in await media_io.available_year_signs(media_dir, parsed["year"]):
             await callback.message.answer(texts.content_missing())
             return
-        content_paths = media.find_year_content_paths(media_dir, parsed["year"], parsed["sign"])
+        content_paths = await media_io.find_year_content_paths(media_dir, parsed["year"], parsed["sign"])
     if not content_paths:
         await callback.message.answer(texts.content_missing())
         return
     ym = None
     if parsed["kind"] == "month" and parsed["month"]:
         ym = f"{parsed['year']}-{parsed['month']}"
-    amount_kopeks = get_price_kopeks(parsed["kind"], pricing_path=settings.pricing_path, ym=ym)
+    amount_kopeks = await run_blocking(get_price_kopeks, parsed["kind"], pricing_path=settings.pricing_path, ym=ym)
     order = await db.create_order(db_path, callback.from_user.id, product_id, amount_kopeks, settings.currency)
     try:
         await state_machine.set_order_initiated(db_path, callback.from_user.id, order["id"])
@@ -201,8 +204,9 @@ async def handle_pay(callback: CallbackQuery):
     )
     await callback.message.answer(
         texts.referral_prompt(),
-        reply_markup=build_referral_prompt_keyboard(order["id"]),
+        reply_markup=build_referral_prompt_keyboard(await callback_tokens.encode(db_path, order["id"])),
     )
+    events.record(callback.from_user.id, "referral_prompt")
 
 
 @router.callback_query(F.data.startswith("referral:"))
@@ -212,9 +216,10 @@ async def handle_referral_prompt(callback: CallbackQuery):
     if not parsed:
         await callback.message.answer(texts.invalid_choice())
         return
-    action, order_id = parsed
+    action, order_token = parsed
     db_path = get_db_path(callback.bot)
-    order = await db.get_order(db_path, order_id)
+    order_id = await callback_tokens.decode(db_path, order_token)
+    order = await db.get_order(db_path, order_id) if order_id else None
     if not order or order["user_id"] != callback.from_user.id:
         await callback.message.answer(texts.order_not_found())
         return
@@ -231,7 +236,7 @@ async def handle_referral_prompt(callback: CallbackQuery):
         await db.create_promocode_use(db_path, order_id, callback.from_user.id, "awaiting_code")
         await callback.message.answer(
             texts.referral_code_request(),
-            reply_markup=build_referral_skip_keyboard(order_id),
+            reply_markup=build_referral_skip_keyboard(order_token),
         )
         return
     if action == "skip":
@@ -273,20 +278,20 @@ async def handle_referral_code(message: Message):
     if not code:
         await message.answer(
             texts.referral_code_invalid(),
-            reply_markup=build_referral_skip_keyboard(pending["order_id"]),
+            reply_markup=build_referral_skip_keyboard(await callback_tokens.encode(db_path, pending["order_id"])),
         )
         return
     promo = await db.get_promocode_by_code(db_path, code)
     if not promo:
         await message.answer(
             texts.referral_code_invalid(),
-            reply_markup=build_referral_skip_keyboard(pending["order_id"]),
+            reply_markup=build_referral_skip_keyboard(await callback_tokens.encode(db_path, pending["order_id"])),
         )
         return
     if promo["user_id"] == message.from_user.id:
         await message.answer(
             texts.referral_code_self(),
-            reply_markup=build_referral_skip_keyboard(pending["order_id"]),
+            reply_markup=build_referral_skip_keyboard(await callback_tokens.encode(db_path, pending["order_id"])),
         )
         return
     await db.update_promocode_use(
@@ -325,6 +330,10 @@ async def handle_pre_checkout(query: PreCheckoutQuery):
         await query.answer(ok=False, error_message="Заказ недоступен.")
         logger.info("Pre-checkout rejected order not found user=%s payload=%s", query.from_user.id, query.invoice_payload)
         return
+    if order["status"] == "expired":
+        await query.answer(ok=False, error_message="Счёт устарел, оформите заказ заново.")
+        logger.info("Pre-checkout rejected order expired user=%s payload=%s", query.from_user.id, query.invoice_payload)
+        return
     product_id = (
         media.build_month_product_id(f"{product['year']}-{product['month']}", product["sign"])
         if product["kind"] == "month" and product["month"]
@@ -340,15 +349,15 @@ async def handle_pre_checkout(query: PreCheckoutQuery):
     if product["kind"] == "month" and product["month"]:
         ym = f"{product['year']}-{product['month']}"
         exists = (
-            ym in media.months_for_year(media_dir, product["year"])
-            and product["sign"] in media.available_month_signs(media_dir, ym)
-            and bool(media.find_month_content_paths(media_dir, ym, product["sign"]))
+            ym in await media_io.months_for_year(media_dir, product["year"])
+            and product["sign"] in await media_io.available_month_signs(media_dir, ym)
+            and bool(await media_io.find_month_content_paths(media_dir, ym, product["sign"]))
         )
     else:
         exists = (
-            product["year"] in media.available_yearly_years(media_dir)
-            and product["sign"] in media.available_year_signs(media_dir, product["year"])
-            and bool(media.find_year_content_paths(media_dir, product["year"], product["sign"]))
+            product["year"] in await media_io.available_yearly_years(media_dir)
+            and product["sign"] in await media_io.available_year_signs(media_dir, product["year"])
+            and bool(await media_io.find_year_content_paths(media_dir, product["year"], product["sign"]))
         )
     if not exists:
         await query.answer(ok=False, error_message="Контент недоступен.")
@@ -416,9 +425,9 @@ async def handle_successful_payment(message: Message):
     content_paths: list[Path] = []
     if product["kind"] == "month" and product["month"]:
         ym = f"{product['year']}-{product['month']}"
-        content_paths = media.find_month_content_paths(media_dir, ym, product["sign"])
+        content_paths = await media_io.find_month_content_paths(media_dir, ym, product["sign"])
     else:
-        content_paths = media.find_year_content_paths(media_dir, product["year"], product["sign"])
+        content_paths = await media_io.find_year_content_paths(media_dir, product["year"], product["sign"])
     if not content_paths:
         await message.answer(texts.file_missing_after_pay())
         return
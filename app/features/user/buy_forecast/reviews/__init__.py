@@ -13,7 +13,7 @@ from app.features.user.keyboards import (
     build_review_keyboard,
     remove_keyboard,
 )
-from app.services import db, media, state_machine
+from app.services import callback_tokens, db, media_io, state_machine
 from app.services.messaging import send_content, send_message_safe
 from app.services.state_machine import InvalidStateTransition, UserState
 
@@ -23,16 +23,17 @@ router = Router()
 
 
 async def prompt_review(bot, chat_id: int, order: dict) -> None:  # type: ignore[name-defined]
-    await send_message_safe(bot, chat_id, texts.review_prompt(), reply_markup=build_review_keyboard(order["id"]))
+    order_token = await callback_tokens.encode(get_db_path(bot), order["id"])
+    await send_message_safe(bot, chat_id, texts.review_prompt(), reply_markup=build_review_keyboard(order_token))
 
 
 @router.callback_query(F.data.startswith("review:start:"))
 async def handle_review_start(callback: CallbackQuery):
-    order_id = (callback.data or "").split(":", maxsplit=2)[-1]
     await callback.answer()
     db_path = get_db_path(callback.bot)
+    order_id = await callback_tokens.decode(db_path, (callback.data or "").split(":", maxsplit=2)[-1])
     user_state = await state_machine.get_user_state(db_path, callback.from_user.id)
-    if user_state != UserState.REVIEW_PENDING:
+    if not order_id or user_state != UserState.REVIEW_PENDING:
         await callback.message.answer(texts.review_expired())
         return
     user = await db.get_user(db_path, callback.from_user.id)
@@ -97,11 +98,11 @@ async def handle_review_contact_skip(message: Message):
 
 @router.callback_query(F.data.startswith("review:skip:"))
 async def handle_review_skip(callback: CallbackQuery):
-    order_id = (callback.data or "").split(":", maxsplit=2)[-1]
     await callback.answer()
     db_path = get_db_path(callback.bot)
+    order_id = await callback_tokens.decode(db_path, (callback.data or "").split(":", maxsplit=2)[-1])
     user_state = await state_machine.get_user_state(db_path, callback.from_user.id)
-    if user_state != UserState.REVIEW_PENDING:
+    if not order_id or user_state != UserState.REVIEW_PENDING:
         await callback.message.answer(texts.review_expired())
         return
     user = await db.get_user(db_path, callback.from_user.id)
@@ -168,7 +169,7 @@ async def handle_review_text(message: Message):
         )
     await db.mark_review_submitted(db_path, pending["order_id"], review_text)
     settings = get_settings(message.bot)
-    reward_path = media.find_photo_after_review(settings.photo_after_review_dir)
+    reward_path = await media_io.find_photo_after_review(settings.photo_after_review_dir)
     if reward_path:
         await send_content(message.bot, message.chat.id, reward_path, texts.review_reward_caption())
     try:
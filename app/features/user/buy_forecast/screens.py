@@ -0,0 +1,163 @@
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+from aiogram.types import InlineKeyboardMarkup
+
+from app import texts
+from app.config import Settings
+from app.features.user.keyboards import (
+    build_layout_keyboard,
+    build_month_signs_keyboard,
+    build_months_keyboard,
+    build_pay_keyboard,
+    build_year_signs_keyboard,
+    build_years_keyboard,
+)
+from app.services import media
+from app.services.pricing import get_price_kopeks, next_price_change, pricing_version
+
+# Nodes whose text includes a price; they also expire when pricing.json or a price window changes.
+_PRICED_NODES = {"month-price", "year-price"}
+
+
+@dataclass(frozen=True)
+class Screen:
+    text: str
+    reply_markup: InlineKeyboardMarkup
+
+
+class ScreenCache:
+    """
+    Rendered (text, reply_markup) pairs for the buy-forecast tree. Nodes are built
+    on first use; a catalog change drops every node, a pricing change or the start
+    or end of a price window drops only the price screens.
+    Unavailable nodes are not cached, handlers explain those themselves.
+    Lookups touch the disk, so handlers call them through `run_blocking`.
+    """
+
+    def __init__(self, media_dir: Path, pricing_path: Path) -> None:
+        self.media_dir = media_dir
+        self.pricing_path = pricing_path
+        self._screens: dict[tuple[str, ...], Screen] = {}
+        self._catalog_version: Optional[int] = None
+        self._pricing_version: Optional[int] = None
+        self._prices_expire_at = float("inf")
+        self._lock = threading.Lock()
+
+    def _sync(self) -> None:
+        catalog = media.catalog_version(self.media_dir)
+        if catalog != self._catalog_version:
+            self._screens.clear()
+            self._catalog_version = catalog
+        pricing = pricing_version(self.pricing_path)
+        if pricing != self._pricing_version or time.time() >= self._prices_expire_at:
+            for key in [key for key in self._screens if key[0] in _PRICED_NODES]:
+                del self._screens[key]
+            self._pricing_version = pricing
+            self._prices_expire_at = float("inf")
+
+    def _get(self, key: tuple[str, ...], build: Callable[[], Optional[Screen]]) -> Optional[Screen]:
+        with self._lock:
+            self._sync()
+            screen = self._screens.get(key)
+            if screen is None:
+                screen = build()
+                if screen is not None:
+                    self._screens[key] = screen
+                    if key[0] in _PRICED_NODES and self._prices_expire_at == float("inf"):
+                        boundary = next_price_change(self.pricing_path)
+                        if boundary is not None:
+                            self._prices_expire_at = boundary.timestamp()
+            return screen
+
+    def layout(self) -> Optional[Screen]:
+        def build() -> Optional[Screen]:
+            has_year = bool(media.available_yearly_years(self.media_dir))
+            has_month = bool(media.available_monthly_years(self.media_dir))
+            if not has_year and not has_month:
+                return None
+            return Screen(texts.welcome(), build_layout_keyboard(has_year=has_year, has_month=has_month))
+
+        return self._get(("layout",), build)
+
+    def month_years(self) -> Optional[Screen]:
+        def build() -> Optional[Screen]:
+            years = media.available_monthly_years(self.media_dir)
+            if not years:
+                return None
+            return Screen(texts.choose_monthly_year(), build_years_keyboard(years, prefix="m-year", back="back:mode"))
+
+        return self._get(("month-years",), build)
+
+    def year_years(self) -> Optional[Screen]:
+        def build() -> Optional[Screen]:
+            years = media.available_yearly_years(self.media_dir)
+            if not years:
+                return None
+            return Screen(texts.choose_yearly_year(), build_years_keyboard(years, prefix="y-year", back="back:mode"))
+
+        return self._get(("year-years",), build)
+
+    def months(self, year: str) -> Optional[Screen]:
+        def build() -> Optional[Screen]:
+            if not media.months_for_year(self.media_dir, year):
+                return None
+            return Screen(texts.year_prompt(year), build_months_keyboard(self.media_dir, year, back="back:m-years"))
+
+        return self._get(("months", year), build)
+
+    def month_signs(self, ym: str) -> Optional[Screen]:
+        def build() -> Optional[Screen]:
+            month_name = media.month_name_from_ym(ym)
+            if not month_name or not media.available_month_signs(self.media_dir, ym):
+                return None
+            year = ym.split("-")[0]
+            keyboard = build_month_signs_keyboard(self.media_dir, ym, back=f"back:m-months:{year}")
+            return Screen(texts.month_prompt(month_name, year), keyboard)
+
+        return self._get(("month-signs", ym), build)
+
+    def year_signs(self, year: str) -> Optional[Screen]:
+        def build() -> Optional[Screen]:
+            if not media.available_year_signs(self.media_dir, year):
+                return None
+            return Screen(texts.year_sign_prompt(year), build_year_signs_keyboard(self.media_dir, year, back="back:y-years"))
+
+        return self._get(("year-signs", year), build)
+
+    def month_price(self, ym: str, sign: str) -> Optional[Screen]:
+        def build() -> Optional[Screen]:
+            product_id = media.build_month_product_id(ym, sign)
+            month_name = media.month_name_from_ym(ym)
+            if not product_id or not month_name or not media.find_month_content_paths(self.media_dir, ym, sign):
+                return None
+            price_rub = get_price_kopeks("month", pricing_path=self.pricing_path, ym=ym) / 100
+            text = texts.price_caption_month(month_name, ym.split("-")[0], sign, price_rub)
+            return Screen(text, build_pay_keyboard(product_id, back=f"back:m-signs:{ym}"))
+
+        return self._get(("month-price", ym, sign), build)
+
+    def year_price(self, year: str, sign: str) -> Optional[Screen]:
+        def build() -> Optional[Screen]:
+            product_id = media.build_year_product_id(year, sign)
+            if not product_id or not media.find_year_content_paths(self.media_dir, year, sign):
+                return None
+            price_rub = get_price_kopeks("year", pricing_path=self.pricing_path) / 100
+            text = texts.price_caption_year(year, sign, price_rub)
+            return Screen(text, build_pay_keyboard(product_id, back=f"back:y-signs:{year}"))
+
+        return self._get(("year-price", year, sign), build)
+
+
+_CACHES: dict[tuple[Path, Path], ScreenCache] = {}
+
+
+def get_screens(settings: Settings) -> ScreenCache:
+    key = (settings.media_dir, settings.pricing_path)
+    cache = _CACHES.get(key)
+    if cache is None:
+        cache = _CACHES[key] = ScreenCache(settings.media_dir, settings.pricing_path)
+    return cache
@@ -1,4 +1,7 @@
+import threading
+from functools import wraps
 from pathlib import Path
+from typing import Callable
 
 from aiogram.types import (
     InlineKeyboardButton,
@@ -71,6 +74,38 @@ def build_years_keyboard(
     return builder.as_markup()
 
 
+_CATALOG_KEYBOARDS: dict[tuple, InlineKeyboardMarkup] = {}
+_CATALOG_KEYBOARDS_VERSION: dict[Path, int] = {}
+_CATALOG_KEYBOARDS_LOCK = threading.Lock()
+
+
+def _memoize_on_catalog(
+    builder: Callable[..., InlineKeyboardMarkup],
+) -> Callable[..., InlineKeyboardMarkup]:
+    """
+    Caches markups built from the media catalog until the catalog version changes.
+    The returned markup is shared between callers and must not be mutated.
+    Thread-safe, since handlers call the builders on the blocking I/O pool.
+    """
+
+    @wraps(builder)
+    def wrapper(media_dir: Path, key: str, back: str | None = None) -> InlineKeyboardMarkup:
+        with _CATALOG_KEYBOARDS_LOCK:
+            version = media.catalog_version(media_dir)
+            if _CATALOG_KEYBOARDS_VERSION.get(media_dir) != version:
+                for cache_key in [item for item in _CATALOG_KEYBOARDS if item[1] == media_dir]:
+                    del _CATALOG_KEYBOARDS[cache_key]
+                _CATALOG_KEYBOARDS_VERSION[media_dir] = version
+            cache_key = (builder.__name__, media_dir, key, back)
+            markup = _CATALOG_KEYBOARDS.get(cache_key)
+            if markup is None:
+                markup = _CATALOG_KEYBOARDS[cache_key] = builder(media_dir, key, back)
+            return markup
+
+    return wrapper
+
+
+@_memoize_on_catalog
 def build_months_keyboard(
     media_dir: Path, year: str, back: str | None = None
 ) -> InlineKeyboardMarkup:
@@ -86,6 +121,7 @@ def build_months_keyboard(
     return builder.as_markup()
 
 
+@_memoize_on_catalog
 def build_month_signs_keyboard(
     media_dir: Path, ym: str, back: str | None = None
 ) -> InlineKeyboardMarkup:
@@ -101,6 +137,7 @@ def build_month_signs_keyboard(
     return builder.as_markup()
 
 
+@_memoize_on_catalog
 def build_year_signs_keyboard(
     media_dir: Path, year: str, back: str | None = None
 ) -> InlineKeyboardMarkup:
@@ -127,37 +164,37 @@ def build_pay_keyboard(
     return InlineKeyboardMarkup(inline_keyboard=buttons)
 
 
-def build_referral_prompt_keyboard(order_id: str) -> InlineKeyboardMarkup:
+def build_referral_prompt_keyboard(order_token: str) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[
             [
-                InlineKeyboardButton(text="✅ Да", callback_data=f"referral:yes:{order_id}"),
-                InlineKeyboardButton(text="❌ Нет", callback_data=f"referral:no:{order_id}"),
+                InlineKeyboardButton(text="✅ Да", callback_data=f"referral:yes:{order_token}"),
+                InlineKeyboardButton(text="❌ Нет", callback_data=f"referral:no:{order_token}"),
             ],
         ]
     )
 
 
-def build_referral_skip_keyboard(order_id: str) -> InlineKeyboardMarkup:
+def build_referral_skip_keyboard(order_token: str) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[
             [
-                InlineKeyboardButton(text="⏭️ Пропустить", callback_data=f"referral:skip:{order_id}"),
+                InlineKeyboardButton(text="⏭️ Пропустить", callback_data=f"referral:skip:{order_token}"),
             ],
         ]
     )
 
 
-def build_review_keyboard(order_id: str) -> InlineKeyboardMarkup:
+def build_review_keyboard(order_token: str) -> InlineKeyboardMarkup:
     buttons = [
         [
             InlineKeyboardButton(
-                text="✍️ Оставить отзыв", callback_data=f"review:start:{order_id}"
+                text="✍️ Оставить отзыв", callback_data=f"review:start:{order_token}"
             )
         ],
         [
             InlineKeyboardButton(
-                text="⏭️ Пропустить", callback_data=f"review:skip:{order_id}"
+                text="⏭️ Пропустить", callback_data=f"review:skip:{order_token}"
             )
         ],
     ]
@@ -195,19 +232,19 @@ def remove_keyboard() -> ReplyKeyboardRemove:
     return ReplyKeyboardRemove()
 
 
-def build_campaign_interest_keyboard(campaign_id: str) -> InlineKeyboardMarkup:
+def build_campaign_interest_keyboard(campaign_token: str) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(
         inline_keyboard=[
             [
                 InlineKeyboardButton(
                     text="🔥 Мне интересно",
-                    callback_data=f"campaign:interest:{campaign_id}",
+                    callback_data=f"campaign:interest:{campaign_token}",
                 )
             ],
             [
                 InlineKeyboardButton(
                     text="🙅‍♀️ Не интересно",
-                    callback_data=f"campaign:decline:{campaign_id}",
+                    callback_data=f"campaign:decline:{campaign_token}",
                 )
             ],
         ]
@@ -64,6 +64,19 @@ class CampaignAudience(TypedDict):
     updated_at: str
 
 
+class CampaignSchedule(TypedDict):
+    campaign_id: str
+    segment: str
+    repeat: str
+    day_of_month: Optional[int]
+    time_of_day: Optional[str]
+    run_at: Optional[str]
+    spread_seconds: int
+    last_run_at: Optional[str]
+    created_at: str
+    running_since: Optional[str]
+
+
 class CampaignResponse(TypedDict):
     id: str
     campaign_id: str
@@ -93,3 +106,12 @@ class PromoCodeUse(TypedDict):
     status: str
     created_at: str
     applied_at: Optional[str]
+
+
+class SearchHit(TypedDict):
+    source: str
+    id: str
+    parent_id: str
+    user_id: int
+    snippet: str
+    created_at: str
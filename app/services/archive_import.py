@@ -0,0 +1,216 @@
+"""
+Bulk import of forecasts from a ZIP archive laid out like the media directory:
+
+    month/2026/04/leo/01.jpg    month/2026/04/leo.jpg
+    year/2027/aries/01.png      year/2027/aries.png
+
+A single wrapping folder (`forecasts/month/...`) is allowed. Entries are
+extracted one by one into a staging directory, then ingested into the blob
+store product by product. Everything here is blocking and meant to run on
+the I/O pool.
+"""
+
+import shutil
+import tempfile
+import zipfile
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path, PurePosixPath
+from typing import Optional
+
+from app.config import ALLOWED_EXTENSIONS, SIGNS_RU
+from app.services import blobstore, media
+
+MAX_ENTRIES = 1000
+MAX_FILE_BYTES = 50 * 1024 * 1024
+MAX_TOTAL_BYTES = 1024 * 1024 * 1024
+STAGING_DIRNAME = ".incoming"
+
+_COPY_CHUNK = 1024 * 1024
+# Entries that can't be read are skipped with a reason; the rest of the archive still imports.
+_UNREADABLE_ENTRY_ERRORS = (
+    (zipfile.BadZipFile, "corrupt"),
+    (zlib.error, "corrupt"),
+    (EOFError, "corrupt"),
+    (RuntimeError, "encrypted"),
+    (NotImplementedError, "compression"),
+)
+
+
+class ArchiveImportError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class StagedFile:
+    kind: str
+    year: str
+    month: Optional[str]
+    sign: str
+    path: Path
+    name: str
+
+    @property
+    def product(self) -> tuple[str, str, Optional[str], str]:
+        return (self.kind, self.year, self.month, self.sign)
+
+
+@dataclass
+class StagedArchive:
+    staging_dir: Path
+    files: list[StagedFile] = field(default_factory=list)
+    skipped: list[tuple[str, str]] = field(default_factory=list)
+
+
+@dataclass
+class ArchiveReport:
+    added: dict[tuple[str, str, Optional[str], str], int] = field(default_factory=dict)
+    duplicates: int = 0
+    skipped: list[tuple[str, str]] = field(default_factory=list)
+
+    @property
+    def added_files(self) -> int:
+        return sum(self.added.values())
+
+
+def parse_entry(name: str) -> tuple[Optional[tuple[str, str, Optional[str], str]], str]:
+    """
+    Maps an archive entry to (kind, year, month, sign). Returns (None, reason)
+    for entries that don't fit the layout; reason is one of
+    "layout", "year", "month", "sign", "extension".
+    """
+    parts = [part for part in PurePosixPath(name).parts if part not in ("", ".")]
+    if parts and parts[0] not in ("month", "year"):
+        parts = parts[1:]
+    if not parts or parts[0] not in ("month", "year") or ".." in parts:
+        return None, "layout"
+    extension = PurePosixPath(parts[-1]).suffix.lower().lstrip(".")
+    if extension not in ALLOWED_EXTENSIONS:
+        return None, "extension"
+    kind = parts[0]
+    if kind == "month":
+        if len(parts) not in (4, 5):
+            return None, "layout"
+        year, raw_month = parts[1], parts[2]
+        if not raw_month.isdigit() or not 1 <= int(raw_month) <= 12:
+            return None, "month"
+        month: Optional[str] = f"{int(raw_month):02d}"
+        sign_part = parts[3] if len(parts) == 5 else PurePosixPath(parts[3]).stem
+    else:
+        if len(parts) not in (3, 4):
+            return None, "layout"
+        year, month = parts[1], None
+        sign_part = parts[2] if len(parts) == 4 else PurePosixPath(parts[2]).stem
+    if not media.is_valid_year(year):
+        return None, "year"
+    sign = sign_part.lower()
+    if sign not in SIGNS_RU:
+        return None, "sign"
+    return (kind, year, month, sign), ""
+
+
+def _is_ignored(info: zipfile.ZipInfo) -> bool:
+    if info.is_dir():
+        return True
+    parts = PurePosixPath(info.filename).parts
+    return any(part == "__MACOSX" or part.startswith(".") for part in parts)
+
+
+def _extract(archive: zipfile.ZipFile, info: zipfile.ZipInfo, target: Path, budget: int) -> int:
+    """Streams one entry to disk, counting real bytes rather than trusting the header."""
+    written = 0
+    with archive.open(info) as source, target.open("wb") as handle:
+        for chunk in iter(lambda: source.read(_COPY_CHUNK), b""):
+            written += len(chunk)
+            if written > MAX_FILE_BYTES or written > budget:
+                raise ArchiveImportError(f"entry too large: {info.filename}")
+            handle.write(chunk)
+    return written
+
+
+def _unreadable_reason(exc: BaseException) -> str:
+    return next(reason for error, reason in _UNREADABLE_ENTRY_ERRORS if isinstance(exc, error))
+
+
+def stage_archive(media_dir: Path, archive_path: Path) -> StagedArchive:
+    """
+    Validates and extracts the archive into a staging directory under
+    `<media_dir>/.incoming/`. Nothing is visible to buyers until `commit_archive`.
+    """
+    try:
+        archive = zipfile.ZipFile(archive_path)
+    except (zipfile.BadZipFile, OSError) as exc:
+        raise ArchiveImportError(f"not a zip archive: {archive_path.name}") from exc
+    staging_root = media_dir / STAGING_DIRNAME
+    staging_root.mkdir(parents=True, exist_ok=True)
+    staged = StagedArchive(Path(tempfile.mkdtemp(prefix="archive-", dir=staging_root)))
+    try:
+        with archive:
+            entries = [info for info in archive.infolist() if not _is_ignored(info)]
+            if len(entries) > MAX_ENTRIES:
+                raise ArchiveImportError(f"too many entries: {len(entries)}")
+            budget = MAX_TOTAL_BYTES
+            for index, info in enumerate(sorted(entries, key=lambda item: item.filename)):
+                product, reason = parse_entry(info.filename)
+                if product is None:
+                    staged.skipped.append((info.filename, reason))
+                    continue
+                if info.file_size > MAX_FILE_BYTES:
+                    staged.skipped.append((info.filename, "size"))
+                    continue
+                kind, year, month, sign = product
+                suffix = PurePosixPath(info.filename).suffix.lower()
+                target = staged.staging_dir / f"{index:05d}{suffix}"
+                try:
+                    budget -= _extract(archive, info, target, budget)
+                except ArchiveImportError:
+                    raise
+                except OSError as exc:
+                    raise ArchiveImportError(f"cannot stage {info.filename}: {exc}") from exc
+                except tuple(error for error, _ in _UNREADABLE_ENTRY_ERRORS) as exc:
+                    target.unlink(missing_ok=True)
+                    staged.skipped.append((info.filename, _unreadable_reason(exc)))
+                    continue
+                staged.files.append(StagedFile(kind, year, month, sign, target, PurePosixPath(info.filename).name))
+    except Exception:
+        discard(staged)
+        raise
+    return staged
+
+
+def commit_archive(media_dir: Path, staged: StagedArchive) -> ArchiveReport:
+    """
+    Ingests staged files product by product, keeping the archive order within
+    each. Raises ArchiveImportError if the media directory can't be written;
+    products ingested before the failure stay.
+    """
+    report = ArchiveReport(skipped=list(staged.skipped))
+    grouped: dict[tuple[str, str, Optional[str], str], list[StagedFile]] = defaultdict(list)
+    for staged_file in staged.files:
+        grouped[staged_file.product].append(staged_file)
+    try:
+        for product, files in grouped.items():
+            kind, year, month, sign = product
+            result = blobstore.ingest(
+                media_dir,
+                media.product_dir(media_dir, kind, year, sign, month),
+                [
+                    blobstore.IngestItem(item.path, original=media.original_path(item.path), name=item.name)
+                    for item in files
+                ],
+            )
+            report.duplicates += result.duplicates
+            if result.added:
+                report.added[product] = len(result.added)
+    except OSError as exc:
+        raise ArchiveImportError(f"cannot store files: {exc}") from exc
+    finally:
+        discard(staged)
+        if report.added:
+            media.invalidate_catalog(media_dir)
+    return report
+
+
+def discard(staged: StagedArchive) -> None:
+    shutil.rmtree(staged.staging_dir, ignore_errors=True)
@@ -0,0 +1,67 @@
+"""
+Moves cold history out of the live database. Dead orders (expired/failed),
+payments and delivered or failed audience rows older than ARCHIVE_AFTER_DAYS
+go to a separate SQLite file (ARCHIVE_DB_PATH) that is attached only while
+rows are moved or an admin report asks for history. Paid orders, daily_sales
+and promo code counters never leave the live database, so sales reports,
+segments and referral counts are unaffected.
+"""
+
+import asyncio
+import datetime as dt
+import logging
+import time
+from pathlib import Path
+from typing import Optional
+
+import aiosqlite
+
+from app.config import Settings
+from app.services import db
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+INTERVAL_SECONDS = 24 * 60 * 60
+
+
+async def archive(
+    db_path: Path,
+    archive_path: Path,
+    horizon: dt.timedelta,
+    now: Optional[dt.datetime] = None,
+) -> dict[str, int]:
+    """Moves every row older than `horizon`, batch by batch. Returns rows moved per table."""
+    before = ((now or dt.datetime.utcnow()) - horizon).isoformat()
+    await db.init_archive_db(archive_path)
+    moved: dict[str, int] = {}
+    for table in db.ARCHIVE_TABLES:
+        moved[table] = 0
+        while True:
+            count = await db.archive_rows(db_path, archive_path, table, before=before, limit=BATCH_SIZE)
+            moved[table] += count
+            if count < BATCH_SIZE:
+                break
+            await asyncio.sleep(0)
+    return moved
+
+
+async def run_archiver(settings: Settings) -> None:
+    if not settings.archive_after_days:
+        return
+    horizon = dt.timedelta(days=settings.archive_after_days)
+    while True:
+        started_at = time.monotonic()
+        try:
+            moved = await archive(settings.db_path, settings.archive_db_path, horizon)
+        except aiosqlite.Error:
+            logger.exception("Archiving failed")
+        else:
+            logger.info(
+                "Archiving done orders=%s payments=%s campaign_audience=%s duration=%.2fs",
+                moved["orders"],
+                moved["payments"],
+                moved["campaign_audience"],
+                time.monotonic() - started_at,
+            )
+        await asyncio.sleep(INTERVAL_SECONDS)
@@ -0,0 +1,172 @@
+"""
+Online backups of the bot database. The copy is made with SQLite's backup API
+a few hundred pages at a time with a pause between steps, on the aiosqlite
+connection thread, so handlers keep reading and writing meanwhile. Every
+snapshot is checked with `PRAGMA integrity_check` and gzip-compressed on the
+I/O pool, then the oldest snapshots beyond BACKUP_KEEP are removed. The newest
+file in BACKUP_DIR is the last successful backup, which every process can see.
+"""
+
+import asyncio
+import datetime as dt
+import gzip
+import logging
+import shutil
+import sqlite3
+import time
+import uuid
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+import aiosqlite
+
+from app.config import Settings
+from app.services.blocking import run_blocking
+
+logger = logging.getLogger(__name__)
+
+PAGES_PER_STEP = 256
+STEP_SLEEP_SECONDS = 0.05
+SNAPSHOT_PREFIX = "bot-"
+SNAPSHOT_SUFFIX = ".sqlite3.gz"
+_STAMP_FORMAT = "%Y%m%d-%H%M%S"
+_STAMP_LENGTH = len("20260101-000000")
+# Temp files of a run in progress are rewritten every backup step, so anything
+# untouched for this long was left by a process killed mid-copy.
+STALE_TEMP_SECONDS = 60 * 60
+_TEMP_SUFFIXES = (".tmp", ".part")
+
+
+class BackupError(Exception):
+    pass
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    path: Path
+    created_at: dt.datetime
+    size: int
+
+
+def _snapshot_name(now: dt.datetime) -> str:
+    # The random tag keeps a /backup and the periodic run started in the same
+    # second (possibly in different worker processes) off each other's files.
+    return f"{SNAPSHOT_PREFIX}{now.strftime(_STAMP_FORMAT)}-{uuid.uuid4().hex[:6]}{SNAPSHOT_SUFFIX}"
+
+
+def _parse_snapshot(path: Path) -> Optional[Snapshot]:
+    name = path.name
+    if not (name.startswith(SNAPSHOT_PREFIX) and name.endswith(SNAPSHOT_SUFFIX)):
+        return None
+    # `bot-<stamp>-<tag>`; snapshots taken before the tag was added have none.
+    body = name[len(SNAPSHOT_PREFIX) : -len(SNAPSHOT_SUFFIX)]
+    stamp, tag = body[:_STAMP_LENGTH], body[_STAMP_LENGTH:]
+    if tag and not tag.startswith("-"):
+        return None
+    try:
+        created_at = dt.datetime.strptime(stamp, _STAMP_FORMAT)
+        size = path.stat().st_size
+    except (ValueError, OSError):
+        return None
+    return Snapshot(path, created_at, size)
+
+
+def list_snapshots(backup_dir: Path) -> list[Snapshot]:
+    """Snapshots in `backup_dir`, newest first. Blocking."""
+    if not backup_dir.is_dir():
+        return []
+    snapshots = [snapshot for path in backup_dir.iterdir() if (snapshot := _parse_snapshot(path))]
+    return sorted(snapshots, key=lambda snapshot: (snapshot.created_at, snapshot.path.name), reverse=True)
+
+
+async def last_success(backup_dir: Path) -> Optional[Snapshot]:
+    snapshots = await run_blocking(list_snapshots, backup_dir)
+    return snapshots[0] if snapshots else None
+
+
+def _verify_and_compress(raw: Path, target: Path) -> None:
+    conn = sqlite3.connect(raw)
+    try:
+        result = conn.execute("PRAGMA integrity_check").fetchall()
+    finally:
+        conn.close()
+    if result != [("ok",)]:
+        raise BackupError(f"integrity_check failed: {result[:5]}")
+    partial = target.with_name(target.name + ".part")
+    with raw.open("rb") as source, gzip.open(partial, "wb", compresslevel=6) as compressed:
+        shutil.copyfileobj(source, compressed, length=1024 * 1024)
+    partial.replace(target)
+
+
+def _stale_temp_files(backup_dir: Path) -> list[Path]:
+    horizon = time.time() - STALE_TEMP_SECONDS
+    stale = []
+    for path in backup_dir.iterdir():
+        if not path.name.endswith(_TEMP_SUFFIXES) or SNAPSHOT_PREFIX not in path.name:
+            continue
+        try:
+            if path.stat().st_mtime < horizon:
+                stale.append(path)
+        except OSError:
+            continue
+    return stale
+
+
+def _rotate(backup_dir: Path, keep: int) -> list[Path]:
+    """Removes snapshots beyond `keep` and stale temp files. Blocking."""
+    removed = [snapshot.path for snapshot in list_snapshots(backup_dir)[keep:]]
+    removed += _stale_temp_files(backup_dir)
+    for path in removed:
+        path.unlink(missing_ok=True)
+    return removed
+
+
+async def create_backup(
+    db_path: Path,
+    backup_dir: Path,
+    *,
+    keep: int,
+    now: Optional[dt.datetime] = None,
+) -> Snapshot:
+    """Takes, verifies and stores one snapshot. Raises BackupError or aiosqlite.Error."""
+    now = now or dt.datetime.utcnow()
+    await run_blocking(backup_dir.mkdir, parents=True, exist_ok=True)
+    target = backup_dir / _snapshot_name(now)
+    raw = backup_dir / f".{target.name}.{uuid.uuid4().hex}.tmp"
+    started_at = time.monotonic()
+    try:
+        # The copy is written from the source connection's thread.
+        copy = await run_blocking(sqlite3.connect, raw, check_same_thread=False)
+        try:
+            async with aiosqlite.connect(db_path) as source:
+                await source.backup(copy, pages=PAGES_PER_STEP, sleep=STEP_SLEEP_SECONDS)
+        finally:
+            copy.close()
+        await run_blocking(_verify_and_compress, raw, target)
+    finally:
+        await run_blocking(raw.unlink, missing_ok=True)
+    removed = await run_blocking(_rotate, backup_dir, keep)
+    snapshot = await run_blocking(_parse_snapshot, target)
+    if snapshot is None:
+        raise BackupError(f"snapshot missing after backup: {target}")
+    logger.info(
+        "Backup done path=%s size=%s removed=%s duration=%.2fs",
+        target,
+        snapshot.size,
+        len(removed),
+        time.monotonic() - started_at,
+    )
+    return snapshot
+
+
+async def run_backups(settings: Settings) -> None:
+    if not settings.backup_interval_hours:
+        return
+    interval = settings.backup_interval_hours * 60 * 60
+    while True:
+        try:
+            await create_backup(settings.db_path, settings.backup_dir, keep=settings.backup_keep)
+        except (BackupError, aiosqlite.Error, OSError):
+            logger.exception("Backup failed")
+        await asyncio.sleep(interval)
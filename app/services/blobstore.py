@@ -0,0 +1,187 @@
+"""
+Content-addressed storage for forecast files.
+
+Files live once under `<media_dir>/blobs/<sha256>.<ext>`; every product (a sign
+directory such as `month/2026/04/leo/`) lists its files in `manifest.json`, in
+delivery order. Uploads are deduplicated per product by the hash of the
+uploaded bytes, so sending the same image twice doesn't deliver it twice.
+All functions here are blocking and meant to run on the I/O pool.
+"""
+
+import datetime as dt
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows: only the in-process lock applies
+    fcntl = None
+
+BLOBS_DIRNAME = "blobs"
+MANIFEST_NAME = "manifest.json"
+LOCK_NAME = ".blobstore.lock"
+
+_CHUNK_SIZE = 1024 * 1024
+# Ingest, drop and garbage collection are rare admin operations; one lock keeps a
+# collection from deleting a blob that an ingest has stored but not yet listed.
+# The thread lock covers the I/O pool, the flock on LOCK_NAME covers the other
+# worker processes (WORKERS > 1) sharing the media directory.
+_store_lock = threading.RLock()
+
+
+@dataclass(frozen=True)
+class IngestItem:
+    path: Path
+    original: Optional[Path] = None
+    name: Optional[str] = None
+
+
+@dataclass
+class IngestResult:
+    added: list[Path] = field(default_factory=list)
+    duplicates: int = 0
+
+
+@contextmanager
+def _locked(media_dir: Path) -> Iterator[None]:
+    with _store_lock:
+        if fcntl is None:
+            yield
+            return
+        media_dir.mkdir(parents=True, exist_ok=True)
+        with (media_dir / LOCK_NAME).open("a") as handle:
+            fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(handle, fcntl.LOCK_UN)
+
+
+def blobs_dir(media_dir: Path) -> Path:
+    return media_dir / BLOBS_DIRNAME
+
+
+def manifest_path(product_dir: Path) -> Path:
+    return product_dir / MANIFEST_NAME
+
+
+def file_sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb") as handle:
+        for chunk in iter(lambda: handle.read(_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_manifest(product_dir: Path) -> list[dict[str, Any]]:
+    try:
+        with manifest_path(product_dir).open("r", encoding="utf-8") as handle:
+            data = json.load(handle)
+    except FileNotFoundError:
+        return []
+    return list(data.get("items") or [])
+
+
+def _write_manifest(product_dir: Path, items: list[dict[str, Any]]) -> None:
+    target = manifest_path(product_dir)
+    if not items:
+        target.unlink(missing_ok=True)
+        return
+    product_dir.mkdir(parents=True, exist_ok=True)
+    tmp_path = target.with_name(f".{target.name}.tmp")
+    with tmp_path.open("w", encoding="utf-8") as handle:
+        json.dump({"items": items}, handle, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, target)
+
+
+def _store_blob(media_dir: Path, path: Path) -> str:
+    digest = file_sha256(path)
+    name = f"{digest}{path.suffix.lower()}"
+    target = blobs_dir(media_dir) / name
+    if target.exists():
+        path.unlink()
+    else:
+        target.parent.mkdir(parents=True, exist_ok=True)
+        os.replace(path, target)
+    return name
+
+
+def resolve_paths(media_dir: Path, product_dir: Path) -> list[Path]:
+    paths: list[Path] = []
+    for item in read_manifest(product_dir):
+        blob = blobs_dir(media_dir) / item["blob"]
+        if blob.is_file():
+            paths.append(blob)
+    return paths
+
+
+def ingest(media_dir: Path, product_dir: Path, items: list[IngestItem]) -> IngestResult:
+    """
+    Moves uploaded files into the blob store and appends them to the product
+    manifest in the given order. The manifest is replaced atomically once per call.
+    """
+    result = IngestResult()
+    with _locked(media_dir):
+        entries = read_manifest(product_dir)
+        known_sources = {entry.get("source_sha256") for entry in entries}
+        for item in items:
+            source = item.original if item.original and item.original.is_file() else item.path
+            source_sha256 = file_sha256(source)
+            if source_sha256 in known_sources:
+                result.duplicates += 1
+                item.path.unlink(missing_ok=True)
+                if item.original:
+                    item.original.unlink(missing_ok=True)
+                continue
+            blob = _store_blob(media_dir, item.path)
+            original_blob = None
+            if item.original and item.original.is_file():
+                original_blob = _store_blob(media_dir, item.original)
+            entries.append(
+                {
+                    "blob": blob,
+                    "original": original_blob,
+                    "source_sha256": source_sha256,
+                    "name": item.name or item.path.name,
+                    "added_at": dt.datetime.now(dt.timezone.utc).isoformat(timespec="seconds"),
+                }
+            )
+            known_sources.add(source_sha256)
+            result.added.append(blobs_dir(media_dir) / blob)
+        _write_manifest(product_dir, entries)
+    return result
+
+
+def drop_product(media_dir: Path, product_dir: Path) -> bool:
+    with _locked(media_dir):
+        target = manifest_path(product_dir)
+        if not target.exists():
+            return False
+        target.unlink()
+        return True
+
+
+def collect_garbage(media_dir: Path) -> int:
+    """Deletes blobs no manifest refers to. Returns the number of removed files."""
+    root = blobs_dir(media_dir)
+    if not root.is_dir():
+        return 0
+    with _locked(media_dir):
+        referenced: set[str] = set()
+        for manifest in media_dir.glob(f"*/**/{MANIFEST_NAME}"):
+            for entry in read_manifest(manifest.parent):
+                referenced.add(entry["blob"])
+                if entry.get("original"):
+                    referenced.add(entry["original"])
+        removed = 0
+        for blob in root.iterdir():
+            if blob.is_file() and blob.name not in referenced:
+                blob.unlink()
+                removed += 1
+    return removed
@@ -0,0 +1,52 @@
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional, TypeVar
+
+from app.config import Settings
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+DEFAULT_MAX_WORKERS = 4
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def configure_executor(max_workers: int) -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+    _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="blocking-io")
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    if _executor is None:
+        configure_executor(DEFAULT_MAX_WORKERS)
+    return _executor
+
+
+async def run_blocking(func: Callable[..., T], /, *args, **kwargs) -> T:
+    """
+    Runs filesystem or other blocking work on the bounded I/O pool. When the pool is
+    busy calls wait in its queue instead of spawning more threads.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
+
+
+def setup_blocking_io(settings: Settings) -> None:
+    """
+    Sizes the I/O pool and, if SLOW_CALLBACK_MS is set, turns on asyncio debug mode so that
+    every callback holding the loop longer than that is logged by the `asyncio` logger.
+    Must be called from inside the running loop.
+    """
+    configure_executor(settings.blocking_io_threads)
+    if settings.slow_callback_ms:
+        loop = asyncio.get_running_loop()
+        loop.set_debug(True)
+        loop.slow_callback_duration = settings.slow_callback_ms / 1000
+        logging.getLogger("asyncio").setLevel(logging.WARNING)
+        logger.info("Slow callback detection enabled threshold=%sms", settings.slow_callback_ms)
@@ -0,0 +1,185 @@
+"""
+Sends a campaign to its audience. Used by the admin launch button and by the
+scheduler. Messages go out one by one with a pause, which can be stretched so
+that a large audience is spread over a time window instead of hitting
+Telegram in one burst.
+"""
+
+import asyncio
+import datetime as dt
+import logging
+import time
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramForbiddenError
+
+from app import texts
+from app.config import MONTH_NAMES_RU
+from app.models import Campaign
+from app.services import db, reachability, segments
+from app.services.messaging import send_with_retry
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DELAY_SECONDS = 0.5
+NEXT_MONTH_PLACEHOLDER = "{next_month}"
+
+
+def spread_delay(total: int, spread_seconds: int) -> float:
+    """
+    Pause between messages so that `total` sends take about `spread_seconds`,
+    but never shorter than DEFAULT_DELAY_SECONDS.
+    """
+    if total <= 0 or spread_seconds <= 0:
+        return DEFAULT_DELAY_SECONDS
+    return max(DEFAULT_DELAY_SECONDS, spread_seconds / total)
+
+
+def estimated_duration(total: int, spread_seconds: int) -> dt.timedelta:
+    """Sending time for `total` users: the spread, or longer if it needs pauses under DEFAULT_DELAY_SECONDS."""
+    return dt.timedelta(seconds=total * spread_delay(total, spread_seconds))
+
+
+def render_body(body: str, now: Optional[dt.datetime] = None) -> str:
+    if NEXT_MONTH_PLACEHOLDER not in body:
+        return body
+    now = now or dt.datetime.utcnow()
+    year, month = (now.year + 1, 1) if now.month == 12 else (now.year, now.month + 1)
+    return body.replace(NEXT_MONTH_PLACEHOLDER, f"{MONTH_NAMES_RU[month]} {year}")
+
+
+async def prepare(
+    db_path: Path,
+    campaign_id: str,
+    segment: segments.Segment,
+    *,
+    launch_id: Optional[str] = None,
+) -> tuple[str, int]:
+    """
+    Tags the segment's users in the campaign audience with a launch id (a new
+    one unless `launch_id` is given, which makes a resumed run reuse its own).
+    Returns (launch id, users that will be messaged); audience rows of other
+    segments are not part of the launch.
+    """
+    launch_id = launch_id or uuid.uuid4().hex
+    total = await db.add_segment_to_campaign_audience(db_path, campaign_id, segment, launch_id)
+    return launch_id, total
+
+
+async def send_campaign(
+    bot: Bot,
+    db_path: Path,
+    campaign: Campaign,
+    *,
+    launch_id: str,
+    total: int,
+    delay_seconds: float = DEFAULT_DELAY_SECONDS,
+    label: str = "",
+    now: Optional[dt.datetime] = None,
+) -> tuple[int, int]:
+    """Sends the campaign to the pending rows of launch `launch_id`. Returns (sent, failed)."""
+    campaign_id = campaign["id"]
+    text = texts.campaign_offer(render_body(campaign["body"], now))
+    sent = failed = 0
+    started_at = time.monotonic()
+    logger.info(
+        "Broadcast start campaign_id=%s segment=%s audience=%s delay=%.2fs",
+        campaign_id,
+        label,
+        total,
+        delay_seconds,
+    )
+
+    index = 0
+    async for row in db.iter_campaign_audience(db_path, campaign_id, launch_id=launch_id):
+        index += 1
+        user_id = row["user_id"]
+        try:
+            msg = await send_with_retry(lambda: bot.send_message(user_id, text))
+
+            message_id = getattr(msg, "message_id", None)
+
+            if message_id is not None:
+                sent += 1
+                await reachability.record_success(user_id)
+                await db.update_campaign_audience_status(
+                    db_path,
+                    campaign_id,
+                    user_id,
+                    "sent",
+                    message_id=message_id,
+                )
+                logger.info(
+                    "Broadcast sent user_id=%s campaign_id=%s message_id=%s index=%s/%s",
+                    user_id,
+                    campaign_id,
+                    message_id,
+                    index,
+                    total,
+                )
+            else:
+                failed += 1
+                await db.update_campaign_audience_status(
+                    db_path,
+                    campaign_id,
+                    user_id,
+                    "failed",
+                    error="Delivery failed",
+                )
+                logger.warning(
+                    "Broadcast failed user_id=%s campaign_id=%s reason=no_message_id index=%s/%s",
+                    user_id,
+                    campaign_id,
+                    index,
+                    total,
+                )
+
+        except TelegramForbiddenError as exc:
+            failed += 1
+            await db.update_campaign_audience_status(
+                db_path,
+                campaign_id,
+                user_id,
+                "failed",
+                error=segments.BLOCKED_ERROR,
+            )
+            await reachability.record_failure(user_id, exc)
+            logger.warning(
+                "Broadcast blocked user_id=%s campaign_id=%s index=%s/%s",
+                user_id,
+                campaign_id,
+                index,
+                total,
+            )
+        except Exception as exc:
+            logger.exception(
+                "Campaign send failed user_id=%s campaign_id=%s",
+                user_id,
+                campaign_id,
+            )
+            failed += 1
+            await db.update_campaign_audience_status(
+                db_path,
+                campaign_id,
+                user_id,
+                "failed",
+                error=str(exc),
+            )
+            await reachability.record_failure(user_id, exc)
+
+        await asyncio.sleep(delay_seconds)
+
+    final_stats = await db.fetch_campaign_audience_stats(db_path, campaign_id)
+    logger.info(
+        "Broadcast finished campaign_id=%s sent=%s failed=%s interested=%s declined=%s duration=%.2fs",
+        campaign_id,
+        sent,
+        failed,
+        final_stats.get("interested", 0),
+        final_stats.get("declined", 0),
+        time.monotonic() - started_at,
+    )
+    return sent, failed
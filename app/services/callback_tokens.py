@@ -0,0 +1,101 @@
+"""
+Short ids for long values (UUIDs) embedded into callback_data.
+
+Telegram limits callback_data to 64 bytes, and an order or campaign UUID alone
+takes 36. `encode` maps a value to a short token derived from its hash and
+stores the pair in SQLite, so buttons keep working after a restart and in
+every worker process. Recently used pairs are kept in an in-process LRU cache.
+"""
+
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from app.services import db
+
+TOKEN_LENGTH = 10
+CACHE_SIZE = 4096
+
+_UUID_RE = re.compile(r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}")
+
+
+class _LruCache:
+    def __init__(self, size: int) -> None:
+        self.size = size
+        self._items: OrderedDict[str, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            value = self._items.get(key)
+            if value is not None:
+                self._items.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: str) -> None:
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+
+
+_values = _LruCache(CACHE_SIZE)
+_tokens = _LruCache(CACHE_SIZE)
+
+
+def _key(db_path: Path, item: str) -> str:
+    return f"{db_path}\0{item}"
+
+
+def _candidate(value: str, length: int) -> str:
+    return hashlib.sha256(value.encode("utf-8")).hexdigest()[:length]
+
+
+async def encode(db_path: Path, value: str) -> str:
+    """
+    Returns the token for the value. The token is deterministic (a prefix of the
+    value's sha256) and only grows on the rare hash prefix collision.
+    """
+    token = _tokens.get(_key(db_path, value))
+    if token:
+        return token
+    length = TOKEN_LENGTH
+    while True:
+        token = _candidate(value, length)
+        if await db.claim_callback_token(db_path, token, value) == value:
+            break
+        length += 2
+    _tokens.put(_key(db_path, value), token)
+    _values.put(_key(db_path, token), value)
+    return token
+
+
+async def decode(db_path: Path, token: str) -> Optional[str]:
+    """
+    Returns the value behind the token. A raw UUID is returned as is, so buttons
+    sent before tokens were introduced keep working.
+    """
+    if not token:
+        return None
+    value = _values.get(_key(db_path, token))
+    if value:
+        return value
+    if _UUID_RE.fullmatch(token):
+        return token
+    value = await db.get_callback_token_value(db_path, token)
+    if value:
+        _values.put(_key(db_path, token), value)
+    return value
+
+
+def clear_cache() -> None:
+    _values.clear()
+    _tokens.clear()
@@ -1,7 +1,7 @@
 import datetime as dt
 import uuid
 from pathlib import Path
-from typing import Optional
+from typing import AsyncIterator, Iterable, Optional
 
 import aiosqlite
 
@@ -9,13 +9,16 @@ from app.models import (
     Campaign,
     CampaignAudience,
     CampaignResponse,
+    CampaignSchedule,
     Order,
     Payment,
     PromoCode,
     PromoCodeUse,
     Review,
+    SearchHit,
     User,
 )
+from app.services.segments import Segment, compile_segment
 
 
 CREATE_TABLE_SQL = """
@@ -33,6 +36,14 @@ CREATE TABLE IF NOT EXISTS orders (
 );
 """
 
+CREATE_ORDERS_STATUS_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_orders_status_created
+ON orders (status, created_at);
+"""
+
+# Orders that can still be paid or already were; anything else is dead weight for the sweeper.
+LIVE_ORDER_STATUSES = ("created", "invoice_sent", "paid")
+
 CREATE_USERS_TABLE_SQL = """
 CREATE TABLE IF NOT EXISTS users (
     user_id INTEGER PRIMARY KEY,
@@ -114,6 +125,75 @@ CREATE TABLE IF NOT EXISTS campaign_responses (
 );
 """
 
+CREATE_CAMPAIGN_RESPONSES_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_campaign_responses_campaign_user
+ON campaign_responses (campaign_id, user_id, updated_at DESC);
+"""
+
+CREATE_CAMPAIGN_SCHEDULES_SQL = """
+CREATE TABLE IF NOT EXISTS campaign_schedules (
+    campaign_id TEXT PRIMARY KEY,
+    segment TEXT NOT NULL,
+    repeat TEXT NOT NULL,
+    day_of_month INTEGER,
+    time_of_day TEXT,
+    run_at TEXT,
+    spread_seconds INTEGER NOT NULL,
+    last_run_at TEXT,
+    created_at TEXT NOT NULL,
+    FOREIGN KEY(campaign_id) REFERENCES campaigns(id)
+);
+"""
+
+CREATE_CAMPAIGN_SCHEDULES_INDEX_SQL = """
+CREATE INDEX IF NOT EXISTS idx_campaign_schedules_run_at
+ON campaign_schedules (run_at);
+"""
+
+CREATE_DAILY_SALES_SQL = """
+CREATE TABLE IF NOT EXISTS daily_sales (
+    day TEXT PRIMARY KEY,
+    orders INTEGER NOT NULL,
+    revenue_kopeks INTEGER NOT NULL
+);
+"""
+
+CREATE_EVENTS_SQL = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY,
+    ts TEXT NOT NULL,
+    user_id INTEGER NOT NULL,
+    step TEXT NOT NULL
+);
+"""
+
+CREATE_EVENT_HOURLY_SQL = """
+CREATE TABLE IF NOT EXISTS event_hourly (
+    hour TEXT NOT NULL,
+    step TEXT NOT NULL,
+    events INTEGER NOT NULL,
+    PRIMARY KEY (hour, step)
+);
+"""
+
+CREATE_CALLBACK_TOKENS_SQL = """
+CREATE TABLE IF NOT EXISTS callback_tokens (
+    token TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    created_at TEXT NOT NULL
+);
+"""
+
+CREATE_USER_REACHABILITY_SQL = """
+CREATE TABLE IF NOT EXISTS user_reachability (
+    user_id INTEGER PRIMARY KEY,
+    failures INTEGER NOT NULL,
+    last_error TEXT,
+    updated_at TEXT NOT NULL,
+    probe_after TEXT NOT NULL
+);
+"""
+
 CREATE_PROMOCODES_TABLE_SQL = """
 CREATE TABLE IF NOT EXISTS promocodes (
     code TEXT PRIMARY KEY,
@@ -148,62 +228,146 @@ CREATE TABLE IF NOT EXISTS promocode_intents (
 """
 
 
+# Full-text indexes over reviews and campaign responses. Both are external-content
+# tables: the text lives only in the source table and triggers keep the index in step.
+CREATE_SEARCH_SQL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS reviews_fts USING fts5(
+        text, contact_phone, contact_username,
+        content='reviews', tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS reviews_fts_ai AFTER INSERT ON reviews BEGIN
+        INSERT INTO reviews_fts (rowid, text, contact_phone, contact_username)
+        VALUES (new.rowid, new.text, new.contact_phone, new.contact_username);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS reviews_fts_ad AFTER DELETE ON reviews BEGIN
+        INSERT INTO reviews_fts (reviews_fts, rowid, text, contact_phone, contact_username)
+        VALUES ('delete', old.rowid, old.text, old.contact_phone, old.contact_username);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS reviews_fts_au AFTER UPDATE OF text, contact_phone, contact_username ON reviews BEGIN
+        INSERT INTO reviews_fts (reviews_fts, rowid, text, contact_phone, contact_username)
+        VALUES ('delete', old.rowid, old.text, old.contact_phone, old.contact_username);
+        INSERT INTO reviews_fts (rowid, text, contact_phone, contact_username)
+        VALUES (new.rowid, new.text, new.contact_phone, new.contact_username);
+    END
+    """,
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS campaign_responses_fts USING fts5(
+        full_name, phone, raw_text,
+        content='campaign_responses', tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS campaign_responses_fts_ai AFTER INSERT ON campaign_responses BEGIN
+        INSERT INTO campaign_responses_fts (rowid, full_name, phone, raw_text)
+        VALUES (new.rowid, new.full_name, new.phone, new.raw_text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS campaign_responses_fts_ad AFTER DELETE ON campaign_responses BEGIN
+        INSERT INTO campaign_responses_fts (campaign_responses_fts, rowid, full_name, phone, raw_text)
+        VALUES ('delete', old.rowid, old.full_name, old.phone, old.raw_text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS campaign_responses_fts_au
+    AFTER UPDATE OF full_name, phone, raw_text ON campaign_responses BEGIN
+        INSERT INTO campaign_responses_fts (campaign_responses_fts, rowid, full_name, phone, raw_text)
+        VALUES ('delete', old.rowid, old.full_name, old.phone, old.raw_text);
+        INSERT INTO campaign_responses_fts (rowid, full_name, phone, raw_text)
+        VALUES (new.rowid, new.full_name, new.phone, new.raw_text);
+    END
+    """,
+)
+
+# Marks matched terms in snippets; the caller escapes the text and swaps these for tags.
+SNIPPET_OPEN = "\x02"
+SNIPPET_CLOSE = "\x03"
+# bm25 is computed only for the newest SEARCH_RANK_WINDOW matches of each index,
+# older ones follow by date: ranking tens of thousands of hits costs hundreds of ms.
+SEARCH_RANK_WINDOW = 2000
+
+# Admin exports: kind -> (CSV header, query). Rows go out in rowid order, so the
+# read needs no sort and streams straight off the table.
+EXPORTS: dict[str, tuple[tuple[str, ...], str]] = {
+    "orders": (
+        ("id", "user_id", "product_id", "amount_kopeks", "currency", "status",
+         "telegram_charge_id", "created_at", "paid_at", "delivered_at"),
+        """
+        SELECT id, user_id, product_id, amount_kopeks, currency, status,
+               telegram_charge_id, created_at, paid_at, delivered_at
+        FROM orders ORDER BY rowid
+        """,
+    ),
+    "reviews": (
+        ("id", "order_id", "user_id", "product_id", "status", "text",
+         "contact_phone", "contact_username", "created_at", "answered_at"),
+        """
+        SELECT id, order_id, user_id, product_id, status, text,
+               contact_phone, contact_username, created_at, answered_at
+        FROM reviews ORDER BY rowid
+        """,
+    ),
+    "responses": (
+        ("id", "campaign_id", "campaign_title", "user_id", "full_name", "birthdate",
+         "phone", "raw_text", "status", "created_at", "updated_at"),
+        """
+        SELECT cr.id, cr.campaign_id, c.title, cr.user_id, cr.full_name, cr.birthdate,
+               cr.phone, cr.raw_text, cr.status, cr.created_at, cr.updated_at
+        FROM campaign_responses cr
+        LEFT JOIN campaigns c ON c.id = cr.campaign_id
+        ORDER BY cr.rowid
+        """,
+    ),
+}
+
+# Cold rows moved out by `archive_rows`: table -> condition, `?` being the horizon.
+# Paid orders stay live: segments, sales reports and daily_sales are built from them.
+ARCHIVE_TABLES: dict[str, str] = {
+    "orders": "status IN ('expired', 'failed') AND created_at < ?",
+    "payments": "updated_at < ?",
+    "campaign_audience": "status IN ('sent', 'failed') AND updated_at < ?",
+}
+
+
 def _now_iso() -> str:
     return dt.datetime.utcnow().isoformat()
 
 
-async def _ensure_campaigns_table(db: aiosqlite.Connection) -> None:
-    cursor = await db.execute("PRAGMA table_info(campaigns)")
-    rows = await cursor.fetchall()
-    columns = [row[1] for row in rows]
-    expected = {"id", "title", "body", "price_kopeks", "interest_redirect"}
-    if not columns:
-        await db.execute(CREATE_CAMPAIGNS_TABLE_SQL)
-        return
-    if set(columns) == expected:
-        return
-
-    legacy_name = f"campaigns_legacy_{int(dt.datetime.utcnow().timestamp())}"
-    await db.execute(f"ALTER TABLE campaigns RENAME TO {legacy_name}")
-    await db.execute(CREATE_CAMPAIGNS_TABLE_SQL)
+REBUILD_DAILY_SALES_SQL = """
+INSERT INTO daily_sales (day, orders, revenue_kopeks)
+SELECT substr(paid_at, 1, 10), COUNT(*), SUM(amount_kopeks)
+FROM orders
+WHERE status = 'paid' AND paid_at IS NOT NULL
+GROUP BY substr(paid_at, 1, 10)
+"""
+
+
+async def _add_daily_sale(db: aiosqlite.Connection, order_id: str) -> None:
     await db.execute(
-        f"""
-        INSERT INTO campaigns (id, title, body, price_kopeks, interest_redirect)
-        SELECT id, title, body, price_kopeks, '' FROM {legacy_name}
         """
+        INSERT INTO daily_sales (day, orders, revenue_kopeks)
+        SELECT substr(paid_at, 1, 10), 1, amount_kopeks FROM orders WHERE id = ?
+        ON CONFLICT(day) DO UPDATE SET
+            orders = orders + excluded.orders,
+            revenue_kopeks = revenue_kopeks + excluded.revenue_kopeks
+        """,
+        (order_id,),
     )
-    await db.execute(f"DROP TABLE {legacy_name}")
-    await db.commit()
-
-
-async def _ensure_reviews_table(db: aiosqlite.Connection) -> None:
-    cursor = await db.execute("PRAGMA table_info(reviews)")
-    rows = await cursor.fetchall()
-    if not rows:
-        await db.execute(CREATE_REVIEWS_TABLE_SQL)
-        return
-    columns = {row[1] for row in rows}
-    if "contact_phone" not in columns:
-        await db.execute("ALTER TABLE reviews ADD COLUMN contact_phone TEXT")
-    if "contact_username" not in columns:
-        await db.execute("ALTER TABLE reviews ADD COLUMN contact_username TEXT")
-    await db.commit()
 
 
 async def init_db(db_path: Path) -> None:
+    # Imported here: migrations build on the table definitions in this module.
+    from app.services.migrations import migrate
+
     db_path.parent.mkdir(parents=True, exist_ok=True)
-    async with aiosqlite.connect(db_path) as db:
-        await db.execute(CREATE_TABLE_SQL)
-        await db.execute(CREATE_USERS_TABLE_SQL)
-        await db.execute(CREATE_PAYMENTS_TABLE_SQL)
-        await _ensure_reviews_table(db)
-        await _ensure_campaigns_table(db)
-        await db.execute(CREATE_CAMPAIGN_AUDIENCE_SQL)
-        await db.execute(CREATE_CAMPAIGN_RESPONSES_SQL)
-        await db.execute(CREATE_PROMOCODES_TABLE_SQL)
-        await db.execute(CREATE_PROMOCODE_USES_TABLE_SQL)
-        await db.execute(CREATE_PROMOCODE_INTENTS_TABLE_SQL)
-        await db.commit()
+    await migrate(db_path)
 
 
 async def create_order(
@@ -256,6 +420,7 @@ async def create_paid_order(
             """,
             (order_id, user_id, product_id, amount_kopeks, currency, now, now, telegram_charge_id),
         )
+        await _add_daily_sale(db, order_id)
         await db.commit()
     return {
         "id": order_id,
@@ -309,16 +474,24 @@ async def mark_paid(
 ) -> None:
     paid_at = _now_iso()
     async with aiosqlite.connect(db_path) as db:
-        await db.execute(
+        cursor = await db.execute(
             """
             UPDATE orders
             SET status = 'paid',
                 paid_at = COALESCE(paid_at, ?),
                 telegram_charge_id = COALESCE(telegram_charge_id, ?)
-            WHERE id = ?
+            WHERE id = ? AND status != 'paid'
             """,
             (paid_at, telegram_charge_id, order_id),
         )
+        if cursor.rowcount:
+            # Counted once, in the same transaction as the status change.
+            await _add_daily_sale(db, order_id)
+        else:
+            await db.execute(
+                "UPDATE orders SET telegram_charge_id = COALESCE(telegram_charge_id, ?) WHERE id = ?",
+                (telegram_charge_id, order_id),
+            )
         await db.commit()
 
 
@@ -349,6 +522,85 @@ async def mark_delivered(db_path: Path, order_id: str) -> None:
         await db.commit()
 
 
+async def expire_stale_orders(db_path: Path, *, before: str, limit: int) -> int:
+    """Marks up to `limit` unpaid orders created before `before` as expired. Returns the count."""
+    async with aiosqlite.connect(db_path) as db:
+        cursor = await db.execute(
+            """
+            UPDATE orders
+            SET status = 'expired'
+            WHERE id IN (
+                SELECT id FROM orders
+                WHERE status IN ('created', 'invoice_sent') AND created_at < ?
+                LIMIT ?
+            )
+            """,
+            (before, limit),
+        )
+        await db.commit()
+        return cursor.rowcount
+
+
+async def reset_stuck_users(
+    db_path: Path,
+    *,
+    states: Iterable[str],
+    idle_state: str,
+    before: str,
+    limit: int,
+) -> int:
+    """
+    Moves up to `limit` users that sit in one of `states` since before `before`
+    and whose last order is no longer live to `idle_state`. Returns the count.
+    """
+    states = list(states)
+    placeholders = ",".join("?" for _ in states)
+    order_placeholders = ",".join("?" for _ in LIVE_ORDER_STATUSES)
+    async with aiosqlite.connect(db_path) as db:
+        cursor = await db.execute(
+            f"""
+            UPDATE users
+            SET state = ?, last_order_id = NULL, updated_at = ?
+            WHERE user_id IN (
+                SELECT u.user_id FROM users u
+                WHERE u.state IN ({placeholders})
+                  AND u.updated_at < ?
+                  AND NOT EXISTS (
+                      SELECT 1 FROM orders o
+                      WHERE o.id = u.last_order_id AND o.status IN ({order_placeholders})
+                  )
+                LIMIT ?
+            )
+            """,
+            (idle_state, _now_iso(), *states, before, *LIVE_ORDER_STATUSES, limit),
+        )
+        await db.commit()
+        return cursor.rowcount
+
+
+async def delete_orphaned_promocode_uses(db_path: Path, *, limit: int) -> int:
+    """Deletes up to `limit` unapplied promo code uses whose order is gone or no longer live."""
+    placeholders = ",".join("?" for _ in LIVE_ORDER_STATUSES)
+    async with aiosqlite.connect(db_path) as db:
+        cursor = await db.execute(
+            f"""
+            DELETE FROM promocode_uses
+            WHERE order_id IN (
+                SELECT pu.order_id FROM promocode_uses pu
+                WHERE pu.status != 'applied'
+                  AND NOT EXISTS (
+                      SELECT 1 FROM orders o
+                      WHERE o.id = pu.order_id AND o.status IN ({placeholders})
+                  )
+                LIMIT ?
+            )
+            """,
+            (*LIVE_ORDER_STATUSES, limit),
+        )
+        await db.commit()
+        return cursor.rowcount
+
+
 async def fetch_sales_stats(db_path: Path) -> list[tuple[str, int, int]]:
     """
     Returns list of tuples: (product_id, paid_count, total_amount_kopeks)
@@ -367,6 +619,34 @@ async def fetch_sales_stats(db_path: Path) -> list[tuple[str, int, int]]:
             return [(row[0], row[1], row[2]) for row in rows]
 
 
+async def rebuild_daily_sales(db_path: Path) -> int:
+    """Recomputes `daily_sales` from paid orders. Returns the number of days."""
+    async with aiosqlite.connect(db_path) as db:
+        await db.execute("DELETE FROM daily_sales")
+        cursor = await db.execute(REBUILD_DAILY_SALES_SQL)
+        await db.commit()
+        return cursor.rowcount
+
+
+async def fetch_daily_sales(db_path: Path, *, since: str) -> list[tuple[str, int, int]]:
+    """
+    Returns (YYYY-MM-DD, paid_count, total_amount_kopeks) for days from `since`
+    on, oldest first. Days without sales are absent.
+    """
+    async with aiosqlite.connect(db_path) as db:
+        async with db.execute(
+            """
+            SELECT day, orders, revenue_kopeks
+            FROM daily_sales
+            WHERE day >= ?
+            ORDER BY day
+            """,
+            (since,),
+        ) as cursor:
+            rows = await cursor.fetchall()
+            return [(row[0], int(row[1]), int(row[2])) for row in rows]
+
+
 async def fetch_paid_months_page(db_path: Path, *, limit: int, offset: int) -> list[str]:
     """
     Returns distinct YYYY-MM values for paid monthly products, ordered by newest first.
@@ -1078,6 +1358,10 @@ async def delete_campaign(db_path: Path, campaign_id: str) -> None:
             "DELETE FROM campaign_audience WHERE campaign_id = ?",
             (campaign_id,),
         )
+        await db.execute(
+            "DELETE FROM campaign_schedules WHERE campaign_id = ?",
+            (campaign_id,),
+        )
         await db.execute("DELETE FROM campaigns WHERE id = ?", (campaign_id,))
         await db.commit()
 
@@ -1090,17 +1374,99 @@ async def get_campaign(db_path: Path, campaign_id: str) -> Optional[Campaign]:
             return Campaign(dict(row)) if row else None
 
 
-async def fetch_paid_user_ids(db_path: Path) -> list[int]:
+async def count_segment(db_path: Path, segment: Segment) -> int:
+    sql, params = compile_segment(segment)
     async with aiosqlite.connect(db_path) as db:
+        async with db.execute(f"SELECT COUNT(*) FROM ({sql})", params) as cursor:
+            row = await cursor.fetchone()
+            return int(row[0]) if row else 0
+
+
+async def add_segment_to_campaign_audience(
+    db_path: Path,
+    campaign_id: str,
+    segment: Segment,
+    launch_id: str,
+) -> int:
+    """
+    Tags the segment's users with `launch_id` in one statement, adding the ones
+    not in the audience yet. Users tagged by an earlier launch become pending
+    again; the ones who already answered, and the ones this launch already
+    tagged (a resumed run), are left as they are. Returns the number of users
+    of the launch still to be messaged.
+    """
+    sql, params = compile_segment(segment)
+    async with aiosqlite.connect(db_path) as db:
+        await db.execute(
+            f"""
+            INSERT INTO campaign_audience (campaign_id, user_id, status, updated_at, launch_id)
+            SELECT ?, user_id, 'pending', ?, ? FROM ({sql}) WHERE true
+            ON CONFLICT (campaign_id, user_id) DO UPDATE SET
+                status = 'pending',
+                error = NULL,
+                updated_at = excluded.updated_at,
+                launch_id = excluded.launch_id
+            -- Users who already answered the offer are not messaged again.
+            WHERE launch_id IS NOT excluded.launch_id
+              AND status NOT IN ('interested', 'declined')
+            """,
+            [campaign_id, _now_iso(), launch_id, *params],
+        )
+        await db.commit()
         async with db.execute(
-            """
-            SELECT DISTINCT user_id
-            FROM orders
-            WHERE status = 'paid'
-            """
+            "SELECT COUNT(*) FROM campaign_audience WHERE campaign_id = ? AND launch_id = ? AND status = 'pending'",
+            (campaign_id, launch_id),
         ) as cursor:
-            rows = await cursor.fetchall()
-            return [int(row[0]) for row in rows]
+            row = await cursor.fetchone()
+            return int(row[0]) if row else 0
+
+
+async def iter_campaign_audience(
+    db_path: Path,
+    campaign_id: str,
+    *,
+    exclude_statuses: Iterable[str] = (),
+    launch_id: Optional[str] = None,
+    batch_size: int = 500,
+) -> AsyncIterator[CampaignAudience]:
+    """
+    Walks the audience in user_id order, one short query per batch, so a slow
+    consumer (a broadcast with delays) doesn't hold a read transaction open.
+    With `launch_id`, only the rows of that launch still pending are returned,
+    so a run resumed after a restart doesn't message anyone twice.
+    """
+    excluded = list(exclude_statuses)
+    status_filter = ""
+    if excluded:
+        status_filter = f" AND status NOT IN ({','.join('?' for _ in excluded)})"
+    if launch_id is not None:
+        status_filter += " AND launch_id = ? AND status = 'pending'"
+        excluded.append(launch_id)
+    last_user_id: Optional[int] = None
+    while True:
+        params: list = [campaign_id, *excluded]
+        key_filter = ""
+        if last_user_id is not None:
+            key_filter = " AND user_id > ?"
+            params.append(last_user_id)
+        params.append(batch_size)
+        async with aiosqlite.connect(db_path) as db:
+            db.row_factory = aiosqlite.Row
+            async with db.execute(
+                f"""
+                SELECT * FROM campaign_audience
+                WHERE campaign_id = ?{status_filter}{key_filter}
+                ORDER BY user_id
+                LIMIT ?
+                """,
+                params,
+            ) as cursor:
+                rows = await cursor.fetchall()
+        for row in rows:
+            yield CampaignAudience(dict(row))
+        if len(rows) < batch_size:
+            return
+        last_user_id = rows[-1]["user_id"]
 
 
 async def add_campaign_audience(db_path: Path, campaign_id: str, user_ids: list[int]) -> None:
@@ -1171,21 +1537,163 @@ async def campaign_has_audience(db_path: Path, campaign_id: str) -> bool:
             return row is not None
 
 
-async def fetch_campaign_audience_stats(db_path: Path, campaign_id: str) -> dict[str, int]:
+async def fetch_campaign_audience_stats(
+    db_path: Path,
+    campaign_id: str,
+    *,
+    archive_path: Optional[Path] = None,
+) -> dict[str, int]:
+    """
+    Audience rows per status. With `archive_path` (and only if that file
+    exists) archived rows are counted too, unless the user is back in the live
+    audience of the campaign.
+    """
+    if archive_path is None or not archive_path.exists():
+        async with aiosqlite.connect(db_path) as db:
+            async with db.execute(
+                """
+                SELECT status, COUNT(*) AS cnt
+                FROM campaign_audience
+                WHERE campaign_id = ?
+                GROUP BY status
+                """,
+                (campaign_id,),
+            ) as cursor:
+                rows = await cursor.fetchall()
+                return {row[0]: int(row[1]) for row in rows}
+
     async with aiosqlite.connect(db_path) as db:
+        await db.execute("ATTACH DATABASE ? AS archive", (str(archive_path),))
         async with db.execute(
             """
             SELECT status, COUNT(*) AS cnt
-            FROM campaign_audience
-            WHERE campaign_id = ?
+            FROM (
+                SELECT status FROM main.campaign_audience WHERE campaign_id = ?
+                UNION ALL
+                SELECT a.status FROM archive.campaign_audience a
+                WHERE a.campaign_id = ?
+                  AND NOT EXISTS (
+                      SELECT 1 FROM main.campaign_audience m
+                      WHERE m.campaign_id = a.campaign_id AND m.user_id = a.user_id
+                  )
+            )
             GROUP BY status
             """,
-            (campaign_id,),
+            (campaign_id, campaign_id),
         ) as cursor:
             rows = await cursor.fetchall()
             return {row[0]: int(row[1]) for row in rows}
 
 
+async def upsert_campaign_schedule(
+    db_path: Path,
+    campaign_id: str,
+    *,
+    segment: str,
+    repeat: str,
+    run_at: str,
+    spread_seconds: int,
+    day_of_month: Optional[int] = None,
+    time_of_day: Optional[str] = None,
+) -> None:
+    async with aiosqlite.connect(db_path) as db:
+        await db.execute(
+            """
+            INSERT INTO campaign_schedules (
+                campaign_id, segment, repeat, day_of_month, time_of_day, run_at, spread_seconds, created_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(campaign_id) DO UPDATE SET
+                segment = excluded.segment,
+                repeat = excluded.repeat,
+                day_of_month = excluded.day_of_month,
+                time_of_day = excluded.time_of_day,
+                run_at = excluded.run_at,
+                spread_seconds = excluded.spread_seconds
+            """,
+            (campaign_id, segment, repeat, day_of_month, time_of_day, run_at, spread_seconds, _now_iso()),
+        )
+        await db.commit()
+
+
+async def get_campaign_schedule(db_path: Path, campaign_id: str) -> Optional[CampaignSchedule]:
+    async with aiosqlite.connect(db_path) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(
+            "SELECT * FROM campaign_schedules WHERE campaign_id = ?",
+            (campaign_id,),
+        ) as cursor:
+            row = await cursor.fetchone()
+            return CampaignSchedule(dict(row)) if row else None
+
+
+async def delete_campaign_schedule(db_path: Path, campaign_id: str) -> None:
+    async with aiosqlite.connect(db_path) as db:
+        await db.execute("DELETE FROM campaign_schedules WHERE campaign_id = ?", (campaign_id,))
+        await db.commit()
+
+
+async def fetch_due_campaign_schedules(db_path: Path, now: str) -> list[CampaignSchedule]:
+    async with aiosqlite.connect(db_path) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(
+            """
+            SELECT * FROM campaign_schedules
+            WHERE run_at IS NOT NULL AND run_at <= ?
+            ORDER BY run_at
+            """,
+            (now,),
+        ) as cursor:
+            rows = await cursor.fetchall()
+            return [CampaignSchedule(dict(row)) for row in rows]
+
+
+async def claim_campaign_schedule(
+    db_path: Path,
+    campaign_id: str,
+    run_at: str,
+    next_run_at: Optional[str],
+) -> Optional[str]:
+    """
+    Moves a due schedule to its next run and marks the run as in progress.
+    Only one caller wins for a given `run_at`, so several processes can poll
+    the same table safely. Returns the run's start time, or None if another
+    caller claimed it.
+    """
+    started_at = _now_iso()
+    async with aiosqlite.connect(db_path) as db:
+        cursor = await db.execute(
+            """
+            UPDATE campaign_schedules
+            SET run_at = ?, last_run_at = ?, running_since = ?
+            WHERE campaign_id = ? AND run_at = ?
+            """,
+            (next_run_at, started_at, started_at, campaign_id, run_at),
+        )
+        await db.commit()
+        return started_at if cursor.rowcount == 1 else None
+
+
+async def finish_campaign_schedule_run(db_path: Path, campaign_id: str, started_at: str) -> None:
+    async with aiosqlite.connect(db_path) as db:
+        await db.execute(
+            "UPDATE campaign_schedules SET running_since = NULL WHERE campaign_id = ? AND running_since = ?",
+            (campaign_id, started_at),
+        )
+        await db.commit()
+
+
+async def fetch_running_campaign_schedules(db_path: Path) -> list[CampaignSchedule]:
+    """Runs that were claimed but never finished, e.g. because the process restarted mid-send."""
+    async with aiosqlite.connect(db_path) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(
+            "SELECT * FROM campaign_schedules WHERE running_since IS NOT NULL ORDER BY running_since"
+        ) as cursor:
+            rows = await cursor.fetchall()
+            return [CampaignSchedule(dict(row)) for row in rows]
+
+
 async def create_or_update_campaign_response(
     db_path: Path,
     campaign_id: str,
@@ -1286,28 +1794,303 @@ async def get_pending_campaign_response_for_user(
             return CampaignResponse(dict(row)) if row else None
 
 
-async def list_campaign_responses(
+async def count_campaign_responses(db_path: Path, campaign_id: str) -> int:
+    """Number of users who responded to the campaign (one response per user is shown)."""
+    async with aiosqlite.connect(db_path) as db:
+        async with db.execute(
+            "SELECT COUNT(DISTINCT user_id) FROM campaign_responses WHERE campaign_id = ?",
+            (campaign_id,),
+        ) as cursor:
+            row = await cursor.fetchone()
+            return int(row[0]) if row else 0
+
+
+async def fetch_campaign_responses_page(
     db_path: Path,
     campaign_id: str,
+    *,
+    limit: int,
+    offset: int,
 ) -> list[CampaignResponse]:
+    """
+    Returns the latest response of each user, newest first.
+    """
     async with aiosqlite.connect(db_path) as db:
         db.row_factory = aiosqlite.Row
         async with db.execute(
             """
-            SELECT *
-            FROM campaign_responses
-            WHERE campaign_id = ?
-            ORDER BY updated_at DESC
+            WITH latest AS (
+                SELECT
+                    id,
+                    ROW_NUMBER() OVER (PARTITION BY user_id ORDER BY updated_at DESC, id) AS position
+                FROM campaign_responses
+                WHERE campaign_id = ?
+            )
+            SELECT r.*
+            FROM campaign_responses AS r
+            JOIN latest ON latest.id = r.id
+            WHERE latest.position = 1
+            ORDER BY r.updated_at DESC, r.id
+            LIMIT ? OFFSET ?
             """,
-            (campaign_id,),
+            (campaign_id, limit, offset),
+        ) as cursor:
+            rows = await cursor.fetchall()
+            return [CampaignResponse(dict(row)) for row in rows]
+
+
+async def get_campaign_response(db_path: Path, response_id: str) -> Optional[CampaignResponse]:
+    async with aiosqlite.connect(db_path) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute("SELECT * FROM campaign_responses WHERE id = ?", (response_id,)) as cursor:
+            row = await cursor.fetchone()
+            return CampaignResponse(dict(row)) if row else None
+
+
+async def claim_callback_token(db_path: Path, token: str, value: str) -> str:
+    """
+    Stores token -> value unless the token is taken. Returns the value the token
+    points to afterwards, so the caller can detect a collision.
+    """
+    async with aiosqlite.connect(db_path) as db:
+        await db.execute(
+            "INSERT OR IGNORE INTO callback_tokens (token, value, created_at) VALUES (?, ?, ?)",
+            (token, value, _now_iso()),
+        )
+        await db.commit()
+        async with db.execute("SELECT value FROM callback_tokens WHERE token = ?", (token,)) as cursor:
+            row = await cursor.fetchone()
+            return row[0]
+
+
+async def get_callback_token_value(db_path: Path, token: str) -> Optional[str]:
+    async with aiosqlite.connect(db_path) as db:
+        async with db.execute("SELECT value FROM callback_tokens WHERE token = ?", (token,)) as cursor:
+            row = await cursor.fetchone()
+            return row[0] if row else None
+
+
+async def get_user_reachability(db_path: Path, user_id: int) -> Optional[dict]:
+    async with aiosqlite.connect(db_path) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute("SELECT * FROM user_reachability WHERE user_id = ?", (user_id,)) as cursor:
+            row = await cursor.fetchone()
+            return dict(row) if row else None
+
+
+async def mark_user_unreachable(
+    db_path: Path,
+    user_id: int,
+    error: str,
+    *,
+    failures: int,
+    probe_after: str,
+) -> None:
+    async with aiosqlite.connect(db_path) as db:
+        await db.execute(
+            """
+            INSERT INTO user_reachability (user_id, failures, last_error, updated_at, probe_after)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(user_id) DO UPDATE SET
+                failures = excluded.failures,
+                last_error = excluded.last_error,
+                updated_at = excluded.updated_at,
+                probe_after = excluded.probe_after
+            """,
+            (user_id, failures, error, _now_iso(), probe_after),
+        )
+        await db.commit()
+
+
+async def mark_user_reachable(db_path: Path, user_id: int) -> bool:
+    """Forgets a past delivery failure. Returns True if the user was marked unreachable."""
+    async with aiosqlite.connect(db_path) as db:
+        cursor = await db.execute("DELETE FROM user_reachability WHERE user_id = ?", (user_id,))
+        await db.commit()
+        return cursor.rowcount > 0
+
+
+async def fetch_unreachable_user_ids(db_path: Path) -> set[int]:
+    async with aiosqlite.connect(db_path) as db:
+        async with db.execute("SELECT user_id FROM user_reachability") as cursor:
+            return {int(row[0]) for row in await cursor.fetchall()}
+
+
+async def count_unreachable_users(db_path: Path, now: str) -> tuple[int, int]:
+    """Returns (unreachable users, users among them due for a re-probe at `now`)."""
+    async with aiosqlite.connect(db_path) as db:
+        async with db.execute(
+            "SELECT COUNT(*), COALESCE(SUM(probe_after <= ?), 0) FROM user_reachability",
+            (now,),
+        ) as cursor:
+            row = await cursor.fetchone()
+            return (int(row[0]), int(row[1])) if row else (0, 0)
+
+
+async def write_events(
+    db_path: Path,
+    events: list[tuple[str, int, str]],
+    buckets: dict[tuple[str, str], int],
+) -> None:
+    """Appends (ts, user_id, step) rows and adds `buckets` to the hourly counters in one transaction."""
+    async with aiosqlite.connect(db_path) as db:
+        await db.executemany("INSERT INTO events (ts, user_id, step) VALUES (?, ?, ?)", events)
+        await db.executemany(
+            """
+            INSERT INTO event_hourly (hour, step, events) VALUES (?, ?, ?)
+            ON CONFLICT(hour, step) DO UPDATE SET events = events + excluded.events
+            """,
+            [(hour, step, count) for (hour, step), count in buckets.items()],
+        )
+        await db.commit()
+
+
+async def fetch_event_counts(db_path: Path, *, since: str, until: str) -> dict[str, int]:
+    """Sums hourly counters per step for hours (YYYY-MM-DDTHH) from `since` to `until` inclusive."""
+    async with aiosqlite.connect(db_path) as db:
+        async with db.execute(
+            """
+            SELECT step, SUM(events)
+            FROM event_hourly
+            WHERE hour >= ? AND hour <= ?
+            GROUP BY step
+            """,
+            (since, until),
+        ) as cursor:
+            rows = await cursor.fetchall()
+            return {row[0]: int(row[1]) for row in rows}
+
+
+async def init_archive_db(archive_path: Path) -> None:
+    """Creates the archive database with the same tables as the live one."""
+    archive_path.parent.mkdir(parents=True, exist_ok=True)
+    async with aiosqlite.connect(archive_path) as db:
+        await db.execute(CREATE_TABLE_SQL)
+        await db.execute(CREATE_PAYMENTS_TABLE_SQL)
+        await db.execute(CREATE_CAMPAIGN_AUDIENCE_SQL)
+        await db.commit()
+
+
+async def archive_rows(db_path: Path, archive_path: Path, table: str, *, before: str, limit: int) -> int:
+    """
+    Moves up to `limit` rows of `table` matching `ARCHIVE_TABLES` into the
+    attached archive. The copy is committed before the delete, so a crash in
+    between leaves a duplicate that the next run overwrites, never a lost row.
+    Returns the number of rows moved.
+    """
+    condition = ARCHIVE_TABLES[table]
+    async with aiosqlite.connect(db_path) as db:
+        await db.execute("ATTACH DATABASE ? AS archive", (str(archive_path),))
+        # Archive tables keep their original columns; later additions (launch tags) aren't archived.
+        async with db.execute(f"PRAGMA archive.table_info({table})") as cursor:
+            columns = ", ".join(row[1] for row in await cursor.fetchall())
+        async with db.execute(
+            f"SELECT rowid FROM main.{table} WHERE {condition} LIMIT ?",
+            (before, limit),
+        ) as cursor:
+            rowids = [row[0] for row in await cursor.fetchall()]
+        if not rowids:
+            return 0
+        placeholders = ",".join("?" for _ in rowids)
+        await db.execute(
+            f"""
+            INSERT OR REPLACE INTO archive.{table} ({columns})
+            SELECT {columns} FROM main.{table} WHERE rowid IN ({placeholders})
+            """,
+            rowids,
+        )
+        await db.commit()
+        cursor = await db.execute(
+            f"DELETE FROM main.{table} WHERE rowid IN ({placeholders}) AND {condition}",
+            (*rowids, before),
+        )
+        await db.commit()
+        return cursor.rowcount
+
+
+def _search_parts(source: str, fts: str, table: str, parent_column: str) -> list[str]:
+    # The newest SEARCH_RANK_WINDOW matches ranked by bm25 (tier 0), then the older
+    # ones newest first (tier 1). Both read only `:top` rows and build snippets for
+    # those; the rowid floor is pushed into FTS5 as a range constraint.
+    floor = f"""
+        COALESCE((
+            SELECT rowid FROM {fts} WHERE {fts} MATCH :match
+            ORDER BY rowid DESC LIMIT 1 OFFSET :window
+        ), 0)
+    """
+    columns = f"""
+        '{source}' AS source, t.id, t.{parent_column} AS parent_id, t.user_id,
+        snippet({fts}, -1, :open, :close, '…', 12) AS snippet, t.created_at
+    """
+    return [
+        f"""
+        SELECT * FROM (
+            SELECT {columns}, 0 AS tier, {fts}.rank AS score
+            FROM {fts} JOIN {table} t ON t.rowid = {fts}.rowid
+            WHERE {fts} MATCH :match AND {fts}.rowid >= {floor}
+            ORDER BY {fts}.rank
+            LIMIT :top
+        )
+        """,
+        f"""
+        SELECT * FROM (
+            SELECT {columns}, 1 AS tier, 0 AS score
+            FROM {fts} JOIN {table} t ON t.rowid = {fts}.rowid
+            WHERE {fts} MATCH :match AND {fts}.rowid < {floor}
+            ORDER BY {fts}.rowid DESC
+            LIMIT :top
+        )
+        """,
+    ]
+
+
+_SEARCH_SQL = (
+    "SELECT * FROM ("
+    + " UNION ALL ".join(
+        _search_parts("review", "reviews_fts", "reviews", "order_id")
+        + _search_parts("response", "campaign_responses_fts", "campaign_responses", "campaign_id")
+    )
+    + ") ORDER BY tier, score, created_at DESC LIMIT :limit OFFSET :offset"
+)
+
+
+async def search(db_path: Path, match: str, *, limit: int, offset: int) -> list[SearchHit]:
+    """
+    Reviews and campaign responses matching the FTS5 expression `match`. The
+    newest `SEARCH_RANK_WINDOW` matches of each index come first, best first by
+    bm25, followed by every older match, newest first. `parent_id` is the order
+    id of a review or the campaign id of a response.
+    """
+    async with aiosqlite.connect(db_path) as db:
+        db.row_factory = aiosqlite.Row
+        async with db.execute(
+            _SEARCH_SQL,
+            {
+                "match": match,
+                "open": SNIPPET_OPEN,
+                "close": SNIPPET_CLOSE,
+                "top": offset + limit,
+                "window": SEARCH_RANK_WINDOW - 1,
+                "limit": limit,
+                "offset": offset,
+            },
         ) as cursor:
             rows = await cursor.fetchall()
-            seen: set[int] = set()
-            responses: list[CampaignResponse] = []
-            for row in rows:
-                resp = CampaignResponse(dict(row))
-                if resp["user_id"] in seen:
-                    continue
-                seen.add(resp["user_id"])
-                responses.append(resp)
-            return responses
+            return [SearchHit({key: row[key] for key in SearchHit.__annotations__}) for row in rows]
+
+
+async def iter_export_rows(db_path: Path, kind: str, *, batch_size: int = 1000) -> AsyncIterator[list[tuple]]:
+    """
+    Streams the rows of export `kind` (see `EXPORTS`) in batches from one cursor
+    on a read-only connection: the export sees a single snapshot, and under WAL
+    it never blocks the writers handling payments.
+    """
+    _, sql = EXPORTS[kind]
+    uri = f"{Path(db_path).resolve().as_uri()}?mode=ro"
+    async with aiosqlite.connect(uri, uri=True) as db:
+        async with db.execute(sql) as cursor:
+            while True:
+                rows = await cursor.fetchmany(batch_size)
+                if not rows:
+                    return
+                yield rows
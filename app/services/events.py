@@ -0,0 +1,164 @@
+"""
+Purchase funnel events. Handlers and the dispatcher middleware only append to
+an in-memory ring buffer; a background task writes the buffer in one
+transaction every few seconds, appending raw rows to `events` and adding them
+to per-hour counters in `event_hourly`, which the funnel report reads. When
+the buffer is full the oldest events are dropped rather than slowing updates.
+"""
+
+import asyncio
+import datetime as dt
+import logging
+from collections import Counter, deque
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Optional
+
+import aiosqlite
+from aiogram import BaseMiddleware
+from aiogram.types import TelegramObject, Update
+
+from app.services import db
+
+logger = logging.getLogger(__name__)
+
+BUFFER_SIZE = 10000
+BATCH_SIZE = 500
+FLUSH_SECONDS = 5.0
+
+# Funnel order. Catalog steps cover both the monthly and the yearly path.
+STEPS = ("mode", "year", "sign", "pay", "referral_prompt", "invoice", "checkout", "payment", "review")
+
+_CALLBACK_STEPS = (
+    ("mode:", "mode"),
+    ("m-year:", "year"),
+    ("y-year:", "year"),
+    ("m-sign:", "sign"),
+    ("y-sign:", "sign"),
+    ("pay:", "pay"),
+    ("review:start:", "review"),
+)
+
+Event = tuple[str, int, str]
+
+_buffer: deque[Event] = deque(maxlen=BUFFER_SIZE)
+_dropped = 0
+_db_path: Optional[Path] = None
+_flusher: Optional[asyncio.Task] = None
+_flush_lock: Optional[asyncio.Lock] = None
+
+
+def setup_events(db_path: Optional[Path]) -> None:
+    global _db_path
+    _db_path = db_path
+
+
+def step_for_update(update: Update) -> Optional[str]:
+    if update.callback_query and update.callback_query.data:
+        data = update.callback_query.data
+        for prefix, step in _CALLBACK_STEPS:
+            if data.startswith(prefix):
+                return step
+        return None
+    if update.pre_checkout_query:
+        return "checkout"
+    if update.message and update.message.successful_payment:
+        return "payment"
+    return None
+
+
+def record(user_id: Optional[int], step: str, *, now: Optional[dt.datetime] = None) -> None:
+    """Queues an event. Never touches the database and never raises."""
+    global _dropped
+    if _db_path is None or not user_id:
+        return
+    if len(_buffer) == _buffer.maxlen:
+        _dropped += 1
+    _buffer.append(((now or dt.datetime.utcnow()).isoformat(timespec="seconds"), user_id, step))
+    _ensure_flusher()
+
+
+def pending() -> int:
+    return len(_buffer)
+
+
+def _ensure_flusher() -> None:
+    global _flusher
+    if _flusher is not None and not _flusher.done():
+        return
+    try:
+        _flusher = asyncio.get_running_loop().create_task(_flush_loop())
+    except RuntimeError:
+        # No running loop (e.g. a synchronous caller); the next async record starts it.
+        _flusher = None
+
+
+async def _flush_loop() -> None:
+    while True:
+        await asyncio.sleep(FLUSH_SECONDS)
+        await flush()
+
+
+def _bucket(ts: str) -> str:
+    return ts[:13]
+
+
+async def flush() -> int:
+    """Writes buffered events in batches. Returns the number written."""
+    global _dropped, _flush_lock
+    if _db_path is None:
+        return 0
+    if _flush_lock is None:
+        _flush_lock = asyncio.Lock()
+    written = 0
+    async with _flush_lock:
+        if _dropped:
+            logger.warning("Event buffer overflow, dropped=%s", _dropped)
+            _dropped = 0
+        while _buffer:
+            batch = [_buffer.popleft() for _ in range(min(BATCH_SIZE, len(_buffer)))]
+            buckets = Counter((_bucket(ts), step) for ts, _, step in batch)
+            try:
+                await db.write_events(_db_path, batch, buckets)
+            except aiosqlite.Error:
+                logger.exception("Failed to write events batch=%s", len(batch))
+                # The batch is older than anything recorded meanwhile; like a full
+                # buffer, drop its oldest events rather than evicting newer ones.
+                room = _buffer.maxlen - len(_buffer)
+                kept = batch[len(batch) - room :] if room else []
+                _dropped += len(batch) - len(kept)
+                _buffer.extendleft(reversed(kept))
+                break
+            written += len(batch)
+    return written
+
+
+async def funnel(db_path: Path, since: dt.datetime, until: dt.datetime) -> list[tuple[str, int, Optional[float]]]:
+    """Returns (step, events, share of the previous step) for each step in `STEPS`."""
+    counts = await db.fetch_event_counts(
+        db_path,
+        since=_bucket(since.isoformat(timespec="seconds")),
+        until=_bucket(until.isoformat(timespec="seconds")),
+    )
+    report = []
+    previous: Optional[int] = None
+    for step in STEPS:
+        count = counts.get(step, 0)
+        share = count / previous if previous else None
+        report.append((step, count, share))
+        previous = count
+    return report
+
+
+class FunnelMiddleware(BaseMiddleware):
+    async def __call__(
+        self,
+        handler: Callable[[TelegramObject, dict[str, Any]], Awaitable[Any]],
+        event: TelegramObject,
+        data: dict[str, Any],
+    ) -> Any:
+        if isinstance(event, Update):
+            step = step_for_update(event)
+            if step:
+                user = data.get("event_from_user")
+                record(user.id if user else None, step)
+        return await handler(event, data)
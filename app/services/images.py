@@ -0,0 +1,108 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image, ImageOps
+
+from app.config import Settings
+from app.services.media import original_path
+
+logger = logging.getLogger(__name__)
+
+_FORMATS = {
+    "jpg": "JPEG",
+    "jpeg": "JPEG",
+    "png": "PNG",
+    "webp": "WEBP",
+}
+
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+@dataclass(frozen=True)
+class ImageOptimization:
+    path: Path
+    original_bytes: int
+    optimized_bytes: int
+
+    @property
+    def saved_bytes(self) -> int:
+        return self.original_bytes - self.optimized_bytes
+
+
+def optimize_image(path: Path, *, quality: int, max_dimension: int) -> ImageOptimization:
+    """
+    Re-encodes the image in place: applies EXIF orientation, fits it into
+    max_dimension and drops metadata. The original is kept in `.originals/`
+    next to it. If re-encoding doesn't make the file smaller it is left as is.
+    Runs in a worker process.
+    """
+    image_format = _FORMATS.get(path.suffix.lower().lstrip("."))
+    original_bytes = path.stat().st_size
+    if image_format is None:
+        return ImageOptimization(path, original_bytes, original_bytes)
+
+    with Image.open(path) as source:
+        image = ImageOps.exif_transpose(source)
+        image.thumbnail((max_dimension, max_dimension))
+        if image_format == "JPEG" and image.mode not in ("RGB", "L"):
+            image = image.convert("RGB")
+        tmp_path = path.with_name(f".{path.name}.tmp")
+        save_kwargs = {"optimize": True}
+        if image_format in ("JPEG", "WEBP"):
+            save_kwargs["quality"] = quality
+        image.save(tmp_path, format=image_format, **save_kwargs)
+
+    optimized_bytes = tmp_path.stat().st_size
+    if optimized_bytes >= original_bytes:
+        tmp_path.unlink()
+        return ImageOptimization(path, original_bytes, original_bytes)
+    backup = original_path(path)
+    backup.parent.mkdir(exist_ok=True)
+    shutil.copy2(path, backup)
+    os.replace(tmp_path, path)
+    return ImageOptimization(path, original_bytes, optimized_bytes)
+
+
+def _get_pool(settings: Settings) -> ProcessPoolExecutor:
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(
+            max_workers=settings.image_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _pool
+
+
+async def optimize_upload(path: Path, settings: Settings) -> Optional[ImageOptimization]:
+    if not settings.image_optimization:
+        return None
+    loop = asyncio.get_running_loop()
+    try:
+        result = await loop.run_in_executor(
+            _get_pool(settings),
+            _optimize_in_worker,
+            str(path),
+            settings.image_quality,
+            settings.image_max_dimension,
+        )
+    except Exception:
+        logger.exception("Image optimization failed path=%s", path)
+        return None
+    logger.info(
+        "Image optimized path=%s original=%s optimized=%s",
+        path,
+        result.original_bytes,
+        result.optimized_bytes,
+    )
+    return result
+
+
+def _optimize_in_worker(path: str, quality: int, max_dimension: int) -> ImageOptimization:
+    return optimize_image(Path(path), quality=quality, max_dimension=max_dimension)
@@ -0,0 +1,122 @@
+import atexit
+import json
+import logging
+import queue
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+
+from app.config import Settings
+
+TEXT_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+# (logger name, message prefix) -> keep one record out of N. Warnings and errors are never sampled.
+DEFAULT_SAMPLING: dict[tuple[str, str], int] = {
+    ("app.services.broadcasts", "Broadcast sent"): 100,
+}
+
+
+class SamplingFilter(logging.Filter):
+    def __init__(self, rules: dict[tuple[str, str], int]) -> None:
+        super().__init__()
+        self._rules = {key: every for key, every in rules.items() if every > 1}
+        self._counters: dict[tuple[str, str], int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not isinstance(record.msg, str):
+            return True
+        for (logger_name, prefix), every in self._rules.items():
+            if record.name != logger_name or not record.msg.startswith(prefix):
+                continue
+            key = (logger_name, prefix)
+            seen = self._counters.get(key, 0)
+            self._counters[key] = seen + 1
+            if seen % every:
+                return False
+            record.sample_every = every
+            return True
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    Never blocks the caller: records that don't fit into the bounded queue are
+    counted and reported once there is room again.
+    """
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The listener runs in this process, so formatting is left to its thread.
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            if self.dropped:
+                notice = logging.LogRecord(
+                    "app.services.logs",
+                    logging.WARNING,
+                    __file__,
+                    0,
+                    "Log queue overflow, dropped=%s",
+                    (self.dropped,),
+                    None,
+                )
+                self.queue.put_nowait(notice)
+                self.dropped = 0
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "process": record.processName,
+        }
+        sample_every = getattr(record, "sample_every", None)
+        if sample_every:
+            payload["sample_every"] = sample_every
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+def setup_logging(
+    settings: Settings,
+    *,
+    sampling: Optional[dict[tuple[str, str], int]] = None,
+    process_tag: Optional[str] = None,
+) -> QueueListener:
+    if settings.log_format == "json":
+        formatter: logging.Formatter = JsonFormatter()
+    else:
+        text_format = TEXT_FORMAT if process_tag is None else TEXT_FORMAT.replace(
+            "[%(name)s]", f"[{process_tag}] [%(name)s]"
+        )
+        formatter = logging.Formatter(text_format)
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(formatter)
+
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.log_queue_size)
+    handler = DroppingQueueHandler(log_queue)
+    handler.addFilter(SamplingFilter(DEFAULT_SAMPLING if sampling is None else sampling))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(handler)
+    root.setLevel(settings.log_level.upper())
+
+    listener = QueueListener(log_queue, output, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
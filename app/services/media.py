@@ -1,13 +1,40 @@
+import os
 import re
+import time
 from pathlib import Path
 from typing import List, Optional
 
 from app.config import ALLOWED_EXTENSIONS, MONTH_NAMES_RU, SIGNS_RU, YEAR_MONTH_PATTERN
+from app.services import blobstore
 
 
 _YEAR_MONTH_REGEX = re.compile(YEAR_MONTH_PATTERN)
 _YEAR_DIRNAME = "year"
 _MONTH_DIRNAME = "month"
+_CATALOG_MARKER = ".catalog-version"
+ORIGINALS_DIRNAME = ".originals"
+
+
+def catalog_version(media_dir: Path) -> int:
+    """
+    Version of the media catalog: the mtime of a marker file bumped on every change.
+    Kept in the filesystem so that all worker processes see the same value.
+    """
+    try:
+        return (media_dir / _CATALOG_MARKER).stat().st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
+def invalidate_catalog(media_dir: Path) -> int:
+    marker = media_dir / _CATALOG_MARKER
+    version = max(time.time_ns(), catalog_version(media_dir) + 1)
+    media_dir.mkdir(parents=True, exist_ok=True)
+    marker.touch()
+    os.utime(marker, ns=(version, version))
+    return version
+
+
 def is_valid_year(value: str) -> bool:
     return bool(re.fullmatch(r"\d{4}", value))
 
@@ -128,7 +155,13 @@ def find_photo_after_review(dir_path: Path) -> Optional[Path]:
     return candidates[0] if candidates else None
 
 
-def _collect_content_paths(target_dir: Path, sign: str) -> List[Path]:
+def product_dir(media_dir: Path, kind: str, year: str, sign: str, month: str | None = None) -> Path:
+    if kind == "year":
+        return _root_dir(media_dir, _YEAR_DIRNAME) / year / sign
+    return _root_dir(media_dir, _MONTH_DIRNAME) / year / (month or "01") / sign
+
+
+def _legacy_content_paths(target_dir: Path, sign: str) -> List[Path]:
     paths: List[Path] = []
     for ext in ALLOWED_EXTENSIONS:
         candidate = target_dir / f"{sign}.{ext}"
@@ -145,13 +178,33 @@ def _collect_content_paths(target_dir: Path, sign: str) -> List[Path]:
     return paths
 
 
+def _collect_content_paths(media_dir: Path, target_dir: Path, sign: str) -> List[Path]:
+    # Files stored before the blob store come first, then the manifest in upload order.
+    return _legacy_content_paths(target_dir, sign) + blobstore.resolve_paths(media_dir, target_dir / sign)
+
+
+def _delete_product(media_dir: Path, target_dir: Path, sign: str) -> bool:
+    legacy_paths = _legacy_content_paths(target_dir, sign) if target_dir.is_dir() else []
+    dropped = blobstore.drop_product(media_dir, target_dir / sign)
+    if not legacy_paths and not dropped:
+        return False
+    for path in legacy_paths:
+        try:
+            _unlink_with_original(path)
+        except OSError:
+            return False
+    if dropped:
+        blobstore.collect_garbage(media_dir)
+    return True
+
+
 def find_year_content_paths(media_dir: Path, year: str, sign: str) -> List[Path]:
     if not is_valid_year(year) or sign not in SIGNS_RU:
         return []
     target_dir = _root_dir(media_dir, _YEAR_DIRNAME) / year
     if not target_dir.exists():
         return []
-    return _collect_content_paths(target_dir, sign)
+    return _collect_content_paths(media_dir, target_dir, sign)
 
 
 def find_year_content_path(media_dir: Path, year: str, sign: str) -> Optional[Path]:
@@ -166,7 +219,7 @@ def find_month_content_paths(media_dir: Path, ym: str, sign: str) -> List[Path]:
     target_dir = _root_dir(media_dir, _MONTH_DIRNAME) / match.group("year") / match.group("month")
     if not target_dir.exists():
         return []
-    return _collect_content_paths(target_dir, sign)
+    return _collect_content_paths(media_dir, target_dir, sign)
 
 
 def find_month_content_path(media_dir: Path, ym: str, sign: str) -> Optional[Path]:
@@ -174,6 +227,19 @@ def find_month_content_path(media_dir: Path, ym: str, sign: str) -> Optional[Pat
     return paths[0] if paths else None
 
 
+def original_path(path: Path) -> Path:
+    """Where the unoptimized upload is kept next to the delivered file."""
+    return path.parent / ORIGINALS_DIRNAME / path.name
+
+
+def _unlink_with_original(path: Path) -> None:
+    path.unlink()
+    original = original_path(path)
+    if original.is_file():
+        original.unlink()
+        _cleanup_empty_dir(original.parent)
+
+
 def _cleanup_empty_dir(path: Path) -> None:
     try:
         path.rmdir()
@@ -202,35 +268,27 @@ def _cleanup_year_tree(media_dir: Path, year: str, sign: str) -> None:
 
 
 def delete_month_content(media_dir: Path, ym: str, sign: str) -> bool:
-    paths = find_month_content_paths(media_dir, ym, sign)
-    if not paths:
-        return False
-    for path in paths:
-        try:
-            path.unlink()
-        except OSError:
-            return False
     match = parse_year_month(ym)
-    if match:
-        sign_dir = _root_dir(media_dir, _MONTH_DIRNAME) / match.group("year") / match.group("month") / sign
-        _cleanup_empty_dir(sign_dir)
+    if not match or sign not in SIGNS_RU:
+        return False
+    target_dir = _root_dir(media_dir, _MONTH_DIRNAME) / match.group("year") / match.group("month")
+    if not _delete_product(media_dir, target_dir, sign):
+        return False
+    _cleanup_empty_dir(target_dir / sign)
     _cleanup_month_tree(media_dir, ym, sign)
+    invalidate_catalog(media_dir)
     return True
 
 
 def delete_year_content(media_dir: Path, year: str, sign: str) -> bool:
-    paths = find_year_content_paths(media_dir, year, sign)
-    if not paths:
+    if not is_valid_year(year) or sign not in SIGNS_RU:
         return False
-    for path in paths:
-        try:
-            path.unlink()
-        except OSError:
-            return False
-    if is_valid_year(year):
-        sign_dir = _root_dir(media_dir, _YEAR_DIRNAME) / year / sign
-        _cleanup_empty_dir(sign_dir)
+    target_dir = _root_dir(media_dir, _YEAR_DIRNAME) / year
+    if not _delete_product(media_dir, target_dir, sign):
+        return False
+    _cleanup_empty_dir(target_dir / sign)
     _cleanup_year_tree(media_dir, year, sign)
+    invalidate_catalog(media_dir)
     return True
 
 
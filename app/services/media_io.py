@@ -0,0 +1,34 @@
+"""
+Async facade over the media functions that touch the disk. Each call runs on the
+bounded I/O pool from `app.services.blocking`; pure helpers such as
+`media.month_name_from_ym` or `media.build_month_product_id` stay in `media`.
+"""
+
+from functools import wraps
+from typing import Awaitable, Callable, TypeVar
+
+from app.services import media
+from app.services.blocking import run_blocking
+
+T = TypeVar("T")
+
+
+def _offload(func: Callable[..., T]) -> Callable[..., Awaitable[T]]:
+    @wraps(func)
+    async def wrapper(*args, **kwargs) -> T:
+        return await run_blocking(func, *args, **kwargs)
+
+    return wrapper
+
+
+available_yearly_years = _offload(media.available_yearly_years)
+available_monthly_years = _offload(media.available_monthly_years)
+months_for_year = _offload(media.months_for_year)
+available_year_signs = _offload(media.available_year_signs)
+available_month_signs = _offload(media.available_month_signs)
+find_year_content_paths = _offload(media.find_year_content_paths)
+find_month_content_paths = _offload(media.find_month_content_paths)
+find_photo_after_review = _offload(media.find_photo_after_review)
+delete_year_content = _offload(media.delete_year_content)
+delete_month_content = _offload(media.delete_month_content)
+invalidate_catalog = _offload(media.invalidate_catalog)
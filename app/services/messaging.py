@@ -12,6 +12,9 @@ from aiogram.exceptions import (
 )
 from aiogram.types import FSInputFile, InputMediaPhoto
 
+from app.services import blobstore, reachability
+from app.services.blocking import run_blocking
+
 logger = logging.getLogger(__name__)
 
 TelegramCall = Callable[[], Awaitable[object]]
@@ -52,17 +55,29 @@ async def send_with_retry(call: TelegramCall, *, attempts: int = 3, base_delay:
         raise last_exc
 
 
+def _upload_name(path: Path) -> str:
+    if path.parent.name == blobstore.BLOBS_DIRNAME:
+        # Blob names are content hashes, so they already change whenever the file does.
+        return f"forecast-{path.stem[:12]}{path.suffix}"
+    return f"{path.stem}-{int(path.stat().st_mtime)}{path.suffix}"
+
+
+def _upload_names(paths: list[Path]) -> list[str]:
+    return [_upload_name(path) for path in paths]
+
+
 async def send_content(bot: Bot, chat_id: int, path: Path, caption: Optional[str] = None) -> bool:
     try:
-        mtime_tag = int(path.stat().st_mtime)
-        filename = f"{path.stem}-{mtime_tag}{path.suffix}"
+        [filename] = await run_blocking(_upload_names, [path])
         await send_with_retry(
             lambda: bot.send_document(chat_id, FSInputFile(path, filename=filename), caption=caption)
         )
-        return True
-    except Exception:
+    except Exception as exc:
         logger.exception("Failed to send content %s", path)
+        await reachability.record_failure(chat_id, exc)
         return False
+    await reachability.record_success(chat_id)
+    return True
 
 
 async def send_contents(bot: Bot, chat_id: int, paths: list[Path], caption: str) -> bool:
@@ -74,22 +89,30 @@ async def send_contents(bot: Bot, chat_id: int, paths: list[Path], caption: str)
     for start in range(0, len(paths), chunk_size):
         chunk = paths[start:start + chunk_size]
         media: list[InputMediaPhoto] = []
-        for index, path in enumerate(chunk):
-            mtime_tag = int(path.stat().st_mtime)
-            filename = f"{path.stem}-{mtime_tag}{path.suffix}"
+        try:
+            filenames = await run_blocking(_upload_names, chunk)
+        except OSError:
+            logger.exception("Failed to stat media group chunk starting at %s", start)
+            return False
+        for index, (path, filename) in enumerate(zip(chunk, filenames)):
             item_caption = caption if start == 0 and index == 0 else None
             media.append(InputMediaPhoto(media=FSInputFile(path, filename=filename), caption=item_caption))
         try:
             await send_with_retry(lambda: bot.send_media_group(chat_id, media=media))
-        except Exception:
+        except Exception as exc:
             logger.exception("Failed to send media group chunk starting at %s", start)
+            await reachability.record_failure(chat_id, exc)
             return False
+    await reachability.record_success(chat_id)
     return True
 
 
 async def send_message_safe(bot: Bot, chat_id: int, text: str, **kwargs) -> Optional[object]:
     try:
-        return await send_with_retry(lambda: bot.send_message(chat_id, text, **kwargs))
-    except Exception:
+        result = await send_with_retry(lambda: bot.send_message(chat_id, text, **kwargs))
+    except Exception as exc:
         logger.exception("Failed to send message to chat=%s", chat_id)
+        await reachability.record_failure(chat_id, exc)
         return None
+    await reachability.record_success(chat_id)
+    return result
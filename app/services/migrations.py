@@ -0,0 +1,322 @@
+"""
+Versioned schema migrations. Applied versions are recorded in `schema_version`;
+on startup a single query compares them with `MIGRATIONS` and only missing
+steps run, each in its own `BEGIN IMMEDIATE` transaction, so concurrent
+workers never apply a step twice.
+
+A step is either a plain function run in one transaction or a batched
+backfill: `step(conn, cursor)` does one bounded chunk and returns the cursor to
+resume from (None when done), and the cursor is saved in `migration_progress`
+together with the chunk, so an interrupted backfill continues where it stopped.
+Steps marked `offline` are heavy; on an existing database startup leaves them
+pending and they are run with `python app.py --migrate` while the bot keeps
+serving. Offline steps must not be needed by the code, and later steps must not
+depend on them. No listed step is offline at the moment.
+
+Databases created before this module have no `schema_version`; their steps are
+written to be idempotent, so the first run just brings them up to date.
+"""
+
+import asyncio
+import datetime as dt
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+import aiosqlite
+
+from app.services import db
+from app.services.segments import BLOCKED_ERROR
+
+logger = logging.getLogger(__name__)
+
+DAILY_SALES_RECOUNT_DAYS = 31
+
+CREATE_SCHEMA_VERSION_SQL = """
+CREATE TABLE IF NOT EXISTS schema_version (
+    version INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    applied_at TEXT NOT NULL
+);
+"""
+
+CREATE_MIGRATION_PROGRESS_SQL = """
+CREATE TABLE IF NOT EXISTS migration_progress (
+    version INTEGER PRIMARY KEY,
+    cursor TEXT NOT NULL,
+    updated_at TEXT NOT NULL
+);
+"""
+
+Apply = Callable[[aiosqlite.Connection], Awaitable[None]]
+BatchStep = Callable[[aiosqlite.Connection, Optional[str]], Awaitable[Optional[str]]]
+
+
+@dataclass(frozen=True)
+class Migration:
+    version: int
+    name: str
+    apply: Optional[Apply] = None
+    batch: Optional[BatchStep] = None
+    offline: bool = False
+
+
+async def _table_exists(conn: aiosqlite.Connection, name: str) -> bool:
+    async with conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)) as cursor:
+        return await cursor.fetchone() is not None
+
+
+async def _columns(conn: aiosqlite.Connection, table: str) -> list[str]:
+    async with conn.execute(f"PRAGMA table_info({table})") as cursor:
+        return [row[1] for row in await cursor.fetchall()]
+
+
+async def _base_tables(conn: aiosqlite.Connection) -> None:
+    await conn.execute(db.CREATE_TABLE_SQL)
+    await conn.execute(db.CREATE_USERS_TABLE_SQL)
+    await conn.execute(db.CREATE_PAYMENTS_TABLE_SQL)
+
+    review_columns = await _columns(conn, "reviews")
+    if not review_columns:
+        await conn.execute(db.CREATE_REVIEWS_TABLE_SQL)
+    else:
+        for column in ("contact_phone", "contact_username"):
+            if column not in review_columns:
+                await conn.execute(f"ALTER TABLE reviews ADD COLUMN {column} TEXT")
+
+    campaign_columns = await _columns(conn, "campaigns")
+    if not campaign_columns:
+        await conn.execute(db.CREATE_CAMPAIGNS_TABLE_SQL)
+    elif set(campaign_columns) != {"id", "title", "body", "price_kopeks", "interest_redirect"}:
+        # Early versions had no interest_redirect column.
+        await conn.execute("ALTER TABLE campaigns RENAME TO campaigns_legacy")
+        await conn.execute(db.CREATE_CAMPAIGNS_TABLE_SQL)
+        await conn.execute(
+            """
+            INSERT INTO campaigns (id, title, body, price_kopeks, interest_redirect)
+            SELECT id, title, body, price_kopeks, '' FROM campaigns_legacy
+            """
+        )
+        await conn.execute("DROP TABLE campaigns_legacy")
+
+    await conn.execute(db.CREATE_CAMPAIGN_AUDIENCE_SQL)
+    await conn.execute(db.CREATE_CAMPAIGN_RESPONSES_SQL)
+    await conn.execute(db.CREATE_CAMPAIGN_RESPONSES_INDEX_SQL)
+    await conn.execute(db.CREATE_PROMOCODES_TABLE_SQL)
+    await conn.execute(db.CREATE_PROMOCODE_USES_TABLE_SQL)
+    await conn.execute(db.CREATE_PROMOCODE_INTENTS_TABLE_SQL)
+
+
+async def _campaign_schedules(conn: aiosqlite.Connection) -> None:
+    await conn.execute(db.CREATE_CAMPAIGN_SCHEDULES_SQL)
+    await conn.execute(db.CREATE_CAMPAIGN_SCHEDULES_INDEX_SQL)
+
+
+async def _callback_tokens(conn: aiosqlite.Connection) -> None:
+    await conn.execute(db.CREATE_CALLBACK_TOKENS_SQL)
+
+
+async def _user_reachability(conn: aiosqlite.Connection) -> None:
+    if await _table_exists(conn, "user_reachability"):
+        return
+    await conn.execute(db.CREATE_USER_REACHABILITY_SQL)
+    # Seed from broadcasts that hit blocked chats before the table existed.
+    await conn.execute(
+        """
+        INSERT OR IGNORE INTO user_reachability (user_id, failures, last_error, updated_at, probe_after)
+        SELECT user_id, 1, error, MAX(updated_at), strftime('%Y-%m-%dT%H:%M:%S', MAX(updated_at), '+7 days')
+        FROM campaign_audience
+        WHERE error = ?
+        GROUP BY user_id
+        """,
+        (BLOCKED_ERROR,),
+    )
+
+
+async def _daily_sales(conn: aiosqlite.Connection) -> None:
+    if await _table_exists(conn, "daily_sales"):
+        return
+    # Filled in the same transaction: payments add to the table as soon as it
+    # exists, and the sales chart reads it, so it must never be seen half-built.
+    await conn.execute(db.CREATE_DAILY_SALES_SQL)
+    await conn.execute(db.REBUILD_DAILY_SALES_SQL)
+
+
+async def _daily_sales_recount(conn: aiosqlite.Connection, cursor: Optional[str]) -> Optional[str]:
+    """
+    Recomputes up to DAILY_SALES_RECOUNT_DAYS days after `cursor` from orders.
+    Repairs databases where an earlier version of step 5 created the table
+    empty and payments then wrote partial counts that the old backfill (step 6)
+    kept or never reached.
+    """
+    async with conn.execute(
+        """
+        SELECT substr(paid_at, 1, 10) AS day, COUNT(*), SUM(amount_kopeks)
+        FROM orders
+        WHERE status = 'paid' AND paid_at IS NOT NULL AND substr(paid_at, 1, 10) > ?
+        GROUP BY day
+        ORDER BY day
+        LIMIT ?
+        """,
+        (cursor or "", DAILY_SALES_RECOUNT_DAYS),
+    ) as rows_cursor:
+        rows = await rows_cursor.fetchall()
+    await conn.executemany(
+        """
+        INSERT INTO daily_sales (day, orders, revenue_kopeks) VALUES (?, ?, ?)
+        ON CONFLICT(day) DO UPDATE SET orders = excluded.orders, revenue_kopeks = excluded.revenue_kopeks
+        """,
+        rows,
+    )
+    if len(rows) < DAILY_SALES_RECOUNT_DAYS:
+        return None
+    return rows[-1][0]
+
+
+async def _events(conn: aiosqlite.Connection) -> None:
+    await conn.execute(db.CREATE_EVENTS_SQL)
+    await conn.execute(db.CREATE_EVENT_HOURLY_SQL)
+
+
+async def _orders_status_index(conn: aiosqlite.Connection) -> None:
+    await conn.execute(db.CREATE_ORDERS_STATUS_INDEX_SQL)
+
+
+async def _search_index(conn: aiosqlite.Connection) -> None:
+    for statement in db.CREATE_SEARCH_SQL:
+        await conn.execute(statement)
+    # Index rows written before the triggers existed.
+    await conn.execute("INSERT INTO reviews_fts (reviews_fts) VALUES ('rebuild')")
+    await conn.execute("INSERT INTO campaign_responses_fts (campaign_responses_fts) VALUES ('rebuild')")
+
+
+async def _schedule_runs(conn: aiosqlite.Connection) -> None:
+    # Set while a scheduled broadcast is sending, so a restart can resume it.
+    await conn.execute("ALTER TABLE campaign_schedules ADD COLUMN running_since TEXT")
+
+
+async def _audience_launches(conn: aiosqlite.Connection) -> None:
+    # Which launch a row belongs to, so a launch only messages its own segment.
+    await conn.execute("ALTER TABLE campaign_audience ADD COLUMN launch_id TEXT")
+
+
+MIGRATIONS: tuple[Migration, ...] = (
+    Migration(1, "base_tables", apply=_base_tables),
+    Migration(2, "campaign_schedules", apply=_campaign_schedules),
+    Migration(3, "callback_tokens", apply=_callback_tokens),
+    Migration(4, "user_reachability", apply=_user_reachability),
+    Migration(5, "daily_sales", apply=_daily_sales),
+    # 6 was the old daily_sales backfill; step 11 repairs what it left.
+    Migration(7, "events", apply=_events),
+    Migration(8, "orders_status_index", apply=_orders_status_index),
+    Migration(9, "search_index", apply=_search_index),
+    Migration(10, "schedule_runs", apply=_schedule_runs),
+    Migration(11, "daily_sales_recount", batch=_daily_sales_recount),
+    Migration(12, "audience_launches", apply=_audience_launches),
+)
+
+
+async def applied_versions(conn: aiosqlite.Connection) -> set[int]:
+    async with conn.execute("SELECT version FROM schema_version") as cursor:
+        return {row[0] for row in await cursor.fetchall()}
+
+
+async def _is_applied(conn: aiosqlite.Connection, version: int) -> bool:
+    async with conn.execute("SELECT 1 FROM schema_version WHERE version = ?", (version,)) as cursor:
+        return await cursor.fetchone() is not None
+
+
+async def _mark_applied(conn: aiosqlite.Connection, migration: Migration) -> None:
+    await conn.execute(
+        "INSERT INTO schema_version (version, name, applied_at) VALUES (?, ?, ?)",
+        (migration.version, migration.name, dt.datetime.utcnow().isoformat()),
+    )
+
+
+async def _run_plain(conn: aiosqlite.Connection, migration: Migration) -> bool:
+    await conn.execute("BEGIN IMMEDIATE")
+    try:
+        if await _is_applied(conn, migration.version):
+            await conn.rollback()
+            return False
+        await migration.apply(conn)
+        await _mark_applied(conn, migration)
+        await conn.commit()
+    except BaseException:
+        await conn.rollback()
+        raise
+    return True
+
+
+async def _run_batched(conn: aiosqlite.Connection, migration: Migration) -> bool:
+    batches = 0
+    while True:
+        await conn.execute("BEGIN IMMEDIATE")
+        try:
+            if await _is_applied(conn, migration.version):
+                await conn.rollback()
+                return batches > 0
+            async with conn.execute(
+                "SELECT cursor FROM migration_progress WHERE version = ?", (migration.version,)
+            ) as cursor:
+                row = await cursor.fetchone()
+            next_cursor = await migration.batch(conn, row[0] if row else None)
+            if next_cursor is None:
+                await conn.execute("DELETE FROM migration_progress WHERE version = ?", (migration.version,))
+                await _mark_applied(conn, migration)
+            else:
+                await conn.execute(
+                    """
+                    INSERT INTO migration_progress (version, cursor, updated_at) VALUES (?, ?, ?)
+                    ON CONFLICT(version) DO UPDATE SET cursor = excluded.cursor, updated_at = excluded.updated_at
+                    """,
+                    (migration.version, next_cursor, dt.datetime.utcnow().isoformat()),
+                )
+            await conn.commit()
+        except BaseException:
+            await conn.rollback()
+            raise
+        batches += 1
+        if next_cursor is None:
+            return True
+        # Short transactions with a pause between them keep the bot's writes flowing.
+        await asyncio.sleep(0.01)
+
+
+async def migrate(db_path: Path, *, offline: bool = False) -> list[int]:
+    """
+    Applies pending migrations. Offline steps run only with `offline=True` or on
+    a brand-new database. Returns the versions applied by this call.
+    """
+    async with aiosqlite.connect(db_path) as conn:
+        try:
+            done = await applied_versions(conn)
+            fresh = False
+        except aiosqlite.OperationalError:
+            # No schema_version yet: a new database or one created before versioning.
+            done = set()
+            async with conn.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table'") as cursor:
+                fresh = (await cursor.fetchone())[0] == 0
+            # WAL lets sharded workers read while another process writes; it persists in the file.
+            await conn.execute("PRAGMA journal_mode=WAL")
+            await conn.execute(CREATE_SCHEMA_VERSION_SQL)
+            await conn.execute(CREATE_MIGRATION_PROGRESS_SQL)
+            await conn.commit()
+
+        applied: list[int] = []
+        for migration in MIGRATIONS:
+            if migration.version in done:
+                continue
+            if migration.offline and not (offline or fresh):
+                logger.warning(
+                    "Migration pending version=%s name=%s, run: python app.py --migrate",
+                    migration.version,
+                    migration.name,
+                )
+                continue
+            runner = _run_batched if migration.batch else _run_plain
+            if await runner(conn, migration):
+                applied.append(migration.version)
+                logger.info("Migration applied version=%s name=%s", migration.version, migration.name)
+        return applied
@@ -10,9 +10,56 @@ def _parse_datetime(value: str, tz: dt.tzinfo) -> dt.datetime:
     return parsed.replace(tzinfo=tz)
 
 
+_PRICING_CACHE: dict[Path, tuple[int, dict[str, Any]]] = {}
+
+
+def pricing_version(path: Path) -> int:
+    try:
+        return path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
 def _load_pricing(path: Path) -> dict[str, Any]:
+    """
+    Parsed pricing.json, re-read only when the file's mtime changes.
+    The returned dict is shared and must not be mutated.
+    """
+    version = pricing_version(path)
+    cached = _PRICING_CACHE.get(path)
+    if cached and cached[0] == version:
+        return cached[1]
     with path.open("r", encoding="utf-8") as handle:
-        return json.load(handle)
+        data = json.load(handle)
+    _PRICING_CACHE[path] = (version, data)
+    return data
+
+
+def _pricing_tz(data: dict[str, Any]) -> dt.tzinfo:
+    tz_name = data.get("timezone") or "Europe/Moscow"
+    tz_offset_hours = data.get("timezone_offset_hours")
+    try:
+        return ZoneInfo(tz_name)
+    except ZoneInfoNotFoundError:
+        if tz_offset_hours is None:
+            raise
+        return dt.timezone(dt.timedelta(hours=int(tz_offset_hours)))
+
+
+def next_price_change(pricing_path: Path, now: dt.datetime | None = None) -> dt.datetime | None:
+    """Earliest rule start or end after `now`, i.e. when a time-window price may change."""
+    data = _load_pricing(pricing_path)
+    tz = _pricing_tz(data)
+    current = now.astimezone(tz) if now else dt.datetime.now(tz=tz)
+    upcoming: list[dt.datetime] = []
+    for price_block in (data.get("prices") or {}).values():
+        for rule in (price_block or {}).get("rules") or []:
+            for field in ("start", "end"):
+                if rule.get(field):
+                    moment = _parse_datetime(rule[field], tz)
+                    if moment > current:
+                        upcoming.append(moment)
+    return min(upcoming) if upcoming else None
 
 
 def get_price_kopeks(
@@ -24,14 +71,7 @@ def get_price_kopeks(
     apply_promo: bool = False,
 ) -> int:
     data = _load_pricing(pricing_path)
-    tz_name = data.get("timezone") or "Europe/Moscow"
-    tz_offset_hours = data.get("timezone_offset_hours")
-    try:
-        tz: dt.tzinfo = ZoneInfo(tz_name)
-    except ZoneInfoNotFoundError:
-        if tz_offset_hours is None:
-            raise
-        tz = dt.timezone(dt.timedelta(hours=int(tz_offset_hours)))
+    tz = _pricing_tz(data)
     current = now.astimezone(tz) if now else dt.datetime.now(tz=tz)
     price_block = (data.get("prices") or {}).get(kind) or {}
     default_kopeks = int(price_block.get("default_kopeks") or 0)
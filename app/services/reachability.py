@@ -0,0 +1,102 @@
+"""
+Tracks chats the bot can no longer write to (the user blocked the bot, deleted
+the account or the chat is gone). Every send path reports its outcome here;
+broadcast segments skip unreachable users until their re-probe time, and the
+delay between probes doubles after each failure. The unreachable ids are kept
+in memory, so a successful send touches the database only for those users.
+"""
+
+import datetime as dt
+import logging
+import time
+from pathlib import Path
+from typing import Optional
+
+import aiosqlite
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
+
+from app.services import db
+from app.services.segments import BLOCKED_ERROR
+
+logger = logging.getLogger(__name__)
+
+REPROBE_AFTER = dt.timedelta(days=7)
+MAX_REPROBE_AFTER = dt.timedelta(days=90)
+# Other worker processes record failures too; their ids show up here after a reload.
+RELOAD_SECONDS = 60.0
+
+_db_path: Optional[Path] = None
+_unreachable: set[int] = set()
+_loaded_at: Optional[float] = None
+
+
+def setup_reachability(db_path: Optional[Path]) -> None:
+    global _db_path, _loaded_at
+    _db_path = db_path
+    _unreachable.clear()
+    _loaded_at = None
+
+
+async def _known_unreachable() -> set[int]:
+    global _loaded_at
+    if _loaded_at is None or time.monotonic() - _loaded_at >= RELOAD_SECONDS:
+        ids = await db.fetch_unreachable_user_ids(_db_path)
+        _unreachable.clear()
+        _unreachable.update(ids)
+        _loaded_at = time.monotonic()
+    return _unreachable
+
+
+def probe_delay(failures: int) -> dt.timedelta:
+    return min(REPROBE_AFTER * 2 ** max(failures - 1, 0), MAX_REPROBE_AFTER)
+
+
+def unreachable_reason(exc: BaseException) -> Optional[str]:
+    """Returns the error to record if the exception means the chat is unreachable."""
+    if isinstance(exc, TelegramForbiddenError):
+        return BLOCKED_ERROR
+    if isinstance(exc, TelegramBadRequest) and "chat not found" in str(exc).lower():
+        return "chat_not_found"
+    return None
+
+
+async def record_failure(user_id: int, exc: BaseException, *, now: Optional[dt.datetime] = None) -> bool:
+    """Marks the user unreachable if `exc` says so. Returns True if it did."""
+    reason = unreachable_reason(exc)
+    if _db_path is None or reason is None:
+        return False
+    now = now or dt.datetime.utcnow()
+    try:
+        current = await db.get_user_reachability(_db_path, user_id)
+        failures = (current["failures"] if current else 0) + 1
+        await db.mark_user_unreachable(
+            _db_path,
+            user_id,
+            reason,
+            failures=failures,
+            probe_after=(now + probe_delay(failures)).isoformat(),
+        )
+    except aiosqlite.Error:
+        logger.exception("Failed to record unreachable user_id=%s", user_id)
+        return False
+    _unreachable.add(user_id)
+    logger.info("User unreachable user_id=%s reason=%s failures=%s", user_id, reason, failures)
+    return True
+
+
+async def record_success(user_id: int) -> None:
+    if _db_path is None:
+        return
+    try:
+        if user_id not in await _known_unreachable():
+            return
+        _unreachable.discard(user_id)
+        if await db.mark_user_reachable(_db_path, user_id):
+            logger.info("User reachable again user_id=%s", user_id)
+    except aiosqlite.Error:
+        logger.exception("Failed to record reachable user_id=%s", user_id)
+
+
+async def counts(db_path: Path, now: Optional[dt.datetime] = None) -> tuple[int, int]:
+    """Returns (unreachable users, of them due for a re-probe)."""
+    return await db.count_unreachable_users(db_path, (now or dt.datetime.utcnow()).isoformat())
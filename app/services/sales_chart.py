@@ -0,0 +1,205 @@
+"""
+Revenue and order-count trends for the last N days, drawn from `daily_sales`
+into a PNG. Rendering runs in the blocking I/O pool; the image is cached
+in-process and keyed by the rows it was drawn from, so it is redrawn only
+after a new sale changes them.
+"""
+
+import datetime as dt
+import io
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image, ImageDraw, ImageFont
+
+from app.services import db
+from app.services.blocking import run_blocking
+
+PERIODS = (7, 30, 90)
+CACHE_SIZE = 16
+
+WIDTH = 1000
+HEIGHT = 640
+MARGIN_LEFT = 90
+MARGIN_RIGHT = 30
+PANEL_GAP = 60
+TOP = 40
+BOTTOM = 50
+BACKGROUND = (255, 255, 255)
+GRID = (225, 225, 225)
+AXIS = (90, 90, 90)
+REVENUE = (76, 114, 176)
+ORDERS = (221, 132, 82)
+FONT_PATHS = (
+    "/usr/share/fonts/truetype/dejavu/DejaVuSans.ttf",
+    "/usr/share/fonts/TTF/DejaVuSans.ttf",
+    "C:/Windows/Fonts/arial.ttf",
+)
+
+DayPoint = tuple[dt.date, int, int]
+
+
+@dataclass(frozen=True)
+class Trend:
+    days: int
+    orders: int
+    revenue_kopeks: int
+    # None when the period has no sales.
+    png: Optional[bytes]
+
+
+_cache: "OrderedDict[tuple, bytes]" = OrderedDict()
+_cache_lock = threading.Lock()
+
+
+def fill_days(rows: list[tuple[str, int, int]], days: int, today: dt.date) -> list[DayPoint]:
+    """One point per day ending at `today`; days without sales are zero."""
+    by_day = {day: (orders, revenue) for day, orders, revenue in rows}
+    start = today - dt.timedelta(days=days - 1)
+    points = []
+    for offset in range(days):
+        day = start + dt.timedelta(days=offset)
+        orders, revenue = by_day.get(day.isoformat(), (0, 0))
+        points.append((day, orders, revenue))
+    return points
+
+
+def _font(size: int):
+    for path in FONT_PATHS:
+        try:
+            return ImageFont.truetype(path, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+def _axis_peak(value: float, steps: int = 4) -> float:
+    """Rounds the axis maximum up so that every one of `steps` ticks is a round number."""
+    step = max(value / steps, 1)
+    magnitude = 10 ** (len(str(int(step))) - 1)
+    for factor in (1, 2, 2.5, 5, 10):
+        if step <= factor * magnitude:
+            return factor * magnitude * steps
+    return step * steps
+
+
+def _tick(value: float) -> str:
+    return f"{value:,.0f}".replace(",", " ")
+
+
+def _draw_panel(
+    draw,
+    fonts: dict,
+    points: list[DayPoint],
+    values: list[float],
+    *,
+    top: int,
+    bottom: int,
+    color: tuple[int, int, int],
+    bars: bool,
+    title: str,
+) -> None:
+    left, right = MARGIN_LEFT, WIDTH - MARGIN_RIGHT
+    peak = _axis_peak(max(values))
+    draw.text((left, top - 28), title, fill=AXIS, font=fonts["title"])
+    for step in range(5):
+        y = bottom - (bottom - top) * step / 4
+        draw.line((left, y, right, y), fill=GRID)
+        draw.text((left - 8, y), _tick(peak * step / 4), fill=AXIS, font=fonts["small"], anchor="rm")
+    draw.line((left, top, left, bottom), fill=AXIS)
+    draw.line((left, bottom, right, bottom), fill=AXIS)
+
+    slot = (right - left) / len(points)
+    coords = []
+    for index, value in enumerate(values):
+        x = left + slot * (index + 0.5)
+        y = bottom - (bottom - top) * value / peak
+        coords.append((x, y))
+        if bars and value:
+            half = max(slot * 0.35, 1)
+            draw.rectangle((x - half, y, x + half, bottom), fill=color)
+    if not bars:
+        draw.line(coords, fill=color, width=3)
+        radius = 4 if len(points) <= 30 else 2
+        for x, y in coords:
+            draw.ellipse((x - radius, y - radius, x + radius, y + radius), fill=color)
+
+    every = max(1, len(points) // 10)
+    for index in range(0, len(points), every):
+        x = left + slot * (index + 0.5)
+        draw.text((x, bottom + 6), points[index][0].strftime("%d.%m"), fill=AXIS, font=fonts["small"], anchor="mt")
+
+
+def render_trend_png(points: list[DayPoint]) -> bytes:
+    """Revenue bars on top and the order count line below. Runs in a worker thread."""
+    image = Image.new("RGB", (WIDTH, HEIGHT), BACKGROUND)
+    draw = ImageDraw.Draw(image)
+    fonts = {"title": _font(18), "small": _font(13)}
+    panel_height = (HEIGHT - TOP - BOTTOM - PANEL_GAP) // 2
+    # Titles stay ASCII: the fallback bitmap font has no Cyrillic.
+    _draw_panel(
+        draw,
+        fonts,
+        points,
+        [revenue / 100 for _, _, revenue in points],
+        top=TOP,
+        bottom=TOP + panel_height,
+        color=REVENUE,
+        bars=True,
+        title="Revenue, RUB",
+    )
+    orders_top = TOP + panel_height + PANEL_GAP
+    _draw_panel(
+        draw,
+        fonts,
+        points,
+        [float(orders) for _, orders, _ in points],
+        top=orders_top,
+        bottom=orders_top + panel_height,
+        color=ORDERS,
+        bars=False,
+        title="Orders",
+    )
+
+    buffer = io.BytesIO()
+    image.save(buffer, format="PNG", optimize=True)
+    return buffer.getvalue()
+
+
+def _cache_get(key: tuple) -> Optional[bytes]:
+    with _cache_lock:
+        png = _cache.get(key)
+        if png is not None:
+            _cache.move_to_end(key)
+        return png
+
+
+def _cache_put(key: tuple, png: bytes) -> None:
+    with _cache_lock:
+        _cache[key] = png
+        while len(_cache) > CACHE_SIZE:
+            _cache.popitem(last=False)
+
+
+async def build_trend(db_path: Path, days: int, today: Optional[dt.date] = None) -> Trend:
+    today = today or dt.datetime.utcnow().date()
+    since = today - dt.timedelta(days=days - 1)
+    rows = await db.fetch_daily_sales(db_path, since=since.isoformat())
+    orders = sum(row[1] for row in rows)
+    revenue = sum(row[2] for row in rows)
+    png = None
+    if rows:
+        key = (str(db_path), days, today, tuple(rows))
+        png = _cache_get(key)
+        if png is None:
+            png = await run_blocking(render_trend_png, fill_days(rows, days, today))
+            _cache_put(key, png)
+    return Trend(days, orders, revenue, png)
+
+
+def clear_cache() -> None:
+    with _cache_lock:
+        _cache.clear()
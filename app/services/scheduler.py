@@ -0,0 +1,204 @@
+"""
+Launches scheduled campaigns. Schedules live in `campaign_schedules`, so they
+survive restarts; a run missed while the bot was down starts on the next poll,
+and a run interrupted mid-send (`running_since` still set) is resumed when the
+scheduler starts, skipping the users it already reached.
+A schedule is either one-off (`once`) or `monthly` on a day of the month at a
+local time (SCHEDULE_TIMEZONE). Due schedules are claimed with a conditional
+UPDATE, so several processes polling the same database never launch a run twice.
+"""
+
+import asyncio
+import calendar
+import datetime as dt
+import logging
+import re
+from dataclasses import dataclass
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from aiogram import Bot
+
+from app.config import Settings
+from app.models import Campaign, CampaignSchedule
+from app.services import broadcasts, db, segments
+from app.services.reachability import setup_reachability
+
+logger = logging.getLogger(__name__)
+
+POLL_SECONDS = 30.0
+
+_ONCE_RE = re.compile(r"^(\d{1,2})\.(\d{1,2})\.(\d{4})\s+(\d{1,2}):(\d{2})$")
+_MONTHLY_RE = re.compile(r"^(?:ежемесячно|monthly)\s+(\d{1,2})\s+(\d{1,2}):(\d{2})$", re.IGNORECASE)
+
+
+@dataclass(frozen=True)
+class ScheduleSpec:
+    repeat: str
+    run_at: dt.datetime
+    day_of_month: Optional[int] = None
+    time_of_day: Optional[str] = None
+
+
+def _to_utc(local: dt.datetime) -> dt.datetime:
+    # Stored timestamps are naive UTC, like everywhere else in the database.
+    return local.astimezone(dt.timezone.utc).replace(tzinfo=None)
+
+
+def next_monthly_run(day: int, time_of_day: str, tz: ZoneInfo, after: dt.datetime) -> dt.datetime:
+    """First run strictly after `after` (naive UTC); days past the month's end use its last day."""
+    hour, minute = (int(part) for part in time_of_day.split(":"))
+    local = after.replace(tzinfo=dt.timezone.utc).astimezone(tz)
+    year, month = local.year, local.month
+    while True:
+        last_day = calendar.monthrange(year, month)[1]
+        candidate = _to_utc(dt.datetime(year, month, min(day, last_day), hour, minute, tzinfo=tz))
+        if candidate > after:
+            return candidate
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+
+
+def parse_schedule(text: str, tz: ZoneInfo, now: dt.datetime) -> Optional[ScheduleSpec]:
+    """
+    Accepts `ДД.ММ.ГГГГ ЧЧ:ММ` for a one-off run or `ежемесячно Д ЧЧ:ММ` for a
+    monthly one. Returns None for anything else or for a one-off time in the past.
+    """
+    value = " ".join(text.split())
+    match = _ONCE_RE.match(value)
+    if match:
+        day, month, year, hour, minute = (int(part) for part in match.groups())
+        try:
+            local = dt.datetime(year, month, day, hour, minute, tzinfo=tz)
+        except ValueError:
+            return None
+        run_at = _to_utc(local)
+        return ScheduleSpec("once", run_at) if run_at > now else None
+    match = _MONTHLY_RE.match(value)
+    if match:
+        day, hour, minute = (int(part) for part in match.groups())
+        if not (1 <= day <= 31 and hour < 24 and minute < 60):
+            return None
+        time_of_day = f"{hour:02d}:{minute:02d}"
+        return ScheduleSpec("monthly", next_monthly_run(day, time_of_day, tz, now), day, time_of_day)
+    return None
+
+
+def _next_run(schedule: CampaignSchedule, tz: ZoneInfo, now: dt.datetime) -> Optional[str]:
+    if schedule["repeat"] != "monthly" or not schedule["day_of_month"] or not schedule["time_of_day"]:
+        return None
+    return next_monthly_run(schedule["day_of_month"], schedule["time_of_day"], tz, now).isoformat()
+
+
+async def _send(
+    bot: Bot,
+    settings: Settings,
+    campaign: Campaign,
+    *,
+    launch_id: str,
+    total: int,
+    delay: float,
+    label: str,
+    now: dt.datetime,
+    started_at: str,
+) -> None:
+    # Not reached on cancellation or a crash, so the run stays marked and is resumed.
+    await broadcasts.send_campaign(
+        bot,
+        settings.db_path,
+        campaign,
+        launch_id=launch_id,
+        total=total,
+        delay_seconds=delay,
+        label=label,
+        now=now,
+    )
+    await db.finish_campaign_schedule_run(settings.db_path, campaign["id"], started_at)
+
+
+async def _launch(
+    bot: Bot, settings: Settings, schedule: CampaignSchedule, started_at: str, now: dt.datetime
+) -> Optional[asyncio.Task]:
+    campaign_id = schedule["campaign_id"]
+    campaign = await db.get_campaign(settings.db_path, campaign_id)
+    segment = segments.preset(schedule["segment"], now)
+    if not campaign or segment is None:
+        logger.warning("Scheduled broadcast skipped campaign_id=%s segment=%s", campaign_id, schedule["segment"])
+        await db.finish_campaign_schedule_run(settings.db_path, campaign_id, started_at)
+        return None
+    # The run's start time is its launch id, so a resumed run finds the rows it already sent.
+    launch_id, total = await broadcasts.prepare(settings.db_path, campaign_id, segment, launch_id=started_at)
+    if not total:
+        logger.info("Scheduled broadcast has no audience campaign_id=%s", campaign_id)
+        await db.finish_campaign_schedule_run(settings.db_path, campaign_id, started_at)
+        return None
+    delay = broadcasts.spread_delay(total, schedule["spread_seconds"])
+    return asyncio.create_task(
+        _send(
+            bot,
+            settings,
+            campaign,
+            launch_id=launch_id,
+            total=total,
+            delay=delay,
+            label=schedule["segment"],
+            now=now,
+            started_at=started_at,
+        )
+    )
+
+
+async def run_due(bot: Bot, settings: Settings, now: Optional[dt.datetime] = None) -> list[asyncio.Task]:
+    """Claims due schedules and starts their broadcasts. Returns the started send tasks."""
+    now = now or dt.datetime.utcnow()
+    tz = ZoneInfo(settings.schedule_timezone)
+    tasks: list[asyncio.Task] = []
+    for schedule in await db.fetch_due_campaign_schedules(settings.db_path, now.isoformat()):
+        started_at = await db.claim_campaign_schedule(
+            settings.db_path, schedule["campaign_id"], schedule["run_at"], _next_run(schedule, tz, now)
+        )
+        if started_at is None:
+            continue
+        logger.info(
+            "Scheduled broadcast due campaign_id=%s run_at=%s",
+            schedule["campaign_id"],
+            schedule["run_at"],
+        )
+        task = await _launch(bot, settings, schedule, started_at, now)
+        if task is not None:
+            tasks.append(task)
+    return tasks
+
+
+async def resume_unfinished(bot: Bot, settings: Settings) -> list[asyncio.Task]:
+    """
+    Restarts runs left unfinished by a previous process. Call once at startup,
+    before any run of this process is claimed.
+    """
+    tasks: list[asyncio.Task] = []
+    for schedule in await db.fetch_running_campaign_schedules(settings.db_path):
+        started_at = schedule["running_since"]
+        logger.info("Scheduled broadcast resumed campaign_id=%s started_at=%s", schedule["campaign_id"], started_at)
+        task = await _launch(bot, settings, schedule, started_at, dt.datetime.fromisoformat(started_at))
+        if task is not None:
+            tasks.append(task)
+    return tasks
+
+
+async def run_scheduler(bot: Bot, settings: Settings, *, poll_seconds: float = POLL_SECONDS) -> None:
+    setup_reachability(settings.db_path)
+    running: set[asyncio.Task] = set()
+    logger.info("Scheduler started poll=%ss", poll_seconds)
+    resume = True
+    while True:
+        try:
+            if resume:
+                for task in await resume_unfinished(bot, settings):
+                    running.add(task)
+                    task.add_done_callback(running.discard)
+                resume = False
+            for task in await run_due(bot, settings):
+                running.add(task)
+                task.add_done_callback(running.discard)
+        except Exception:
+            logger.exception("Scheduler poll failed")
+        await asyncio.sleep(poll_seconds)
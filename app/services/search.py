@@ -0,0 +1,40 @@
+"""
+Admin full-text search over reviews and campaign responses (FTS5 indexes kept
+in sync by triggers, see `db.CREATE_SEARCH_SQL`). Free text from the admin is
+reduced to word prefixes, so FTS5 query syntax never reaches MATCH verbatim.
+"""
+
+import html
+import re
+from pathlib import Path
+from typing import Optional
+
+from app.models import SearchHit
+from app.services import db
+
+PAGE_SIZE = 8
+MAX_TERMS = 8
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def build_match(query: str) -> Optional[str]:
+    """`Иван 7999` -> `"иван"* "7999"*`: every word must match as a prefix."""
+    terms = _WORD_RE.findall(query.lower())[:MAX_TERMS]
+    if not terms:
+        return None
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+def snippet_html(snippet: Optional[str]) -> str:
+    text = html.escape(snippet or "")
+    return text.replace(db.SNIPPET_OPEN, "<b>").replace(db.SNIPPET_CLOSE, "</b>")
+
+
+async def find(db_path: Path, query: str, page: int) -> tuple[list[SearchHit], bool]:
+    """Returns the hits of page `page` (1-based) and whether there is a next page."""
+    match = build_match(query)
+    if match is None or page < 1:
+        return [], False
+    hits = await db.search(db_path, match, limit=PAGE_SIZE + 1, offset=(page - 1) * PAGE_SIZE)
+    return hits[:PAGE_SIZE], len(hits) > PAGE_SIZE
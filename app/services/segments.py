@@ -0,0 +1,99 @@
+"""
+Broadcast audiences described as filters and compiled into one SQL query
+that selects `user_id`s. Purchase filters combine with AND and apply to paid
+orders; `min_spend_kopeks` is the sum of the orders that matched the other
+filters. Users recorded in `user_reachability` (the bot was blocked or the
+chat is gone) are excluded until their re-probe time unless
+`exclude_unreachable` is off.
+"""
+
+import datetime as dt
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+BLOCKED_ERROR = "blocked_by_user"
+
+
+@dataclass(frozen=True)
+class Segment:
+    product_id: Optional[str] = None
+    kind: Optional[str] = None
+    paid_from: Optional[dt.datetime] = None
+    paid_to: Optional[dt.datetime] = None
+    min_spend_kopeks: Optional[int] = None
+    never_bought: bool = False
+    exclude_unreachable: bool = True
+
+    def has_purchase_filters(self) -> bool:
+        return any(
+            value is not None
+            for value in (self.product_id, self.kind, self.paid_from, self.paid_to, self.min_spend_kopeks)
+        )
+
+
+def _iso(value: dt.datetime) -> str:
+    # orders.paid_at is a naive UTC isoformat string.
+    if value.tzinfo is not None:
+        value = value.astimezone(dt.timezone.utc).replace(tzinfo=None)
+    return value.isoformat()
+
+
+def compile_segment(segment: Segment, now: Optional[dt.datetime] = None) -> tuple[str, list[Any]]:
+    """
+    Returns (sql, params) for a query yielding distinct `user_id`s. Unreachable
+    users whose `probe_after` is before `now` are included again, so the next
+    broadcast re-probes them.
+    """
+    params: list[Any] = []
+    if segment.never_bought:
+        if segment.has_purchase_filters():
+            raise ValueError("never_bought can't be combined with purchase filters")
+        sql = (
+            "SELECT u.user_id FROM users AS u "
+            "WHERE u.user_id NOT IN (SELECT o.user_id FROM orders AS o WHERE o.status = 'paid')"
+        )
+    else:
+        conditions = ["o.status = 'paid'"]
+        if segment.product_id is not None:
+            conditions.append("o.product_id = ?")
+            params.append(segment.product_id)
+        if segment.kind is not None:
+            if segment.kind not in ("month", "year"):
+                raise ValueError(f"unknown product kind: {segment.kind}")
+            conditions.append("o.product_id LIKE ?")
+            params.append(f"{segment.kind}:%")
+        if segment.paid_from is not None:
+            conditions.append("o.paid_at >= ?")
+            params.append(_iso(segment.paid_from))
+        if segment.paid_to is not None:
+            conditions.append("o.paid_at < ?")
+            params.append(_iso(segment.paid_to))
+        sql = f"SELECT o.user_id FROM orders AS o WHERE {' AND '.join(conditions)} GROUP BY o.user_id"
+        if segment.min_spend_kopeks is not None:
+            sql += " HAVING SUM(o.amount_kopeks) >= ?"
+            params.append(segment.min_spend_kopeks)
+    if segment.exclude_unreachable:
+        # NOT IN is evaluated once instead of probing user_reachability per user.
+        sql = (
+            f"SELECT s.user_id FROM ({sql}) AS s "
+            "WHERE s.user_id NOT IN (SELECT r.user_id FROM user_reachability AS r WHERE r.probe_after > ?)"
+        )
+        params.append(_iso(now or dt.datetime.now(dt.timezone.utc)))
+    return sql, params
+
+
+# Audiences offered when launching a broadcast.
+PRESETS: dict[str, Callable[[dt.datetime], Segment]] = {
+    "all": lambda now: Segment(),
+    "month": lambda now: Segment(kind="month"),
+    "year": lambda now: Segment(kind="year"),
+    "recent": lambda now: Segment(paid_from=now - dt.timedelta(days=30)),
+    "never": lambda now: Segment(never_bought=True),
+}
+
+
+def preset(name: str, now: Optional[dt.datetime] = None) -> Optional[Segment]:
+    factory = PRESETS.get(name)
+    if factory is None:
+        return None
+    return factory(now or dt.datetime.now(dt.timezone.utc))
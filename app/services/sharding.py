@@ -0,0 +1,207 @@
+import asyncio
+import logging
+import multiprocessing
+from collections.abc import Awaitable, Callable
+from queue import Full
+from typing import Any, Optional, TypeVar
+
+import aiohttp
+
+from app.config import Settings
+
+logger = logging.getLogger(__name__)
+
+TELEGRAM_API_URL = "https://api.telegram.org"
+POLL_TIMEOUT_SECONDS = 30
+WORKER_QUEUE_SIZE = 1000
+
+# Every update type Telegram sends carries the acting user under one of these keys.
+_USER_FIELDS = {
+    "message": "from",
+    "edited_message": "from",
+    "channel_post": "from",
+    "edited_channel_post": "from",
+    "callback_query": "from",
+    "inline_query": "from",
+    "chosen_inline_result": "from",
+    "shipping_query": "from",
+    "pre_checkout_query": "from",
+    "my_chat_member": "from",
+    "chat_member": "from",
+    "chat_join_request": "from",
+    "poll_answer": "user",
+}
+
+T = TypeVar("T")
+
+
+def extract_user_id(update: dict[str, Any]) -> Optional[int]:
+    for update_type, user_field in _USER_FIELDS.items():
+        payload = update.get(update_type)
+        if not isinstance(payload, dict):
+            continue
+        user = payload.get(user_field)
+        if isinstance(user, dict) and "id" in user:
+            return int(user["id"])
+        chat = payload.get("chat")
+        if isinstance(chat, dict) and "id" in chat:
+            return int(chat["id"])
+    return None
+
+
+def shard_for(update: dict[str, Any], workers: int) -> int:
+    user_id = extract_user_id(update)
+    if user_id is None:
+        return 0
+    return user_id % workers
+
+
+class KeyedSerializer:
+    """
+    Runs coroutines for the same key one after another, in submission order,
+    while different keys proceed concurrently.
+    """
+
+    def __init__(self) -> None:
+        self._locks: dict[int, asyncio.Lock] = {}
+        self._pending: dict[int, int] = {}
+
+    async def run(self, key: int, factory: Callable[[], Awaitable[T]]) -> T:
+        lock = self._locks.get(key)
+        if lock is None:
+            lock = self._locks[key] = asyncio.Lock()
+        self._pending[key] = self._pending.get(key, 0) + 1
+        try:
+            async with lock:
+                return await factory()
+        finally:
+            self._pending[key] -= 1
+            if not self._pending[key]:
+                del self._pending[key]
+                del self._locks[key]
+
+    def __len__(self) -> int:
+        return len(self._locks)
+
+
+async def _worker_loop(index: int, settings: Settings, queue: multiprocessing.Queue) -> None:
+    from aiogram import Bot
+    from aiogram.enums import ParseMode
+
+    from app.dispatcher import build_dispatcher
+    from app.services.blocking import setup_blocking_io
+
+    setup_blocking_io(settings)
+    bot = Bot(token=settings.bot_token, parse_mode=ParseMode.HTML)
+    dp = build_dispatcher(settings)
+    serializer = KeyedSerializer()
+    tasks: set[asyncio.Task] = set()
+    loop = asyncio.get_running_loop()
+
+    async def _process(raw: dict[str, Any]) -> None:
+        try:
+            await dp.feed_raw_update(bot, raw)
+        except Exception:
+            logger.exception("Worker %s failed to process update %s", index, raw.get("update_id"))
+
+    await dp.emit_startup(bot=bot, **dp.workflow_data)
+    logger.info("Worker %s started", index)
+    try:
+        while True:
+            raw = await loop.run_in_executor(None, queue.get)
+            if raw is None:
+                break
+            key = extract_user_id(raw) or 0
+            task = asyncio.create_task(serializer.run(key, lambda raw=raw: _process(raw)))
+            tasks.add(task)
+            task.add_done_callback(tasks.discard)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+    finally:
+        await dp.emit_shutdown(bot=bot, **dp.workflow_data)
+        await bot.session.close()
+        logger.info("Worker %s stopped", index)
+
+
+def _worker_entry(index: int, settings: Settings, queue: multiprocessing.Queue) -> None:
+    from app.services.logs import setup_logging
+
+    setup_logging(settings, process_tag=f"worker-{index}")
+    try:
+        asyncio.run(_worker_loop(index, settings, queue))
+    except KeyboardInterrupt:
+        pass
+
+
+async def _get_updates(
+    http: aiohttp.ClientSession,
+    settings: Settings,
+    offset: Optional[int],
+    allowed_updates: list[str],
+) -> list[dict[str, Any]]:
+    payload: dict[str, Any] = {
+        "timeout": POLL_TIMEOUT_SECONDS,
+        "allowed_updates": allowed_updates,
+    }
+    if offset is not None:
+        payload["offset"] = offset
+    url = f"{TELEGRAM_API_URL}/bot{settings.bot_token}/getUpdates"
+    timeout = aiohttp.ClientTimeout(total=POLL_TIMEOUT_SECONDS + 10)
+    async with http.post(url, json=payload, timeout=timeout) as response:
+        data = await response.json()
+    if data.get("ok"):
+        return data.get("result", [])
+    retry_after = (data.get("parameters") or {}).get("retry_after")
+    logger.warning("getUpdates failed: %s", data.get("description"))
+    await asyncio.sleep(retry_after or 1)
+    return []
+
+
+async def run_sharded(settings: Settings) -> None:
+    """
+    Front process for WORKERS > 1: long-polls Telegram without parsing updates
+    and routes each raw update to worker `user_id % WORKERS`. A worker owns its
+    users' FSM state (MemoryStorage) and processes their updates in order.
+    """
+    from app.dispatcher import build_dispatcher
+
+    allowed_updates = build_dispatcher(settings).resolve_used_update_types()
+    context = multiprocessing.get_context("spawn")
+    queues = [context.Queue(maxsize=WORKER_QUEUE_SIZE) for _ in range(settings.workers)]
+    processes = [
+        context.Process(target=_worker_entry, args=(index, settings, queue), name=f"bot-worker-{index}")
+        for index, queue in enumerate(queues)
+    ]
+    for process in processes:
+        process.start()
+    logger.info("Started %s workers", len(processes))
+
+    loop = asyncio.get_running_loop()
+    offset: Optional[int] = None
+    try:
+        async with aiohttp.ClientSession() as http:
+            while True:
+                dead = [process.name for process in processes if not process.is_alive()]
+                if dead:
+                    raise RuntimeError(f"Worker process exited: {', '.join(dead)}")
+                try:
+                    updates = await _get_updates(http, settings, offset, allowed_updates)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as exc:
+                    logger.warning("getUpdates request error: %s", exc)
+                    await asyncio.sleep(1)
+                    continue
+                for update in updates:
+                    shard = shard_for(update, settings.workers)
+                    # Awaited one by one so updates keep their order inside a shard queue.
+                    await loop.run_in_executor(None, queues[shard].put, update)
+                    offset = update["update_id"] + 1
+    finally:
+        for queue in queues:
+            try:
+                queue.put(None, timeout=5)
+            except Full:
+                pass
+        for process in processes:
+            process.join(timeout=30)
+            if process.is_alive():
+                process.terminate()
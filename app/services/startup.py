@@ -0,0 +1,83 @@
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+
+PROJECT_ROOT = Path(__file__).resolve().parents[2]
+
+
+@dataclass
+class ImportNode:
+    name: str
+    self_us: int
+    cumulative_us: int
+    children: list["ImportNode"] = field(default_factory=list)
+
+
+def parse_importtime(output: str) -> list[ImportNode]:
+    """
+    Builds a tree from `python -X importtime` stderr.
+
+    CPython prints a module after everything it imported, one level of two-space
+    indentation per nesting level, so children always precede their parent.
+    """
+    pending: list[tuple[int, ImportNode]] = []
+    for line in output.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            self_us = int(parts[0])
+            cumulative_us = int(parts[1])
+        except ValueError:
+            continue
+        raw_name = parts[2]
+        name = raw_name.strip()
+        depth = (len(raw_name) - len(raw_name.lstrip(" ")) - 1) // 2
+        node = ImportNode(name=name, self_us=self_us, cumulative_us=cumulative_us)
+        while pending and pending[-1][0] > depth:
+            node.children.insert(0, pending.pop()[1])
+        pending.append((depth, node))
+    return [node for _, node in pending]
+
+
+def collect_importtime(entry: str = "app.dispatcher") -> str:
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {entry}"],
+        cwd=PROJECT_ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return result.stderr
+
+
+def render_import_tree(
+    roots: list[ImportNode],
+    *,
+    min_ms: float = 5.0,
+    max_depth: int = 6,
+) -> str:
+    lines: list[str] = []
+
+    def _walk(node: ImportNode, depth: int) -> None:
+        if node.cumulative_us / 1000 < min_ms or depth > max_depth:
+            return
+        lines.append(
+            f"{node.cumulative_us / 1000:9.1f} ms {node.self_us / 1000:8.1f} ms  {'  ' * depth}{node.name}"
+        )
+        for child in sorted(node.children, key=lambda item: item.cumulative_us, reverse=True):
+            _walk(child, depth + 1)
+
+    total_us = sum(node.cumulative_us for node in roots)
+    lines.append(f"Total import time: {total_us / 1000:.1f} ms (showing modules >= {min_ms:g} ms)")
+    lines.append(f"{'cumulative':>12} {'self':>11}  module")
+    for root in sorted(roots, key=lambda item: item.cumulative_us, reverse=True):
+        _walk(root, 0)
+    return "\n".join(lines)
+
+
+def profile_startup(entry: str = "app.dispatcher", *, min_ms: float = 5.0, max_depth: int = 6) -> str:
+    return render_import_tree(parse_importtime(collect_importtime(entry)), min_ms=min_ms, max_depth=max_depth)
@@ -0,0 +1,82 @@
+"""
+Cleans up after abandoned purchases. Every `pay:` click creates an order, and
+an invoice nobody pays stays `invoice_sent` forever, so on a timer the sweeper
+expires unpaid orders older than ORDER_TTL_HOURS, returns users stuck in
+`order_initiated`/`payment_pending` to idle and deletes promo code uses left
+without a live order. Each step runs in short batched statements so that the
+write lock is never held for long.
+"""
+
+import asyncio
+import datetime as dt
+import logging
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+import aiosqlite
+
+from app.config import Settings
+from app.services import db
+from app.services.state_machine import UserState
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 500
+STUCK_STATES = (UserState.ORDER_INITIATED.value, UserState.PAYMENT_PENDING.value)
+
+@dataclass(frozen=True)
+class SweepResult:
+    expired_orders: int = 0
+    reset_users: int = 0
+    deleted_promocode_uses: int = 0
+
+
+async def _drain(step: Callable[[], Awaitable[int]]) -> int:
+    total = 0
+    while True:
+        count = await step()
+        total += count
+        if count < BATCH_SIZE:
+            return total
+        # Let handlers get at the database between batches.
+        await asyncio.sleep(0)
+
+
+async def sweep(db_path: Path, ttl: dt.timedelta, now: Optional[dt.datetime] = None) -> SweepResult:
+    before = ((now or dt.datetime.utcnow()) - ttl).isoformat()
+    return SweepResult(
+        expired_orders=await _drain(lambda: db.expire_stale_orders(db_path, before=before, limit=BATCH_SIZE)),
+        reset_users=await _drain(
+            lambda: db.reset_stuck_users(
+                db_path,
+                states=STUCK_STATES,
+                idle_state=UserState.IDLE.value,
+                before=before,
+                limit=BATCH_SIZE,
+            )
+        ),
+        deleted_promocode_uses=await _drain(lambda: db.delete_orphaned_promocode_uses(db_path, limit=BATCH_SIZE)),
+    )
+
+
+async def run_sweeper(settings: Settings) -> None:
+    ttl = dt.timedelta(hours=settings.order_ttl_hours)
+    interval = settings.sweep_interval_minutes * 60
+    logger.info("Sweeper started ttl=%sh interval=%ss", settings.order_ttl_hours, interval)
+    while True:
+        started_at = time.monotonic()
+        try:
+            result = await sweep(settings.db_path, ttl)
+        except aiosqlite.Error:
+            logger.exception("Sweep failed")
+        else:
+            logger.info(
+                "Sweep done expired_orders=%s reset_users=%s deleted_promocode_uses=%s duration=%.2fs",
+                result.expired_orders,
+                result.reset_users,
+                result.deleted_promocode_uses,
+                time.monotonic() - started_at,
+            )
+        await asyncio.sleep(interval)
@@ -388,6 +388,40 @@ def admin_stats_total(count: int, total_rub: float) -> str:
     return f"Итого: {count} шт. / {total_rub:.0f} ₽"
 
 
+def admin_stats_trend(days: int, count: int, total_rub: float) -> str:
+    return f"Продажи за {days} дн. (по дням, UTC)\nИтого: {count} шт. / {total_rub:.0f} ₽"
+
+
+FUNNEL_STEP_LABELS = {
+    "mode": "Выбор типа прогноза",
+    "year": "Выбор года",
+    "sign": "Выбор знака",
+    "pay": "Нажали «Оплатить»",
+    "referral_prompt": "Вопрос о промокоде",
+    "invoice": "Счёт отправлен",
+    "checkout": "Подтверждение оплаты",
+    "payment": "Оплата прошла",
+    "review": "Начали отзыв",
+}
+
+
+def admin_stats_funnel(days: int, steps: list[tuple[str, int, float | None]]) -> str:
+    lines = [f"Воронка покупки за {days} дн. (события, конверсия от предыдущего шага):", ""]
+    for step, count, share in steps:
+        label = FUNNEL_STEP_LABELS.get(step, step)
+        suffix = f" ({share:.0%})" if share is not None else ""
+        lines.append(f"{label}: {count}{suffix}")
+    return "\n".join(lines)
+
+
+def admin_stats_funnel_empty(days: int) -> str:
+    return f"За последние {days} дн. событий воронки нет."
+
+
+def admin_stats_trend_empty(days: int) -> str:
+    return f"За {days} дн. нет оплаченных заказов."
+
+
 def admin_session_reset() -> str:
     return "Сессия сброшена. Запусти /admin заново."
 
@@ -416,6 +450,118 @@ def admin_upload_finished_year(year: str, sign: str) -> str:
     return f"Загрузка завершена для {year} года, {sign_name}."
 
 
+def admin_album_saved(count: int) -> str:
+    return f"Сохранено файлов из альбома: {count}."
+
+
+def admin_album_save_failed(count: int) -> str:
+    return f"Не удалось скачать альбом ({count} файлов), ничего не сохранено. Отправь его еще раз."
+
+
+def admin_upload_duplicates(count: int) -> str:
+    if count == 1:
+        return "Такой файл уже есть в этом прогнозе, повторно не добавлен."
+    return f"Файлов-дубликатов пропущено: {count}."
+
+
+def _format_size(size_bytes: int) -> str:
+    if size_bytes >= 1024 * 1024:
+        return f"{size_bytes / (1024 * 1024):.1f} МБ"
+    return f"{size_bytes / 1024:.0f} КБ"
+
+
+def admin_image_savings(original_bytes: int, optimized_bytes: int) -> str:
+    if optimized_bytes >= original_bytes or not original_bytes:
+        return "Сжатие не уменьшило файл, отправляется оригинал."
+    percent = round((original_bytes - optimized_bytes) * 100 / original_bytes)
+    return (
+        f"Сжатие: {_format_size(original_bytes)} → {_format_size(optimized_bytes)} (−{percent}%). "
+        "Оригинал сохранен отдельно."
+    )
+
+
+_ARCHIVE_SKIP_REASONS = {
+    "layout": "не по структуре папок",
+    "year": "неверный год",
+    "month": "неверный месяц",
+    "sign": "неизвестный знак",
+    "extension": "неподдерживаемый формат",
+    "size": "слишком большой файл",
+    "corrupt": "файл поврежден",
+    "encrypted": "файл защищен паролем",
+    "compression": "неподдерживаемое сжатие",
+}
+
+
+def admin_archive_prompt() -> str:
+    return (
+        "Отправь ZIP-архив документом (до 20 МБ).\n"
+        "Структура папок:\n"
+        "month/2026/04/leo/01.jpg — месячный прогноз\n"
+        "year/2027/aries.png — годовой прогноз\n"
+        "Знаки — латиницей, как в названиях папок на сервере."
+    )
+
+
+def admin_archive_invalid_file() -> str:
+    return "Нужен ZIP-архив, отправленный как документ."
+
+
+def admin_archive_processing() -> str:
+    return "Архив получен, распаковываю…"
+
+
+def admin_archive_failed() -> str:
+    return "Не удалось прочитать архив: он поврежден, слишком большой или содержит слишком много файлов."
+
+
+def admin_backup_running() -> str:
+    return "Делаю резервную копию базы…"
+
+
+def admin_backup_done(created_at: str, size_kb: int, total: int) -> str:
+    return f"Резервная копия готова: {created_at}, {size_kb} КБ. Хранится копий: {total}."
+
+
+def admin_backup_status(created_at: str | None, age_minutes: int, size_kb: int, total: int) -> str:
+    if created_at is None:
+        return "Резервных копий пока нет."
+    hours, minutes = divmod(age_minutes, 60)
+    if hours >= 48:
+        age = f"{hours // 24} дн."
+    elif hours:
+        age = f"{hours} ч {minutes} мин"
+    else:
+        age = f"{minutes} мин"
+    return f"Последняя резервная копия: {created_at} ({age} назад), {size_kb} КБ. Хранится копий: {total}."
+
+
+def admin_backup_failed(last: str | None) -> str:
+    tail = f"Последняя удачная: {last}." if last else "Удачных копий пока нет."
+    return f"Не удалось сделать резервную копию, подробности в логе. {tail}"
+
+
+def admin_archive_report(
+    added: dict[tuple[str, str, str | None, str], int],
+    duplicates: int,
+    skipped: list[tuple[str, str]],
+) -> str:
+    lines = [f"Импорт завершен. Добавлено файлов: {sum(added.values())}."]
+    for (kind, year, month, sign), count in added.items():
+        sign_name = SIGNS_RU.get(sign, sign)
+        period = f"{year} год" if kind == "year" else f"{month}.{year}"
+        lines.append(f"• {period}, {sign_name}: {count}")
+    if duplicates:
+        lines.append(f"Дубликатов пропущено: {duplicates}.")
+    if skipped:
+        lines.append(f"Пропущено файлов: {len(skipped)}.")
+        for name, reason in skipped[:10]:
+            lines.append(f"• {name} — {_ARCHIVE_SKIP_REASONS.get(reason, reason)}")
+        if len(skipped) > 10:
+            lines.append(f"…и еще {len(skipped) - 10}")
+    return "\n".join(lines)
+
+
 def review_prompt() -> str:
     return (
         "Спасибо, что купили гороскоп!\n\n"
@@ -524,10 +670,11 @@ def review_reward_caption() -> str:
 # === Broadcasts ===
 
 
-def admin_broadcasts_menu(audience_size: int) -> str:
-    return (
-        f"Аудитория рассылок: {audience_size}"
-    )
+def admin_broadcasts_menu(audience_size: int, unreachable: int = 0, due: int = 0) -> str:
+    text = f"Аудитория рассылок: {audience_size}"
+    if unreachable:
+        text += f"\nНедоступны (заблокировали бота): {unreachable}, из них на повторной проверке: {due}"
+    return text
 
 
 def admin_broadcasts_list_title() -> str:
@@ -599,10 +746,100 @@ def admin_broadcast_response_detail(title: str, response: dict) -> str:
     )
 
 
+def admin_find_usage() -> str:
+    return "Поиск по отзывам и ответам на рассылки: /find текст (например, /find Иван 7999)."
+
+
+def admin_find_empty(query: str) -> str:
+    return f"По запросу «{query}» ничего не найдено."
+
+
+def admin_find_results(query: str, page: int, lines: list[str]) -> str:
+    return f"Поиск «{query}», страница {page}:\n\n" + "\n\n".join(lines)
+
+
+def admin_find_hit(index: int, source: str, created: str, user_id: int, snippet: str) -> str:
+    label = "Отзыв" if source == "review" else "Ответ на рассылку"
+    return f"{index}. {label}, {created}, user {user_id}\n{snippet}"
+
+
+def admin_export_usage(kinds: tuple[str, ...]) -> str:
+    return f"Выгрузка в CSV: /export {'|'.join(kinds)} (например, /export orders)."
+
+
+def admin_export_running(kind: str) -> str:
+    return f"Готовлю выгрузку {kind}…"
+
+
+def admin_export_done(kind: str, rows: int) -> str:
+    return f"Выгрузка {kind}: {rows} строк, CSV в UTF-8, сжат gzip."
+
+
+def admin_export_too_large(size_mb: int) -> str:
+    return f"Выгрузка получилась {size_mb} МБ, Telegram принимает файлы до 50 МБ."
+
+
+def admin_export_failed() -> str:
+    return "Не удалось сделать выгрузку, подробности в логе."
+
+
 def admin_broadcast_launch_started(title: str, audience_size: int) -> str:
     return f"Запускаю рассылку «{title}». Получателей: {audience_size}."
 
 
+def admin_broadcast_choose_segment(title: str) -> str:
+    return f"Кому отправить рассылку «{title}»? В скобках — число получателей без недоступных (заблокировавших бота)."
+
+
+def admin_broadcast_segment_empty() -> str:
+    return "В этом сегменте нет получателей."
+
+
+def admin_broadcast_schedule_description(
+    repeat: str,
+    next_run: str,
+    day_of_month: int | None = None,
+    time_of_day: str | None = None,
+) -> str:
+    if repeat == "monthly":
+        return f"ежемесячно {day_of_month} числа в {time_of_day}, следующий запуск {next_run}"
+    return f"однократно {next_run}"
+
+
+def admin_broadcast_schedule_prompt(title: str, current: str | None) -> str:
+    current_line = f"Сейчас: {current}\n\n" if current else ""
+    return (
+        f"Расписание рассылки «{title}»\n\n"
+        f"{current_line}"
+        "Отправь время запуска:\n"
+        "• 25.11.2026 10:00 — один раз\n"
+        "• ежемесячно 25 10:00 — каждый месяц 25 числа\n\n"
+        "В тексте рассылки можно написать {next_month} — подставится следующий месяц."
+    )
+
+
+def admin_broadcast_schedule_invalid() -> str:
+    return "Не понял время. Пример: 25.11.2026 10:00 или ежемесячно 25 10:00. Время должно быть в будущем."
+
+
+def admin_broadcast_schedule_choose_segment(title: str, when: str) -> str:
+    return f"Рассылка «{title}» — {when}. Кому отправлять?"
+
+
+def admin_broadcast_scheduled(title: str, when: str, audience: int, finish: str, *, stretched: bool) -> str:
+    text = (
+        f"Рассылка «{title}» запланирована: {when}.\n"
+        f"Сейчас в сегменте {audience} получателей, первый запуск закончится примерно {finish}."
+    )
+    if stretched:
+        text += " Это дольше BROADCAST_SPREAD_MINUTES: бот отправляет не больше двух сообщений в секунду."
+    return text
+
+
+def admin_broadcast_schedule_cancelled(title: str) -> str:
+    return f"Расписание рассылки «{title}» отменено."
+
+
 def admin_broadcast_launch_ack() -> str:
     return "Рассылка была запущена."
 
@@ -0,0 +1,349 @@
+"""
+Benchmark runner for ``app.services.db``.
+
+Usage:
+    python -m benchmarks.db_bench --scale 0.05
+    python -m benchmarks.db_bench --db /tmp/bench.sqlite3 --reuse --baseline benchmarks/results/baseline.json
+
+Every public coroutine (and async iterator) in ``db.py`` is timed against a seeded database.  Results
+are written as JSON; with ``--baseline`` the run is compared against an earlier
+result and the process exits with status 1 when any function got slower than
+the allowed ratio.  Functions without a registered case are listed as
+uncovered so new queries don't silently escape the suite.
+"""
+
+import argparse
+import asyncio
+import datetime as dt
+import inspect
+import itertools
+import json
+import platform
+import sqlite3
+import statistics
+import sys
+import time
+import uuid
+from pathlib import Path
+from typing import Awaitable, Callable
+
+from app.services import db
+from app.services.segments import Segment
+
+from .seed import SeedInfo, seed_database
+
+BenchCase = Callable[[Path, SeedInfo], Awaitable[object]]
+
+DEFAULT_RESULTS_DIR = Path(__file__).resolve().parent / "results"
+DEFAULT_DB_PATH = DEFAULT_RESULTS_DIR / "bench.sqlite3"
+
+_counter = itertools.count()
+
+
+def _unique(prefix: str) -> str:
+    return f"{prefix}-{next(_counter)}-{uuid.uuid4().hex[:8]}"
+
+
+async def _drain(iterator) -> int:
+    count = 0
+    async for _ in iterator:
+        count += 1
+    return count
+
+
+def _unique_user_id() -> int:
+    # Negative ids never collide with seeded users, and stay unique across --reuse runs.
+    return -(uuid.uuid4().int % 10**12) - 1
+
+
+async def _archive_rows(path: Path) -> int:
+    archive_path = path.with_name("bench-archive.sqlite3")
+    await db.init_archive_db(archive_path)
+    # A horizon far in the past measures the scan without moving seeded rows.
+    return await db.archive_rows(path, archive_path, "orders", before="2000-01-01", limit=500)
+
+
+CASES: dict[str, BenchCase] = {
+    "init_db": lambda path, info: db.init_db(path),
+    # orders
+    "create_order": lambda path, info: db.create_order(path, info.user_id, "month:2025-06:leo", 59000, "RUB"),
+    "create_paid_order": lambda path, info: db.create_paid_order(
+        path, info.user_id, "month:2025-06:leo", 59000, "RUB", _unique("charge")
+    ),
+    "get_order": lambda path, info: db.get_order(path, info.order_id),
+    "update_status": lambda path, info: db.update_status(path, info.order_id, "invoice_sent"),
+    "mark_invoice_sent": lambda path, info: db.mark_invoice_sent(path, info.order_id),
+    "update_order_amount": lambda path, info: db.update_order_amount(path, info.order_id, 59000),
+    "mark_paid": lambda path, info: db.mark_paid(path, info.paid_order_id, "charge-0"),
+    "mark_payment_failed": lambda path, info: db.mark_payment_failed(path, info.order_id),
+    "mark_delivered": lambda path, info: db.mark_delivered(path, info.paid_order_id),
+    # sales stats
+    "fetch_sales_stats": lambda path, info: db.fetch_sales_stats(path),
+    "fetch_paid_months_page": lambda path, info: db.fetch_paid_months_page(path, limit=9, offset=0),
+    "fetch_paid_years_page": lambda path, info: db.fetch_paid_years_page(path, limit=13, offset=0),
+    "fetch_month_sales_breakdown": lambda path, info: db.fetch_month_sales_breakdown(path, ym=info.ym),
+    "fetch_year_sales_breakdown": lambda path, info: db.fetch_year_sales_breakdown(path, year=info.year),
+    # reviews
+    "create_review_request": lambda path, info: db.create_review_request(
+        path, info.paid_order_id, info.user_id, "month:2025-06:leo"
+    ),
+    "update_review_contact": lambda path, info: db.update_review_contact(
+        path, info.paid_order_id, info.user_id, username="bench"
+    ),
+    "mark_review_submitted": lambda path, info: db.mark_review_submitted(path, info.paid_order_id, "bench"),
+    "mark_review_declined": lambda path, info: db.mark_review_declined(
+        path, info.paid_order_id, info.user_id, "month:2025-06:leo"
+    ),
+    "get_pending_review_for_user": lambda path, info: db.get_pending_review_for_user(path, info.user_id),
+    "fetch_recent_reviews": lambda path, info: db.fetch_recent_reviews(path, limit=30),
+    "fetch_reviews_page": lambda path, info: db.fetch_reviews_page(path, limit=6, offset=0),
+    "fetch_reviews_page_filtered": lambda path, info: db.fetch_reviews_page_filtered(
+        path, kind="month", ym=info.ym, limit=6, offset=0
+    ),
+    "fetch_review_months_page": lambda path, info: db.fetch_review_months_page(path, limit=10, offset=0),
+    "get_review": lambda path, info: db.get_review(path, info.review_id),
+    # users
+    "get_user": lambda path, info: db.get_user(path, info.user_id),
+    "ensure_user": lambda path, info: db.ensure_user(path, info.user_id, "idle", None),
+    "update_user_state": lambda path, info: db.update_user_state(path, info.user_id, "idle", None),
+    # payments
+    "create_payment": lambda path, info: db.create_payment(
+        path, info.paid_order_id, _unique("tx"), "success", 59000, "RUB", "payload"
+    ),
+    "get_payment_by_provider_id": lambda path, info: db.get_payment_by_provider_id(path, info.provider_tx_id),
+    "update_payment_status": lambda path, info: db.update_payment_status(path, info.provider_tx_id, "success"),
+    # promo codes
+    "get_promocode_by_user": lambda path, info: db.get_promocode_by_user(path, info.user_id),
+    "get_promocode_by_code": lambda path, info: db.get_promocode_by_code(path, info.promo_code),
+    "create_promocode": lambda path, info: db.create_promocode(path, _unique_user_id(), _unique("CODE")),
+    "increment_promocode_paid_referrals": lambda path, info: db.increment_promocode_paid_referrals(
+        path, info.promo_code
+    ),
+    "get_promocode_use": lambda path, info: db.get_promocode_use(path, info.order_id),
+    "get_promocode_use_for_user": lambda path, info: db.get_promocode_use_for_user(path, info.user_id, "pending"),
+    "has_applied_promocode_use": lambda path, info: db.has_applied_promocode_use(path, info.user_id),
+    "create_promocode_use": lambda path, info: db.create_promocode_use(path, info.order_id, info.user_id, "pending"),
+    "update_promocode_use": lambda path, info: db.update_promocode_use(
+        path, info.order_id, promo_code=None, referrer_user_id=None, status="pending"
+    ),
+    "delete_promocode_use": lambda path, info: db.delete_promocode_use(path, _unique("order")),
+    "clear_promocode_uses_for_user": lambda path, info: db.clear_promocode_uses_for_user(
+        path, -1, statuses=["awaiting_code", "pending"]
+    ),
+    "apply_promocode_use": lambda path, info: db.apply_promocode_use(path, _unique("order")),
+    "upsert_promocode_intent": lambda path, info: db.upsert_promocode_intent(
+        path, info.user_id, info.promo_code, info.user_id + 1
+    ),
+    "get_promocode_intent": lambda path, info: db.get_promocode_intent(path, info.user_id),
+    "delete_promocode_intent": lambda path, info: db.delete_promocode_intent(path, -1),
+    # campaigns
+    "create_campaign": lambda path, info: db.create_campaign(path, "bench", "body", 0, ""),
+    "list_campaigns": lambda path, info: db.list_campaigns(path),
+    "delete_campaign": lambda path, info: db.delete_campaign(path, _unique("campaign")),
+    "get_campaign": lambda path, info: db.get_campaign(path, info.campaign_id),
+    "count_segment": lambda path, info: db.count_segment(path, Segment()),
+    "add_segment_to_campaign_audience": lambda path, info: db.add_segment_to_campaign_audience(
+        path, info.campaign_id, Segment(kind="year"), _unique("launch")
+    ),
+    "iter_campaign_audience": lambda path, info: _drain(
+        db.iter_campaign_audience(path, info.campaign_id, exclude_statuses=("interested", "declined"))
+    ),
+    "add_campaign_audience": lambda path, info: db.add_campaign_audience(
+        path, info.campaign_id, [info.user_id]
+    ),
+    "update_campaign_audience_status": lambda path, info: db.update_campaign_audience_status(
+        path, info.campaign_id, info.user_id, "sent"
+    ),
+    "get_campaign_audience": lambda path, info: db.get_campaign_audience(path, info.campaign_id),
+    "campaign_has_audience": lambda path, info: db.campaign_has_audience(path, info.campaign_id),
+    "fetch_campaign_audience_stats": lambda path, info: db.fetch_campaign_audience_stats(path, info.campaign_id),
+    "create_or_update_campaign_response": lambda path, info: db.create_or_update_campaign_response(
+        path, info.campaign_id, info.user_id, raw_text="bench"
+    ),
+    "get_pending_campaign_response_for_user": lambda path, info: db.get_pending_campaign_response_for_user(
+        path, info.user_id
+    ),
+    "count_campaign_responses": lambda path, info: db.count_campaign_responses(path, info.campaign_id),
+    "fetch_campaign_responses_page": lambda path, info: db.fetch_campaign_responses_page(
+        path, info.campaign_id, limit=5, offset=0
+    ),
+    "get_campaign_response": lambda path, info: db.get_campaign_response(path, info.response_id),
+    # daily sales rollup
+    "rebuild_daily_sales": lambda path, info: db.rebuild_daily_sales(path),
+    "fetch_daily_sales": lambda path, info: db.fetch_daily_sales(path, since="2000-01-01"),
+    "expire_stale_orders": lambda path, info: db.expire_stale_orders(path, before="2000-01-01", limit=500),
+    "reset_stuck_users": lambda path, info: db.reset_stuck_users(
+        path,
+        states=("order_initiated", "payment_pending"),
+        idle_state="idle",
+        before="2000-01-01",
+        limit=500,
+    ),
+    "delete_orphaned_promocode_uses": lambda path, info: db.delete_orphaned_promocode_uses(path, limit=500),
+    "init_archive_db": lambda path, info: db.init_archive_db(path.with_name("bench-archive.sqlite3")),
+    "archive_rows": lambda path, info: _archive_rows(path),
+    "search": lambda path, info: db.search(path, '"спас"* "прогноз"*', limit=9, offset=0),
+    "iter_export_rows": lambda path, info: _drain(db.iter_export_rows(path, "reviews")),
+    "write_events": lambda path, info: db.write_events(
+        path,
+        [("2024-01-01T10:00:00", _unique_user_id(), "pay") for _ in range(100)],
+        {("2024-01-01T10", "pay"): 100},
+    ),
+    "fetch_event_counts": lambda path, info: db.fetch_event_counts(
+        path, since="2000-01-01T00", until="2100-01-01T00"
+    ),
+    # campaign schedules
+    "upsert_campaign_schedule": lambda path, info: db.upsert_campaign_schedule(
+        path, info.campaign_id, segment="all", repeat="once", run_at="2999-01-01T00:00:00", spread_seconds=3600
+    ),
+    "get_campaign_schedule": lambda path, info: db.get_campaign_schedule(path, info.campaign_id),
+    "delete_campaign_schedule": lambda path, info: db.delete_campaign_schedule(path, "missing"),
+    "fetch_due_campaign_schedules": lambda path, info: db.fetch_due_campaign_schedules(path, "2026-01-01T00:00:00"),
+    "claim_campaign_schedule": lambda path, info: db.claim_campaign_schedule(
+        path, info.campaign_id, "2000-01-01T00:00:00", None
+    ),
+    "finish_campaign_schedule_run": lambda path, info: db.finish_campaign_schedule_run(
+        path, info.campaign_id, "2000-01-01T00:00:00"
+    ),
+    "fetch_running_campaign_schedules": lambda path, info: db.fetch_running_campaign_schedules(path),
+    # callback tokens
+    "claim_callback_token": lambda path, info: db.claim_callback_token(path, _unique("t"), info.order_id),
+    "get_callback_token_value": lambda path, info: db.get_callback_token_value(path, "missing"),
+    # reachability
+    "get_user_reachability": lambda path, info: db.get_user_reachability(path, info.user_id),
+    "mark_user_unreachable": lambda path, info: db.mark_user_unreachable(
+        path, info.user_id + 1, "blocked_by_user", failures=1, probe_after="2999-01-01T00:00:00"
+    ),
+    "mark_user_reachable": lambda path, info: db.mark_user_reachable(path, info.user_id),
+    "fetch_unreachable_user_ids": lambda path, info: db.fetch_unreachable_user_ids(path),
+    "count_unreachable_users": lambda path, info: db.count_unreachable_users(path, "2026-01-01T00:00:00"),
+}
+
+
+def public_db_functions() -> list[str]:
+    return sorted(
+        name
+        for name, member in inspect.getmembers(db, inspect.isfunction)
+        if not name.startswith("_")
+        and member.__module__ == db.__name__
+        and (inspect.iscoroutinefunction(member) or inspect.isasyncgenfunction(member))
+    )
+
+
+async def _time_case(case: BenchCase, db_path: Path, info: SeedInfo, repeat: int) -> list[float]:
+    await case(db_path, info)  # warm-up: page cache, lazy imports
+    timings: list[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await case(db_path, info)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+async def run_cases(db_path: Path, info: SeedInfo, *, repeat: int, only: set[str] | None) -> dict[str, dict]:
+    results: dict[str, dict] = {}
+    for name in public_db_functions():
+        if only and name not in only:
+            continue
+        case = CASES.get(name)
+        if case is None:
+            continue
+        timings = await _time_case(case, db_path, info, repeat)
+        results[name] = {
+            "runs": len(timings),
+            "min_ms": round(min(timings), 3),
+            "median_ms": round(statistics.median(timings), 3),
+            "mean_ms": round(statistics.fmean(timings), 3),
+            "max_ms": round(max(timings), 3),
+        }
+        print(f"{name:<42} median={results[name]['median_ms']:>10.3f} ms")
+    return results
+
+
+def compare(current: dict, baseline: dict, *, max_ratio: float, min_delta_ms: float) -> list[str]:
+    """
+    Returns human-readable regression lines; empty when nothing got slower.
+    """
+    regressions: list[str] = []
+    base_results = baseline.get("results", {})
+    for name, stats in sorted(current.get("results", {}).items()):
+        base = base_results.get(name)
+        if not base:
+            continue
+        before = base["median_ms"]
+        after = stats["median_ms"]
+        ratio = after / before if before else float("inf")
+        if ratio > max_ratio and after - before > min_delta_ms:
+            regressions.append(f"{name}: {before:.3f} ms -> {after:.3f} ms (x{ratio:.2f})")
+    return regressions
+
+
+def _load_seed_info(db_path: Path) -> SeedInfo:
+    meta_path = db_path.with_suffix(".seed.json")
+    data = json.loads(meta_path.read_text(encoding="utf-8"))
+    return SeedInfo(**data)
+
+
+def _store_seed_info(db_path: Path, info: SeedInfo) -> None:
+    meta_path = db_path.with_suffix(".seed.json")
+    meta_path.write_text(json.dumps(info.__dict__, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--db", type=Path, default=DEFAULT_DB_PATH, help="Where to build the seeded database")
+    parser.add_argument("--scale", type=float, default=1.0, help="Fraction of production volumes to seed")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reuse", action="store_true", help="Reuse an already seeded --db")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per function")
+    parser.add_argument("--only", nargs="*", help="Benchmark only these functions")
+    parser.add_argument("--output", type=Path, help="Result JSON path (default: results/<timestamp>.json)")
+    parser.add_argument("--baseline", type=Path, help="Compare against an earlier result JSON")
+    parser.add_argument("--max-ratio", type=float, default=1.3, help="Allowed slowdown vs baseline")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="Ignore slowdowns below this")
+    args = parser.parse_args(argv)
+
+    args.db.parent.mkdir(parents=True, exist_ok=True)
+    if args.reuse and args.db.exists():
+        info = _load_seed_info(args.db)
+        print(f"Reusing seeded database {args.db}")
+    else:
+        started = time.perf_counter()
+        info = seed_database(args.db, scale=args.scale, seed=args.seed)
+        _store_seed_info(args.db, info)
+        print(f"Seeded {args.db} in {time.perf_counter() - started:.1f}s: {info.volumes}")
+
+    results = asyncio.run(run_cases(args.db, info, repeat=args.repeat, only=set(args.only or [])))
+    uncovered = [name for name in public_db_functions() if name not in CASES]
+    report = {
+        "meta": {
+            "created_at": dt.datetime.utcnow().isoformat(),
+            "volumes": info.volumes,
+            "repeat": args.repeat,
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+        },
+        "results": results,
+        "uncovered": uncovered,
+    }
+    output = args.output or DEFAULT_RESULTS_DIR / f"{dt.datetime.utcnow():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"Results written to {output}")
+    if uncovered:
+        print(f"WARNING: no benchmark case for: {', '.join(uncovered)}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, max_ratio=args.max_ratio, min_delta_ms=args.min_delta_ms)
+        if regressions:
+            print("Regressions against baseline:")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print("No regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,306 @@
+"""
+End-to-end load test for the real Dispatcher built by ``app.dispatcher.build_dispatcher``.
+
+Usage:
+    python -m benchmarks.load_dispatcher --users 2000 --concurrency 200 --latency-ms 40
+
+Synthetic users walk the whole purchase funnel:
+/start -> mode:month -> m-year -> m-month -> m-sign -> pay -> referral:no (invoice)
+-> pre-checkout -> successful_payment -> review:start -> contact -> review text.
+
+Updates are fed as raw JSON through ``Dispatcher.feed_raw_update`` so update
+parsing is part of the measurement.  The Bot talks to an in-process fake API
+session that records calls, adds latency and randomly answers 429.  The report
+gives updates/s and per-step latency percentiles for sizing the VPS.
+"""
+
+import argparse
+import asyncio
+import datetime as dt
+import itertools
+import random
+import statistics
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, AsyncGenerator, Dict, Optional, Union, get_args, get_origin
+
+from aiogram import Bot
+from aiogram.client.default import DefaultBotProperties
+from aiogram.client.session.base import BaseSession
+from aiogram.enums import ParseMode
+from aiogram.exceptions import TelegramRetryAfter
+from aiogram.methods import TelegramMethod
+from aiogram.types import Chat, Message, User
+
+from app.config import Settings
+from app.dispatcher import build_dispatcher
+from app.services import callback_tokens, db
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+BOT_USER = {"id": 777000, "is_bot": True, "first_name": "LoadBot", "username": "load_test_bot"}
+YEAR = "2026"
+MONTH = "04"
+SIGN = "leo"
+REVIEW_TEXT = "Спасибо, прогноз очень точный и подробный, всё совпало с моими ощущениями!"
+
+
+class FakeTelegramSession(BaseSession):
+    """
+    Bot API stand-in: records every call, sleeps ``latency`` and throttles a share of sends with 429.
+    """
+
+    def __init__(self, *, latency: float, retry_after_ratio: float, retry_after: int, seed: int) -> None:
+        super().__init__()
+        self.latency = latency
+        self.retry_after_ratio = retry_after_ratio
+        self.retry_after = retry_after
+        self.calls: Counter[str] = Counter()
+        self.throttled: Counter[str] = Counter()
+        self._rng = random.Random(seed)
+        self._message_ids = itertools.count(1)
+
+    async def close(self) -> None:
+        return None
+
+    async def make_request(self, bot: Bot, method: TelegramMethod[Any], timeout: Optional[int] = None) -> Any:
+        name = type(method).__name__
+        self.calls[name] += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if name.startswith(("Send", "Edit")) and self._rng.random() < self.retry_after_ratio:
+            self.throttled[name] += 1
+            raise TelegramRetryAfter(method=method, message="Too Many Requests", retry_after=self.retry_after)
+        return self._fake_result(method)
+
+    async def stream_content(
+        self,
+        url: str,
+        headers: Optional[Dict[str, Any]] = None,
+        timeout: int = 30,
+        chunk_size: int = 65536,
+        raise_for_status: bool = True,
+    ) -> AsyncGenerator[bytes, None]:
+        yield b""
+
+    def _fake_message(self, method: TelegramMethod[Any]) -> Message:
+        chat_id = getattr(method, "chat_id", None) or 0
+        return Message(
+            message_id=next(self._message_ids),
+            date=dt.datetime.now(dt.timezone.utc),
+            chat=Chat(id=int(chat_id), type="private"),
+        )
+
+    def _fake_result(self, method: TelegramMethod[Any]) -> Any:
+        returning = method.__returning__
+        options = get_args(returning) if get_origin(returning) is Union else (returning,)
+        if bool in options:
+            return True
+        if Message in options:
+            return self._fake_message(method)
+        if get_origin(returning) in (list, tuple):
+            return [self._fake_message(method)]
+        if returning is User:
+            return User(**BOT_USER)
+        return True
+
+
+class SyntheticUser:
+    def __init__(self, user_id: int) -> None:
+        self.user_id = user_id
+        self.user = {"id": user_id, "is_bot": False, "first_name": "Load", "username": f"load{user_id}"}
+        self.chat = {"id": user_id, "type": "private"}
+        self._ids = itertools.count(1)
+
+    def _now(self) -> int:
+        return int(time.time())
+
+    def message(self, **fields: Any) -> dict:
+        payload = {
+            "message_id": next(self._ids),
+            "date": self._now(),
+            "chat": self.chat,
+            "from": self.user,
+        }
+        payload.update(fields)
+        return {"message": payload}
+
+    def callback(self, data: str) -> dict:
+        return {
+            "callback_query": {
+                "id": f"{self.user_id}-{next(self._ids)}",
+                "from": self.user,
+                "chat_instance": str(self.user_id),
+                "data": data,
+                "message": {
+                    "message_id": next(self._ids),
+                    "date": self._now(),
+                    "chat": self.chat,
+                    "from": BOT_USER,
+                    "text": "…",
+                },
+            }
+        }
+
+    def pre_checkout(self, payload: str, amount: int) -> dict:
+        return {
+            "pre_checkout_query": {
+                "id": f"pcq-{self.user_id}",
+                "from": self.user,
+                "currency": "RUB",
+                "total_amount": amount,
+                "invoice_payload": payload,
+            }
+        }
+
+    def successful_payment(self, payload: str, amount: int) -> dict:
+        return self.message(
+            successful_payment={
+                "currency": "RUB",
+                "total_amount": amount,
+                "invoice_payload": payload,
+                "telegram_payment_charge_id": f"tg-{self.user_id}",
+                "provider_payment_charge_id": f"pr-{self.user_id}",
+            }
+        )
+
+
+class LoadRun:
+    def __init__(self, dp, bot: Bot, settings: Settings) -> None:
+        self.dp = dp
+        self.bot = bot
+        self.settings = settings
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: Counter[str] = Counter()
+        self.updates = 0
+        self._update_ids = itertools.count(1)
+
+    async def feed(self, step: str, update: dict) -> None:
+        update["update_id"] = next(self._update_ids)
+        started = time.perf_counter()
+        try:
+            await self.dp.feed_raw_update(self.bot, update)
+        except Exception:
+            self.errors[step] += 1
+        self.latencies[step].append((time.perf_counter() - started) * 1000)
+        self.updates += 1
+
+    async def journey(self, user: SyntheticUser) -> None:
+        ym = f"{YEAR}-{MONTH}"
+        product_id = f"month:{ym}:{SIGN}"
+        await self.feed("start", user.message(text="/start"))
+        await self.feed("mode", user.callback("mode:month"))
+        await self.feed("m-year", user.callback(f"m-year:{YEAR}"))
+        await self.feed("m-month", user.callback(f"m-month:{ym}"))
+        await self.feed("m-sign", user.callback(f"m-sign:{ym}:{SIGN}"))
+        await self.feed("pay", user.callback(f"pay:{product_id}"))
+        record = await db.get_user(self.settings.db_path, user.user_id)
+        order_id = record.get("last_order_id") if record else None
+        if not order_id:
+            self.errors["pay:no_order"] += 1
+            return
+        order_token = await callback_tokens.encode(self.settings.db_path, order_id)
+        await self.feed("referral", user.callback(f"referral:no:{order_token}"))
+        order = await db.get_order(self.settings.db_path, order_id)
+        amount = order["amount_kopeks"] if order else 0
+        payload = f"{product_id}|{user.user_id}|{order_id}"
+        await self.feed("pre_checkout", user.pre_checkout(payload, amount))
+        await self.feed("successful_payment", user.successful_payment(payload, amount))
+        await self.feed("review_start", user.callback(f"review:start:{order_token}"))
+        await self.feed(
+            "review_contact",
+            user.message(contact={"phone_number": "+79990000000", "first_name": "Load", "user_id": user.user_id}),
+        )
+        await self.feed("review_text", user.message(text=REVIEW_TEXT))
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _prepare_media(root: Path) -> Path:
+    media_dir = root / "media"
+    sign_dir = media_dir / "month" / YEAR / MONTH / SIGN
+    sign_dir.mkdir(parents=True, exist_ok=True)
+    (sign_dir / f"{SIGN}-1.jpg").write_bytes(b"\xff\xd8\xff\xe0")
+    return media_dir
+
+
+async def run(args: argparse.Namespace) -> int:
+    workdir = Path(tempfile.mkdtemp(prefix="goroskop-load-"))
+    settings = Settings(
+        BOT_TOKEN="123456:LOAD-TEST",
+        PROVIDER_TOKEN="TEST_PROVIDER",
+        MEDIA_DIR=_prepare_media(workdir),
+        DB_PATH=workdir / "bot.sqlite3",
+        PRICING_PATH=PROJECT_ROOT / "data" / "pricing.json",
+        PHOTO_AFTER_REVIEW_DIR=workdir / "photo-after-review",
+        ADMIN_IDS=[],
+    )
+    await db.init_db(settings.db_path)
+    session = FakeTelegramSession(
+        latency=args.latency_ms / 1000,
+        retry_after_ratio=args.retry_after_ratio,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    bot = Bot(token=settings.bot_token, session=session, default=DefaultBotProperties(parse_mode=ParseMode.HTML))
+    dp = build_dispatcher(settings)
+    load = LoadRun(dp, bot, settings)
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def _bounded(user: SyntheticUser) -> None:
+        async with semaphore:
+            await load.journey(user)
+
+    users = [SyntheticUser(args.first_user_id + index) for index in range(args.users)]
+    started = time.perf_counter()
+    await asyncio.gather(*(_bounded(user) for user in users))
+    elapsed = time.perf_counter() - started
+
+    print(f"Workdir: {workdir}")
+    print(
+        f"Users: {args.users}  concurrency: {args.concurrency}  "
+        f"api latency: {args.latency_ms:.0f} ms  429 ratio: {args.retry_after_ratio}"
+    )
+    print(f"Updates: {load.updates} in {elapsed:.2f}s -> {load.updates / elapsed:.1f} updates/s")
+    print(f"{'step':<20}{'count':>8}{'p50 ms':>10}{'p90 ms':>10}{'p99 ms':>10}{'max ms':>10}{'errors':>8}")
+    for step, values in load.latencies.items():
+        print(
+            f"{step:<20}{len(values):>8}"
+            f"{statistics.median(values):>10.1f}"
+            f"{_percentile(values, 90):>10.1f}"
+            f"{_percentile(values, 99):>10.1f}"
+            f"{max(values):>10.1f}"
+            f"{load.errors.get(step, 0):>8}"
+        )
+    print(f"API calls: {dict(session.calls)}")
+    print(f"Throttled (429): {dict(session.throttled)}")
+    extra_errors = {key: value for key, value in load.errors.items() if key not in load.latencies}
+    if extra_errors:
+        print(f"Journey errors: {extra_errors}")
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=100, help="Users walking the funnel at the same time")
+    parser.add_argument("--latency-ms", type=float, default=40.0, help="Simulated Bot API round trip")
+    parser.add_argument("--retry-after-ratio", type=float, default=0.001, help="Share of sends answered with 429")
+    parser.add_argument("--retry-after", type=int, default=1, help="retry_after seconds in simulated 429s")
+    parser.add_argument("--first-user-id", type=int, default=5_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+"""
+Synthetic production-scale data for benchmarking the db service layer.
+
+The generator writes straight through sqlite3 in a single transaction so that
+seeding a million orders takes seconds rather than hours.  Volumes are scaled
+by a single factor, so ``scale=0.01`` gives a quick smoke-sized database with
+the same shape.
+"""
+
+import asyncio
+import datetime as dt
+import random
+import sqlite3
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from app.config import SIGNS_RU
+from app.services import db
+
+FULL_VOLUMES = {
+    "orders": 1_000_000,
+    "users": 200_000,
+    "reviews": 100_000,
+    "campaign_audience": 50_000,
+    "campaign_responses": 5_000,
+    "promocodes": 20_000,
+}
+
+SIGNS = list(SIGNS_RU)
+ORDER_STATUSES = (
+    ("paid", 0.35),
+    ("invoice_sent", 0.40),
+    ("created", 0.20),
+    ("failed", 0.05),
+)
+
+
+@dataclass
+class SeedInfo:
+    """Sample keys picked from the seeded data, used as benchmark arguments."""
+
+    volumes: dict[str, int]
+    user_id: int = 0
+    order_id: str = ""
+    paid_order_id: str = ""
+    review_id: str = ""
+    campaign_id: str = ""
+    response_id: str = ""
+    promo_code: str = ""
+    provider_tx_id: str = ""
+    ym: str = ""
+    year: str = ""
+    extra: dict[str, str] = field(default_factory=dict)
+
+
+def scaled_volumes(scale: float) -> dict[str, int]:
+    return {name: max(1, int(count * scale)) for name, count in FULL_VOLUMES.items()}
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+def _pick_status(rng: random.Random) -> str:
+    roll = rng.random()
+    acc = 0.0
+    for status, weight in ORDER_STATUSES:
+        acc += weight
+        if roll < acc:
+            return status
+    return ORDER_STATUSES[-1][0]
+
+
+def _product_id(rng: random.Random) -> str:
+    sign = rng.choice(SIGNS)
+    if rng.random() < 0.8:
+        year = rng.randint(2024, 2027)
+        month = rng.randint(1, 12)
+        return f"month:{year}-{month:02d}:{sign}"
+    return f"year:{rng.randint(2024, 2027)}:{sign}"
+
+
+def seed_database(db_path: Path, *, scale: float = 1.0, seed: int = 42) -> SeedInfo:
+    """
+    Create a fresh database at ``db_path`` and fill it with synthetic rows.
+    """
+    if db_path.exists():
+        db_path.unlink()
+    asyncio.run(db.init_db(db_path))
+
+    rng = random.Random(seed)
+    volumes = scaled_volumes(scale)
+    info = SeedInfo(volumes=volumes)
+    base = dt.datetime(2024, 1, 1)
+    span_seconds = int(dt.timedelta(days=730).total_seconds())
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA journal_mode = MEMORY")
+    try:
+        user_count = volumes["users"]
+        first_user = 100_000
+
+        def users():
+            for index in range(user_count):
+                created = (base + dt.timedelta(seconds=rng.randrange(span_seconds))).isoformat()
+                yield (first_user + index, "idle", None, created, created)
+
+        conn.executemany(
+            "INSERT INTO users (user_id, state, last_order_id, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+            users(),
+        )
+
+        paid_orders: list[tuple[str, int, str, str]] = []
+
+        def orders():
+            for index in range(volumes["orders"]):
+                order_id = _uuid(rng)
+                user_id = first_user + rng.randrange(user_count)
+                product_id = _product_id(rng)
+                status = _pick_status(rng)
+                created = base + dt.timedelta(seconds=rng.randrange(span_seconds))
+                paid_at = (created + dt.timedelta(minutes=2)).isoformat() if status == "paid" else None
+                charge_id = f"charge-{index}" if status == "paid" else None
+                if status == "paid" and len(paid_orders) < volumes["reviews"]:
+                    paid_orders.append((order_id, user_id, product_id, created.isoformat()))
+                if index == 0:
+                    info.order_id = order_id
+                    info.user_id = user_id
+                yield (
+                    order_id,
+                    user_id,
+                    product_id,
+                    rng.choice((39000, 59000, 99900)),
+                    "RUB",
+                    status,
+                    charge_id,
+                    created.isoformat(),
+                    paid_at,
+                    paid_at,
+                )
+
+        conn.executemany(
+            """
+            INSERT INTO orders (
+                id, user_id, product_id, amount_kopeks, currency, status,
+                telegram_charge_id, created_at, paid_at, delivered_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            orders(),
+        )
+
+        def payments():
+            for index, (order_id, _user_id, _product_id, created) in enumerate(paid_orders):
+                yield (
+                    _uuid(rng),
+                    order_id,
+                    f"tx-{index}",
+                    "success",
+                    59000,
+                    "RUB",
+                    "payload",
+                    created,
+                    created,
+                )
+
+        conn.executemany(
+            """
+            INSERT INTO payments (
+                id, order_id, provider_tx_id, status, amount_kopeks, currency, payload, created_at, updated_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            payments(),
+        )
+
+        def reviews():
+            for index, (order_id, user_id, product_id, created) in enumerate(paid_orders):
+                review_id = _uuid(rng)
+                status = "submitted" if rng.random() < 0.7 else rng.choice(("declined", "pending"))
+                text = "Очень точный прогноз, спасибо! " * rng.randint(2, 6) if status == "submitted" else None
+                if index == 0:
+                    info.review_id = review_id
+                    info.paid_order_id = order_id
+                    info.provider_tx_id = "tx-0"
+                yield (
+                    review_id,
+                    order_id,
+                    user_id,
+                    product_id,
+                    status,
+                    text,
+                    "+79990000000",
+                    f"user{user_id}",
+                    created,
+                    created if status != "pending" else None,
+                )
+
+        conn.executemany(
+            """
+            INSERT INTO reviews (
+                id, order_id, user_id, product_id, status, text,
+                contact_phone, contact_username, created_at, answered_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            reviews(),
+        )
+
+        info.campaign_id = _uuid(rng)
+        conn.execute(
+            "INSERT INTO campaigns (id, title, body, price_kopeks, interest_redirect) VALUES (?, ?, ?, 0, '')",
+            (info.campaign_id, "Бенчмарк", "Текст рассылки"),
+        )
+        audience_users = rng.sample(range(user_count), min(user_count, volumes["campaign_audience"]))
+        now = base.isoformat()
+        conn.executemany(
+            """
+            INSERT INTO campaign_audience (campaign_id, user_id, status, message_id, error, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (
+                (
+                    info.campaign_id,
+                    first_user + offset,
+                    rng.choice(("sent", "sent", "sent", "failed", "interested", "declined")),
+                    rng.randrange(1, 1_000_000),
+                    None,
+                    now,
+                )
+                for offset in audience_users
+            ),
+        )
+
+        def responses():
+            for index in range(volumes["campaign_responses"]):
+                response_id = _uuid(rng)
+                if index == 0:
+                    info.response_id = response_id
+                user_id = first_user + audience_users[index % len(audience_users)]
+                yield (
+                    response_id,
+                    info.campaign_id,
+                    user_id,
+                    "Иванова Мария",
+                    "01.01.1990",
+                    "+79990000000",
+                    "Хочу записаться",
+                    rng.choice(("collecting", "waiting_contact", "done")),
+                    now,
+                    (base + dt.timedelta(seconds=index)).isoformat(),
+                )
+
+        conn.executemany(
+            """
+            INSERT INTO campaign_responses (
+                id, campaign_id, user_id, full_name, birthdate, phone, raw_text, status, created_at, updated_at
+            )
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            responses(),
+        )
+
+        promo_users = rng.sample(range(user_count), min(user_count, volumes["promocodes"]))
+        codes = [f"BENCH{index:06d}" for index in range(len(promo_users))]
+        info.promo_code = codes[0]
+        conn.executemany(
+            """
+            INSERT INTO promocodes (code, user_id, paid_referrals, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            (
+                (code, first_user + offset, rng.randrange(0, 5), now, now)
+                for code, offset in zip(codes, promo_users)
+            ),
+        )
+        conn.commit()
+    finally:
+        conn.close()
+
+    info.ym = "2025-06"
+    info.year = "2025"
+    return info
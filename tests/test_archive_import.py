@@ -0,0 +1,72 @@
+import zipfile
+
+import pytest
+
+from app.services import archive_import, media
+
+
+def test_archive_import_groups_products_and_reports_skips(tmp_path):
+    media_dir = tmp_path / "media"
+    archive_path = tmp_path / "forecasts.zip"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        archive.writestr("forecasts/month/2026/4/leo/02.jpg", b"leo-2")
+        archive.writestr("forecasts/month/2026/4/leo/01.jpg", b"leo-1")
+        archive.writestr("forecasts/month/2026/04/leo/copy.jpg", b"leo-1")
+        archive.writestr("forecasts/year/2027/aries.png", b"aries")
+        archive.writestr("forecasts/year/2027/dragon.png", b"dragon")
+        archive.writestr("forecasts/month/2026/04/notes.txt", b"text")
+        archive.writestr("forecasts/__MACOSX/._01.jpg", b"junk")
+
+    staged = archive_import.stage_archive(media_dir, archive_path)
+    report = archive_import.commit_archive(media_dir, staged)
+
+    assert report.added == {("month", "2026", "04", "leo"): 2, ("year", "2027", None, "aries"): 1}
+    assert report.duplicates == 1
+    assert sorted(reason for _, reason in report.skipped) == ["extension", "sign"]
+    assert [p.read_bytes() for p in media.find_month_content_paths(media_dir, "2026-04", "leo")] == [b"leo-1", b"leo-2"]
+    assert media.available_year_signs(media_dir, "2027") == ["aries"]
+    assert not staged.staging_dir.exists()
+    assert media.catalog_version(media_dir) > 0
+
+
+def test_archive_import_rejects_non_zip(tmp_path):
+    archive_path = tmp_path / "broken.zip"
+    archive_path.write_bytes(b"not a zip")
+    with pytest.raises(archive_import.ArchiveImportError):
+        archive_import.stage_archive(tmp_path / "media", archive_path)
+
+
+def test_unreadable_entries_are_skipped_with_a_reason(tmp_path):
+    media_dir = tmp_path / "media"
+    archive_path = tmp_path / "forecasts.zip"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        archive.writestr("month/2026/04/leo/01.jpg", b"leo-1")
+        archive.writestr("month/2026/04/virgo/01.jpg", b"virgo-1")
+    # Flip a byte of the stored virgo data so its CRC no longer matches.
+    data = archive_path.read_bytes()
+    position = data.index(b"virgo-1")
+    archive_path.write_bytes(data[:position] + b"X" + data[position + 1 :])
+
+    staged = archive_import.stage_archive(media_dir, archive_path)
+    report = archive_import.commit_archive(media_dir, staged)
+
+    assert report.added == {("month", "2026", "04", "leo"): 1}
+    assert report.skipped == [("month/2026/04/virgo/01.jpg", "corrupt")]
+    assert not staged.staging_dir.exists()
+
+
+def test_commit_failure_is_reported_as_import_error(tmp_path, monkeypatch):
+    media_dir = tmp_path / "media"
+    archive_path = tmp_path / "forecasts.zip"
+    with zipfile.ZipFile(archive_path, "w") as archive:
+        archive.writestr("month/2026/04/leo/01.jpg", b"leo-1")
+
+    def full_disk(*args, **kwargs):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(archive_import.blobstore, "ingest", full_disk)
+    staged = archive_import.stage_archive(media_dir, archive_path)
+
+    with pytest.raises(archive_import.ArchiveImportError):
+        archive_import.commit_archive(media_dir, staged)
+    assert not staged.staging_dir.exists()
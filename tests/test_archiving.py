@@ -0,0 +1,64 @@
+import asyncio
+import datetime as dt
+
+import aiosqlite
+
+from app.services import archiving, db
+
+
+def test_archive_moves_cold_rows_and_reports_union_them(tmp_path, monkeypatch):
+    db_path = tmp_path / "db.sqlite3"
+    archive_path = tmp_path / "archive.sqlite3"
+    monkeypatch.setattr(archiving, "BATCH_SIZE", 2)
+
+    async def scenario():
+        await db.init_db(db_path)
+        dead = []
+        for user_id in (1, 2, 3):
+            order = await db.create_order(db_path, user_id, "month:2026-10:leo", 39000, "RUB")
+            await db.mark_payment_failed(db_path, order["id"])
+            dead.append(order["id"])
+        paid = await db.create_paid_order(db_path, 4, "month:2026-10:leo", 39000, "RUB", "charge-4")
+        campaign_id = (await db.create_campaign(db_path, "Title", "Body", 1000, ""))["id"]
+        await db.add_campaign_audience(db_path, campaign_id, [1, 2, 3])
+        await db.update_campaign_audience_status(db_path, campaign_id, 1, "sent", message_id=10)
+        await db.update_campaign_audience_status(db_path, campaign_id, 2, "interested")
+        await db.update_campaign_audience_status(db_path, campaign_id, 3, "sent", message_id=11)
+        before_stats = await db.fetch_campaign_audience_stats(db_path, campaign_id)
+
+        later = dt.datetime.utcnow() + dt.timedelta(days=2)
+        moved = await archiving.archive(db_path, archive_path, dt.timedelta(days=1), now=later)
+        # User 3 is added again by a new launch; the live row wins over the archived one.
+        await db.add_campaign_audience(db_path, campaign_id, [3])
+        live_stats = await db.fetch_campaign_audience_stats(db_path, campaign_id)
+        full_stats = await db.fetch_campaign_audience_stats(db_path, campaign_id, archive_path=archive_path)
+        again = await archiving.archive(db_path, archive_path, dt.timedelta(days=1), now=later)
+
+        async with aiosqlite.connect(archive_path) as conn:
+            async with conn.execute("SELECT id FROM orders ORDER BY id") as cursor:
+                archived_orders = [row[0] for row in await cursor.fetchall()]
+        return (
+            before_stats,
+            moved,
+            live_stats,
+            full_stats,
+            again,
+            archived_orders,
+            [await db.get_order(db_path, order_id) for order_id in dead],
+            await db.get_order(db_path, paid["id"]),
+            await db.fetch_daily_sales(db_path, since="2000-01-01"),
+        )
+
+    before_stats, moved, live_stats, full_stats, again, archived_orders, dead_live, paid_live, daily = asyncio.run(
+        scenario()
+    )
+
+    assert before_stats == {"sent": 2, "interested": 1}
+    assert moved == {"orders": 3, "payments": 0, "campaign_audience": 2}
+    assert live_stats == {"interested": 1, "pending": 1}
+    assert full_stats == {"interested": 1, "pending": 1, "sent": 1}
+    assert again["orders"] == 0
+    assert len(archived_orders) == 3
+    assert dead_live == [None, None, None]
+    assert paid_live["status"] == "paid"
+    assert [row[1] for row in daily] == [1]
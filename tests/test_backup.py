@@ -0,0 +1,88 @@
+import asyncio
+import datetime as dt
+import gzip
+import os
+import sqlite3
+import time
+
+from app.services import backup, db
+
+
+def test_backups_are_verified_compressed_and_rotated(tmp_path):
+    db_path = tmp_path / "bot.sqlite3"
+    backup_dir = tmp_path / "backups"
+    start = dt.datetime(2026, 10, 1, 12, 0)
+
+    async def scenario():
+        await db.init_db(db_path)
+        order = await db.create_order(db_path, 1, "month:2026-10:leo", 39000, "RUB")
+        for hours in range(3):
+            await backup.create_backup(db_path, backup_dir, keep=2, now=start + dt.timedelta(hours=hours))
+        return order, await backup.last_success(backup_dir)
+
+    order, last = asyncio.run(scenario())
+
+    snapshots = backup.list_snapshots(backup_dir)
+    assert [snapshot.created_at for snapshot in snapshots] == [
+        start + dt.timedelta(hours=2),
+        start + dt.timedelta(hours=1),
+    ]
+    assert last == snapshots[0]
+    assert sorted(path.name for path in backup_dir.iterdir()) == sorted(s.path.name for s in snapshots)
+
+    restored = tmp_path / "restored.sqlite3"
+    restored.write_bytes(gzip.decompress(last.path.read_bytes()))
+    conn = sqlite3.connect(restored)
+    try:
+        assert conn.execute("SELECT id FROM orders").fetchall() == [(order["id"],)]
+    finally:
+        conn.close()
+
+
+def test_last_success_is_none_without_backups(tmp_path):
+    assert asyncio.run(backup.last_success(tmp_path / "missing")) is None
+
+
+def test_backups_in_the_same_second_do_not_collide(tmp_path):
+    db_path = tmp_path / "bot.sqlite3"
+    backup_dir = tmp_path / "backups"
+    now = dt.datetime(2026, 10, 1, 12, 0)
+    backup_dir.mkdir()
+    (backup_dir / "bot-20261001-110000.sqlite3.gz").write_bytes(b"legacy")
+
+    async def scenario():
+        await db.init_db(db_path)
+        return await asyncio.gather(
+            backup.create_backup(db_path, backup_dir, keep=5, now=now),
+            backup.create_backup(db_path, backup_dir, keep=5, now=now),
+        )
+
+    first, second = asyncio.run(scenario())
+
+    assert first.path != second.path
+    snapshots = backup.list_snapshots(backup_dir)
+    assert [snapshot.created_at for snapshot in snapshots] == [now, now, dt.datetime(2026, 10, 1, 11, 0)]
+    for snapshot in (first, second):
+        assert gzip.decompress(snapshot.path.read_bytes()).startswith(b"SQLite format 3")
+
+
+def test_temp_files_left_by_a_killed_copy_are_removed(tmp_path):
+    db_path = tmp_path / "bot.sqlite3"
+    backup_dir = tmp_path / "backups"
+    backup_dir.mkdir()
+    stale = backup_dir / ".bot-20261001-110000-abcdef.sqlite3.gz.0123.tmp"
+    partial = backup_dir / "bot-20261001-110000-abcdef.sqlite3.gz.part"
+    running = backup_dir / ".bot-20261001-115959-fedcba.sqlite3.gz.4567.tmp"
+    for path in (stale, partial, running):
+        path.write_bytes(b"half a copy")
+    old = time.time() - backup.STALE_TEMP_SECONDS - 60
+    for path in (stale, partial):
+        os.utime(path, (old, old))
+
+    async def scenario():
+        await db.init_db(db_path)
+        return await backup.create_backup(db_path, backup_dir, keep=5, now=dt.datetime(2026, 10, 1, 12, 0))
+
+    snapshot = asyncio.run(scenario())
+
+    assert sorted(path.name for path in backup_dir.iterdir()) == sorted([snapshot.path.name, running.name])
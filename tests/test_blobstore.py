@@ -0,0 +1,64 @@
+import threading
+
+import pytest
+
+from app.services import blobstore, media
+
+
+def _upload(tmp_path, name: str, payload: bytes):
+    incoming = tmp_path / "incoming"
+    incoming.mkdir(exist_ok=True)
+    path = incoming / name
+    path.write_bytes(payload)
+    return blobstore.IngestItem(path)
+
+
+def test_ingest_dedups_and_keeps_upload_order(tmp_path):
+    media_dir = tmp_path / "media"
+    legacy_dir = media_dir / "month" / "2026" / "04" / "leo"
+    legacy_dir.mkdir(parents=True)
+    (legacy_dir / "leo-old.jpg").write_bytes(b"legacy")
+    product = media.product_dir(media_dir, "month", "2026", "leo", "04")
+
+    first = blobstore.ingest(media_dir, product, [_upload(tmp_path, "b.jpg", b"second"), _upload(tmp_path, "a.jpg", b"first")])
+    again = blobstore.ingest(media_dir, product, [_upload(tmp_path, "c.jpg", b"second")])
+
+    assert len(first.added) == 2 and first.duplicates == 0
+    assert again.added == [] and again.duplicates == 1
+    paths = media.find_month_content_paths(media_dir, "2026-04", "leo")
+    assert [path.read_bytes() for path in paths] == [b"legacy", b"second", b"first"]
+    assert media.available_month_signs(media_dir, "2026-04") == ["leo"]
+
+
+def test_delete_collects_only_unreferenced_blobs(tmp_path):
+    media_dir = tmp_path / "media"
+    leo = media.product_dir(media_dir, "year", "2027", "leo")
+    aries = media.product_dir(media_dir, "year", "2027", "aries")
+    blobstore.ingest(media_dir, leo, [_upload(tmp_path, "shared.jpg", b"shared"), _upload(tmp_path, "own.jpg", b"own")])
+    blobstore.ingest(media_dir, aries, [_upload(tmp_path, "shared.jpg", b"shared")])
+
+    assert media.delete_year_content(media_dir, "2027", "leo")
+
+    assert not leo.exists()
+    assert [path.read_bytes() for path in media.find_year_content_paths(media_dir, "2027", "aries")] == [b"shared"]
+    assert len(list(blobstore.blobs_dir(media_dir).iterdir())) == 1
+
+
+def test_collect_garbage_waits_for_the_store_file_lock(tmp_path):
+    fcntl = pytest.importorskip("fcntl")
+    media_dir = tmp_path / "media"
+    blobstore.blobs_dir(media_dir).mkdir(parents=True)
+    (blobstore.blobs_dir(media_dir) / "orphan.jpg").write_bytes(b"x")
+    removed = []
+
+    # Another worker process holds the lock between storing a blob and listing it.
+    with (media_dir / blobstore.LOCK_NAME).open("a") as handle:
+        fcntl.flock(handle, fcntl.LOCK_EX)
+        collector = threading.Thread(target=lambda: removed.append(blobstore.collect_garbage(media_dir)))
+        collector.start()
+        collector.join(0.2)
+        assert collector.is_alive()
+        fcntl.flock(handle, fcntl.LOCK_UN)
+    collector.join(5)
+
+    assert removed == [1]
@@ -0,0 +1,64 @@
+import asyncio
+import logging
+import threading
+import time
+
+from app.features.user.buy_forecast.navigation import handle_month
+from app.services import media
+from app.services.blocking import run_blocking
+
+
+class DummyMessage:
+    def __init__(self):
+        self.edited: list[str] = []
+
+    async def edit_text(self, text: str, **kwargs):
+        self.edited.append(text)
+
+    async def answer(self, text: str, **kwargs):
+        self.edited.append(text)
+
+
+class DummyCallback:
+    def __init__(self, data: str):
+        self.data = data
+        self.bot = object()
+        self.message = DummyMessage()
+
+    async def answer(self, *args, **kwargs):
+        return None
+
+
+def test_run_blocking_uses_io_pool():
+    async def scenario():
+        return await run_blocking(lambda: threading.current_thread().name)
+
+    assert asyncio.run(scenario()).startswith("blocking-io")
+
+
+def test_navigation_does_not_block_loop_on_slow_disk(settings, monkeypatch, caplog):
+    month_dir = settings.media_dir / "month" / "2026" / "04"
+    month_dir.mkdir(parents=True)
+    (month_dir / "leo.jpg").write_bytes(b"x")
+    original = media.available_month_signs
+
+    def slow_signs(*args, **kwargs):
+        time.sleep(0.2)
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(media, "available_month_signs", slow_signs)
+
+    async def scenario():
+        loop = asyncio.get_running_loop()
+        loop.set_debug(True)
+        loop.slow_callback_duration = 0.1
+        await asyncio.sleep(0)
+        callback = DummyCallback("m-month:2026-04")
+        await handle_month(callback)
+        return callback.message.edited
+
+    with caplog.at_level(logging.WARNING, logger="asyncio"):
+        edited = asyncio.run(scenario())
+
+    assert edited == ["Апрель 2026. Выбери знак:"]
+    assert not [record for record in caplog.records if record.name == "asyncio" and "Executing" in record.getMessage()]
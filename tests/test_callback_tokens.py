@@ -0,0 +1,45 @@
+import asyncio
+import uuid
+
+from app.services import callback_tokens, db
+
+
+def test_tokens_are_short_and_survive_a_restart(tmp_path):
+    db_path = tmp_path / "db.sqlite3"
+    order_id = str(uuid.uuid4())
+
+    async def scenario():
+        await db.init_db(db_path)
+        token = await callback_tokens.encode(db_path, order_id)
+        again = await callback_tokens.encode(db_path, order_id)
+        callback_tokens.clear_cache()
+        return token, again, await callback_tokens.decode(db_path, token), await callback_tokens.decode(db_path, "unknown")
+
+    token, again, decoded, unknown = asyncio.run(scenario())
+
+    assert token == again
+    assert len(f"review:start:{token}") <= 32
+    assert decoded == order_id
+    assert unknown is None
+
+
+def test_colliding_prefix_gets_a_longer_token(tmp_path, monkeypatch):
+    db_path = tmp_path / "db.sqlite3"
+    monkeypatch.setattr(callback_tokens, "_candidate", lambda value, length: "x" * length)
+
+    async def scenario():
+        await db.init_db(db_path)
+        first = await callback_tokens.encode(db_path, "first")
+        second = await callback_tokens.encode(db_path, "second")
+        callback_tokens.clear_cache()
+        return first, second, await callback_tokens.decode(db_path, second)
+
+    first, second, decoded = asyncio.run(scenario())
+
+    assert len(second) > len(first)
+    assert decoded == "second"
+
+
+def test_raw_uuid_from_old_buttons_is_accepted(tmp_path):
+    legacy = str(uuid.uuid4())
+    assert asyncio.run(callback_tokens.decode(tmp_path / "db.sqlite3", legacy)) == legacy
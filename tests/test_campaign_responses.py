@@ -0,0 +1,42 @@
+import asyncio
+
+import aiosqlite
+
+from app.services import db
+
+
+def test_campaign_responses_are_deduplicated_and_paged_in_sql(tmp_path):
+    db_path = tmp_path / "db.sqlite3"
+
+    async def scenario():
+        await db.init_db(db_path)
+        campaign = await db.create_campaign(db_path, "Title", "Body", 0, "")
+        rows = [
+            ("r1", 1, "2026-01-01T10:00:00"),
+            ("r2", 1, "2026-01-03T10:00:00"),
+            ("r3", 2, "2026-01-02T10:00:00"),
+            ("r4", 3, "2026-01-04T10:00:00"),
+        ]
+        async with aiosqlite.connect(db_path) as conn:
+            await conn.executemany(
+                """
+                INSERT INTO campaign_responses (id, campaign_id, user_id, status, created_at, updated_at)
+                VALUES (?, ?, ?, 'done', ?, ?)
+                """,
+                [(response_id, campaign["id"], user_id, updated_at, updated_at) for response_id, user_id, updated_at in rows],
+            )
+            await conn.commit()
+        total = await db.count_campaign_responses(db_path, campaign["id"])
+        first = await db.fetch_campaign_responses_page(db_path, campaign["id"], limit=2, offset=0)
+        second = await db.fetch_campaign_responses_page(db_path, campaign["id"], limit=2, offset=2)
+        found = await db.get_campaign_response(db_path, "r3")
+        missing = await db.get_campaign_response(db_path, "nope")
+        return total, first, second, found, missing
+
+    total, first, second, found, missing = asyncio.run(scenario())
+
+    assert total == 3
+    assert [item["id"] for item in first] == ["r4", "r2"]
+    assert [item["id"] for item in second] == ["r3"]
+    assert found["user_id"] == 2
+    assert missing is None
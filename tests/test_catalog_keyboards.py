@@ -0,0 +1,33 @@
+from app.features.user.keyboards import build_month_signs_keyboard, build_months_keyboard
+from app.services import media
+
+
+def _callbacks(markup) -> list[str]:
+    return [button.callback_data for row in markup.inline_keyboard for button in row]
+
+
+def test_catalog_keyboards_are_reused_until_catalog_changes(tmp_path):
+    (tmp_path / "month" / "2026" / "04").mkdir(parents=True)
+    (tmp_path / "month" / "2026" / "04" / "leo.jpg").write_bytes(b"x")
+
+    first = build_months_keyboard(tmp_path, "2026", back="back:m-years")
+    (tmp_path / "month" / "2026" / "05").mkdir()
+    assert build_months_keyboard(tmp_path, "2026", back="back:m-years") is first
+
+    media.invalidate_catalog(tmp_path)
+    refreshed = build_months_keyboard(tmp_path, "2026", back="back:m-years")
+
+    assert refreshed is not first
+    assert _callbacks(refreshed) == ["m-month:2026-04", "m-month:2026-05", "back:m-years"]
+
+
+def test_deleting_content_invalidates_sign_keyboards(tmp_path):
+    month_dir = tmp_path / "month" / "2026" / "04"
+    month_dir.mkdir(parents=True)
+    (month_dir / "leo.jpg").write_bytes(b"x")
+    (month_dir / "aries.jpg").write_bytes(b"x")
+    assert _callbacks(build_month_signs_keyboard(tmp_path, "2026-04")) == ["m-sign:2026-04:aries", "m-sign:2026-04:leo"]
+
+    assert media.delete_month_content(tmp_path, "2026-04", "leo")
+
+    assert _callbacks(build_month_signs_keyboard(tmp_path, "2026-04")) == ["m-sign:2026-04:aries"]
@@ -0,0 +1,106 @@
+import asyncio
+import datetime as dt
+
+import aiosqlite
+
+from app.services import db, migrations, sales_chart
+
+
+def test_daily_sales_follow_payments_and_rebuild(tmp_path):
+    db_path = tmp_path / "db.sqlite3"
+
+    async def scenario():
+        await db.init_db(db_path)
+        order = await db.create_order(db_path, 1, "month:2026-10:leo", 39000, "RUB")
+        await db.mark_paid(db_path, order["id"], "charge-1")
+        await db.mark_paid(db_path, order["id"], "charge-1")
+        await db.create_paid_order(db_path, 2, "year:2026:leo", 99000, "RUB", "charge-2")
+        today = dt.datetime.utcnow().date().isoformat()
+        live = await db.fetch_daily_sales(db_path, since=today)
+
+        async with aiosqlite.connect(db_path) as conn:
+            await conn.execute("UPDATE daily_sales SET orders = 0, revenue_kopeks = 0")
+            await conn.commit()
+        days = await db.rebuild_daily_sales(db_path)
+        return today, live, days, await db.fetch_daily_sales(db_path, since=today)
+
+    today, live, days, rebuilt = asyncio.run(scenario())
+
+    assert live == [(today, 2, 138000)]
+    assert days == 1
+    assert rebuilt == live
+
+
+def test_upgrade_fills_daily_sales_before_the_bot_serves(tmp_path):
+    db_path = tmp_path / "db.sqlite3"
+
+    async def scenario():
+        await db.init_db(db_path)
+        # A database from before daily_sales existed.
+        async with aiosqlite.connect(db_path) as conn:
+            await conn.execute("DROP TABLE daily_sales")
+            await conn.execute("DELETE FROM schema_version WHERE version IN (5, 11)")
+            await conn.execute(
+                """
+                INSERT INTO orders (id, user_id, product_id, amount_kopeks, currency, status, created_at, paid_at)
+                VALUES ('o1', 1, 'month:2026-10:leo', 39000, 'RUB', 'paid', '2026-10-01T00:00:00', '2026-10-01T12:00:00')
+                """
+            )
+            await conn.commit()
+        applied = await migrations.migrate(db_path)
+        return applied, await db.fetch_daily_sales(db_path, since="2026-01-01")
+
+    assert asyncio.run(scenario()) == ([5, 11], [("2026-10-01", 1, 39000)])
+
+
+def test_partial_days_left_by_the_old_backfill_are_recounted(tmp_path):
+    db_path = tmp_path / "db.sqlite3"
+
+    async def scenario():
+        await db.init_db(db_path)
+        async with aiosqlite.connect(db_path) as conn:
+            await conn.executemany(
+                """
+                INSERT INTO orders (id, user_id, product_id, amount_kopeks, currency, status, created_at, paid_at)
+                VALUES (?, 1, 'month:2026-10:leo', 39000, 'RUB', 'paid', '2026-10-01T00:00:00', '2026-10-01T12:00:00')
+                """,
+                [("o1",), ("o2",)],
+            )
+            # Only the payment made after deploy was counted; the old backfill then skipped the day.
+            await conn.execute("INSERT INTO daily_sales VALUES ('2026-10-01', 1, 39000)")
+            await conn.execute("DELETE FROM schema_version WHERE version = 11")
+            await conn.commit()
+        applied = await migrations.migrate(db_path)
+        return applied, await db.fetch_daily_sales(db_path, since="2026-01-01")
+
+    assert asyncio.run(scenario()) == ([11], [("2026-10-01", 2, 78000)])
+
+
+def test_trend_chart_is_cached_until_sales_change(tmp_path, monkeypatch):
+    db_path = tmp_path / "db.sqlite3"
+    today = dt.date(2026, 10, 19)
+    renders = []
+    render = sales_chart.render_trend_png
+    monkeypatch.setattr(sales_chart, "render_trend_png", lambda points: renders.append(points) or render(points))
+    sales_chart.clear_cache()
+
+    async def scenario():
+        await db.init_db(db_path)
+        async with aiosqlite.connect(db_path) as conn:
+            await conn.execute("INSERT INTO daily_sales VALUES ('2026-10-18', 2, 78000)")
+            await conn.commit()
+        first = await sales_chart.build_trend(db_path, 7, today)
+        second = await sales_chart.build_trend(db_path, 7, today)
+        async with aiosqlite.connect(db_path) as conn:
+            await conn.execute("UPDATE daily_sales SET orders = 3, revenue_kopeks = 177000")
+            await conn.commit()
+        third = await sales_chart.build_trend(db_path, 7, today)
+        return first, second, third
+
+    first, second, third = asyncio.run(scenario())
+
+    assert first.png.startswith(b"\x89PNG")
+    assert second.png is first.png
+    assert (third.orders, third.revenue_kopeks) == (3, 177000)
+    assert len(renders) == 2
+    assert [orders for _, orders, _ in renders[0]] == [0, 0, 0, 0, 0, 2, 0]
@@ -0,0 +1,113 @@
+import asyncio
+import datetime as dt
+
+import aiosqlite
+from aiogram.types import CallbackQuery, Chat, Message, PreCheckoutQuery, SuccessfulPayment, Update, User
+
+from app.services import db, events
+
+USER = User(id=7, is_bot=False, first_name="Test")
+
+
+def _callback_update(data: str) -> Update:
+    return Update(update_id=1, callback_query=CallbackQuery(id="1", from_user=USER, chat_instance="c", data=data))
+
+
+def test_step_for_update_classifies_funnel_updates():
+    payment = SuccessfulPayment(
+        currency="RUB",
+        total_amount=39000,
+        invoice_payload="order",
+        telegram_payment_charge_id="t",
+        provider_payment_charge_id="p",
+    )
+    message = Message(
+        message_id=1,
+        date=dt.datetime.now(),
+        chat=Chat(id=7, type="private"),
+        from_user=USER,
+        successful_payment=payment,
+    )
+    checkout = PreCheckoutQuery(id="q", from_user=USER, currency="RUB", total_amount=39000, invoice_payload="order")
+
+    assert events.step_for_update(_callback_update("mode:month")) == "mode"
+    assert events.step_for_update(_callback_update("m-sign:2026-10:leo")) == "sign"
+    assert events.step_for_update(_callback_update("pay:month:2026-10:leo")) == "pay"
+    assert events.step_for_update(_callback_update("admin:menu")) is None
+    assert events.step_for_update(Update(update_id=2, pre_checkout_query=checkout)) == "checkout"
+    assert events.step_for_update(Update(update_id=3, message=message)) == "payment"
+
+
+def test_flush_writes_events_and_hourly_counters(tmp_path):
+    db_path = tmp_path / "db.sqlite3"
+    now = dt.datetime(2026, 10, 1, 12, 30)
+
+    async def scenario():
+        await db.init_db(db_path)
+        events.setup_events(db_path)
+        try:
+            for user_id in (1, 2, 3, 4):
+                events.record(user_id, "mode", now=now)
+            for user_id in (1, 2):
+                events.record(user_id, "pay", now=now)
+            events.record(1, "payment", now=now + dt.timedelta(hours=1))
+            events.record(None, "pay", now=now)
+            written = await events.flush()
+            report = await events.funnel(db_path, now - dt.timedelta(hours=1), now + dt.timedelta(hours=1))
+            async with aiosqlite.connect(db_path) as conn:
+                async with conn.execute("SELECT COUNT(*) FROM events") as cursor:
+                    rows = (await cursor.fetchone())[0]
+                async with conn.execute("SELECT hour, step, events FROM event_hourly ORDER BY hour, step") as cursor:
+                    hourly = await cursor.fetchall()
+            return written, report, rows, hourly, events.pending()
+        finally:
+            events.setup_events(None)
+
+    written, report, rows, hourly, pending = asyncio.run(scenario())
+
+    assert written == rows == 7
+    assert pending == 0
+    assert hourly == [("2026-10-01T12", "mode", 4), ("2026-10-01T12", "pay", 2), ("2026-10-01T13", "payment", 1)]
+    by_step = {step: (count, share) for step, count, share in report}
+    assert by_step["mode"] == (4, None)
+    assert by_step["year"] == (0, 0.0)
+    assert by_step["pay"] == (2, None)
+    assert by_step["payment"] == (1, None)
+
+
+def test_full_buffer_drops_oldest_events(tmp_path, monkeypatch):
+    monkeypatch.setattr(events, "_buffer", events.deque(maxlen=3))
+    monkeypatch.setattr(events, "_dropped", 0)
+    events.setup_events(tmp_path / "db.sqlite3")
+    try:
+        for user_id in range(1, 6):
+            events.record(user_id, "mode")
+        assert events.pending() == 3
+        assert events._dropped == 2
+        assert [user_id for _, user_id, _ in events._buffer] == [3, 4, 5]
+    finally:
+        events.setup_events(None)
+
+
+def test_failed_flush_requeues_only_what_fits(tmp_path, monkeypatch):
+    monkeypatch.setattr(events, "_buffer", events.deque(maxlen=4))
+    monkeypatch.setattr(events, "_dropped", 0)
+    monkeypatch.setattr(events, "BATCH_SIZE", 3)
+
+    async def failing_write(db_path, batch, buckets):
+        # Events recorded while the write is in flight must survive its failure.
+        events.record(5, "mode")
+        events.record(6, "mode")
+        raise aiosqlite.OperationalError("database is locked")
+
+    monkeypatch.setattr(db, "write_events", failing_write)
+    events.setup_events(tmp_path / "db.sqlite3")
+    try:
+        for user_id in range(1, 5):
+            events._buffer.append(("2026-10-19T10:00:00", user_id, "mode"))
+        written = asyncio.run(events.flush())
+        assert written == 0
+        assert [user_id for _, user_id, _ in events._buffer] == [3, 4, 5, 6]
+        assert events._dropped == 2
+    finally:
+        events.setup_events(None)
@@ -0,0 +1,87 @@
+import asyncio
+import csv
+import gzip
+
+import aiosqlite
+import pytest
+
+from app.services import db, exports
+
+
+def test_export_streams_all_rows_while_a_writer_holds_the_lock(tmp_path):
+    db_path = tmp_path / "db.sqlite3"
+    out_dir = tmp_path / "out"
+    out_dir.mkdir()
+
+    async def scenario():
+        await db.init_db(db_path)
+        async with aiosqlite.connect(db_path) as writer:
+            await writer.executemany(
+                """
+                INSERT INTO orders (id, user_id, product_id, amount_kopeks, currency, status, created_at)
+                VALUES (?, ?, 'month:2026-10:leo', 39000, 'RUB', 'created', '2026-10-01T10:00:00')
+                """,
+                [(f"o{user_id}", user_id) for user_id in range(1, 2501)],
+            )
+            await writer.commit()
+            await writer.execute("BEGIN IMMEDIATE")
+            await writer.execute("UPDATE orders SET status = 'paid'")
+            export = await exports.export_csv(db_path, "orders", out_dir)
+            await writer.commit()
+        return export
+
+    export = asyncio.run(scenario())
+
+    with gzip.open(export.path, "rt", encoding="utf-8-sig", newline="") as handle:
+        rows = list(csv.reader(handle))
+    assert export.rows == 2500
+    assert rows[0] == list(db.EXPORTS["orders"][0])
+    assert [row[1] for row in rows[1:]] == [str(user_id) for user_id in range(1, 2501)]
+    assert {row[5] for row in rows[1:]} == {"created"}
+
+
+def test_failed_export_leaves_no_file(tmp_path, monkeypatch):
+    db_path = tmp_path / "db.sqlite3"
+
+    async def broken(db_path, kind):
+        yield [("r1",) + ("",) * 9]
+        raise aiosqlite.OperationalError("disk I/O error")
+
+    monkeypatch.setattr(db, "iter_export_rows", broken)
+
+    async def scenario():
+        await db.init_db(db_path)
+        with pytest.raises(aiosqlite.OperationalError):
+            await exports.export_csv(db_path, "reviews", tmp_path)
+
+    asyncio.run(scenario())
+
+    assert list(tmp_path.glob("*.csv.gz")) == []
+
+
+def test_user_text_cannot_start_a_formula(tmp_path):
+    db_path = tmp_path / "db.sqlite3"
+
+    async def scenario():
+        await db.init_db(db_path)
+        campaign = await db.create_campaign(db_path, "Title", "Body", 1000, "")
+        await db.create_or_update_campaign_response(
+            db_path,
+            campaign["id"],
+            3,
+            full_name='=HYPERLINK("http://evil","x")',
+            phone="+7 999 123-45-67",
+            raw_text="-1",
+        )
+        return await exports.export_csv(db_path, "responses", tmp_path)
+
+    export = asyncio.run(scenario())
+
+    with gzip.open(export.path, "rt", encoding="utf-8-sig", newline="") as handle:
+        header, row = list(csv.reader(handle))
+    cells = dict(zip(header, row))
+    assert cells["full_name"] == "'=HYPERLINK(\"http://evil\",\"x\")"
+    assert cells["phone"] == "'+7 999 123-45-67"
+    assert cells["raw_text"] == "'-1"
+    assert cells["campaign_title"] == "Title"
+    assert cells["user_id"] == "3"
@@ -0,0 +1,22 @@
+from PIL import Image
+
+from app.services import media
+from app.services.images import optimize_image
+
+
+def test_optimize_image_shrinks_and_keeps_original(tmp_path):
+    sign_dir = tmp_path / "month" / "2026" / "04" / "leo"
+    sign_dir.mkdir(parents=True)
+    path = sign_dir / "leo-1.jpg"
+    Image.effect_noise((3000, 2000), 64).convert("RGB").save(path, format="JPEG", quality=100)
+
+    result = optimize_image(path, quality=80, max_dimension=1280)
+
+    assert result.optimized_bytes < result.original_bytes
+    with Image.open(path) as optimized:
+        assert max(optimized.size) == 1280
+    assert media.original_path(path).stat().st_size == result.original_bytes
+    assert media.find_month_content_paths(tmp_path, "2026-04", "leo") == [path]
+
+    assert media.delete_month_content(tmp_path, "2026-04", "leo")
+    assert not sign_dir.exists()
@@ -0,0 +1,37 @@
+import json
+import logging
+import queue
+
+from app.services.logs import DroppingQueueHandler, JsonFormatter, SamplingFilter
+
+
+def _record(name: str, msg: str, level: int = logging.INFO, args: tuple = ()) -> logging.LogRecord:
+    return logging.LogRecord(name, level, __file__, 1, msg, args, None)
+
+
+def test_sampling_keeps_one_in_n_and_all_warnings():
+    sampler = SamplingFilter({("bulk", "Broadcast sent"): 10})
+
+    kept = [sampler.filter(_record("bulk", "Broadcast sent user_id=%s", args=(i,))) for i in range(25)]
+    other = sampler.filter(_record("bulk", "Broadcast finished"))
+    warning = sampler.filter(_record("bulk", "Broadcast sent", level=logging.WARNING))
+
+    assert kept.count(True) == 3
+    assert other and warning
+
+
+def test_full_queue_drops_without_blocking_and_reports_overflow():
+    log_queue: queue.Queue = queue.Queue(maxsize=2)
+    handler = DroppingQueueHandler(log_queue)
+
+    for index in range(5):
+        handler.handle(_record("app", "line %s", args=(index,)))
+    assert handler.dropped == 3
+
+    log_queue.get_nowait()
+    log_queue.get_nowait()
+    handler.handle(_record("app", "after"))
+
+    notice = JsonFormatter().format(log_queue.get_nowait())
+    assert json.loads(notice)["message"] == "Log queue overflow, dropped=3"
+    assert log_queue.get_nowait().getMessage() == "after"
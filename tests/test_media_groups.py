@@ -0,0 +1,57 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.features.admin.media_groups import MediaGroupCollector
+
+
+def _message(message_id: int, group: str = "album") -> SimpleNamespace:
+    return SimpleNamespace(
+        message_id=message_id,
+        media_group_id=group,
+        chat=SimpleNamespace(id=1),
+        from_user=SimpleNamespace(id=2),
+    )
+
+
+def test_collector_hands_over_each_album_once_in_order():
+    batches: list[list[int]] = []
+
+    async def handler(messages):
+        batches.append([message.message_id for message in messages])
+
+    async def scenario():
+        collector = MediaGroupCollector(delay=0.05)
+        for message_id in (12, 10, 11):
+            collector.add(_message(message_id), handler)
+            await asyncio.sleep(0.01)
+        collector.add(_message(20, group="other"), handler)
+        await asyncio.sleep(0.15)
+
+    asyncio.run(scenario())
+
+    assert sorted(batches) == [[10, 11, 12], [20]]
+
+
+def test_failed_album_upload_is_reported_and_keeps_the_upload_step(monkeypatch):
+    from app import texts
+    from app.features.admin import add_forecast
+
+    answers: list[str] = []
+    cleared: list[bool] = []
+
+    async def answer(text, **kwargs):
+        answers.append(text)
+
+    async def clear():
+        cleared.append(True)
+
+    async def broken_store(*args):
+        raise ValueError("manifest is not valid JSON")
+
+    monkeypatch.setattr(add_forecast, "_store_uploads", broken_store)
+    message = SimpleNamespace(answer=answer)
+
+    asyncio.run(add_forecast._finish_album([message], SimpleNamespace(clear=clear), "year", "2027", None, "leo"))
+
+    assert answers == [texts.admin_save_failed()]
+    assert cleared == []
@@ -0,0 +1,86 @@
+import asyncio
+
+import aiosqlite
+import pytest
+
+from app.services import db, migrations
+
+ALL_VERSIONS = [migration.version for migration in migrations.MIGRATIONS]
+
+
+def test_new_database_gets_every_migration_once(tmp_path):
+    db_path = tmp_path / "db.sqlite3"
+
+    async def scenario():
+        first = await migrations.migrate(db_path)
+        second = await migrations.migrate(db_path)
+        async with aiosqlite.connect(db_path) as conn:
+            versions = await migrations.applied_versions(conn)
+        return first, second, versions
+
+    first, second, versions = asyncio.run(scenario())
+
+    assert first == ALL_VERSIONS
+    assert second == []
+    assert versions == set(ALL_VERSIONS)
+
+
+def test_legacy_database_is_upgraded_and_backfill_resumes(tmp_path, monkeypatch):
+    db_path = tmp_path / "db.sqlite3"
+    monkeypatch.setattr(migrations, "DAILY_SALES_RECOUNT_DAYS", 2)
+    step = migrations._daily_sales_recount
+    calls = []
+
+    async def flaky_step(conn, cursor):
+        calls.append(cursor)
+        if len(calls) == 2:
+            raise aiosqlite.OperationalError("interrupted")
+        return await step(conn, cursor)
+
+    monkeypatch.setattr(
+        migrations,
+        "MIGRATIONS",
+        tuple(
+            migrations.Migration(m.version, m.name, batch=flaky_step, offline=True) if m.batch else m
+            for m in migrations.MIGRATIONS
+        ),
+    )
+
+    async def scenario():
+        async with aiosqlite.connect(db_path) as conn:
+            await conn.execute(db.CREATE_TABLE_SQL)
+            await conn.execute("CREATE TABLE campaigns (id TEXT PRIMARY KEY, title TEXT, body TEXT, price_kopeks INTEGER)")
+            await conn.execute("INSERT INTO campaigns VALUES ('c1', 'Title', 'Body', 1000)")
+            await conn.execute(
+                "CREATE TABLE reviews (id TEXT PRIMARY KEY, order_id TEXT, user_id INTEGER, product_id TEXT, "
+                "status TEXT, text TEXT, created_at TEXT, answered_at TEXT)"
+            )
+            await conn.executemany(
+                """
+                INSERT INTO orders (id, user_id, product_id, amount_kopeks, currency, status, created_at, paid_at)
+                VALUES (?, 1, 'month:2026-10:leo', 1000, 'RUB', 'paid', ?, ?)
+                """,
+                [(f"o{day}", f"2026-10-0{day}T10:00:00", f"2026-10-0{day}T10:00:00") for day in range(1, 6)],
+            )
+            await conn.commit()
+
+        startup = await migrations.migrate(db_path)
+        campaign = await db.get_campaign(db_path, "c1")
+        with pytest.raises(aiosqlite.OperationalError):
+            await migrations.migrate(db_path, offline=True)
+        resumed = await migrations.migrate(db_path, offline=True)
+        async with aiosqlite.connect(db_path) as conn:
+            async with conn.execute("SELECT COUNT(*) FROM migration_progress") as cursor:
+                progress = (await cursor.fetchone())[0]
+            review_columns = await migrations._columns(conn, "reviews")
+        return startup, campaign, resumed, progress, review_columns, await db.fetch_daily_sales(db_path, since="2026-01-01")
+
+    startup, campaign, resumed, progress, review_columns, daily = asyncio.run(scenario())
+
+    assert startup == [version for version in ALL_VERSIONS if version != 11]
+    assert campaign["interest_redirect"] == ""
+    assert {"contact_phone", "contact_username"} <= set(review_columns)
+    assert resumed == [11]
+    assert calls == [None, "2026-10-02", "2026-10-02", "2026-10-04"]
+    assert progress == 0
+    assert [row[0] for row in daily] == [f"2026-10-0{day}" for day in range(1, 6)]
@@ -0,0 +1,139 @@
+import asyncio
+import datetime as dt
+
+import aiosqlite
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError
+from aiogram.methods import SendMessage
+
+from app.services import db, reachability
+from app.services.segments import Segment, compile_segment
+
+NOW = dt.datetime(2026, 5, 1, 12, 0)
+
+
+def _forbidden() -> TelegramForbiddenError:
+    return TelegramForbiddenError(SendMessage(chat_id=1, text="x"), "Forbidden: bot was blocked by the user")
+
+
+async def _paid(db_path, user_id):
+    async with aiosqlite.connect(db_path) as conn:
+        await conn.execute(
+            """
+            INSERT INTO orders (id, user_id, product_id, amount_kopeks, currency, status, created_at, paid_at)
+            VALUES (?, ?, 'month:2026-04:leo', 50000, 'RUB', 'paid', '2026-04-01T00:00:00', '2026-04-01T00:00:00')
+            """,
+            (f"order-{user_id}", user_id),
+        )
+        await conn.commit()
+
+
+def test_unreachable_users_are_skipped_until_reprobe(tmp_path):
+    db_path = tmp_path / "db.sqlite3"
+
+    async def scenario():
+        await db.init_db(db_path)
+        for user_id in (1, 2):
+            await _paid(db_path, user_id)
+        reachability.setup_reachability(db_path)
+        try:
+            assert await reachability.record_failure(1, _forbidden(), now=NOW)
+            assert not await reachability.record_failure(
+                2, TelegramBadRequest(SendMessage(chat_id=2, text="x"), "Bad Request: message is too long"), now=NOW
+            )
+            before_probe = NOW + dt.timedelta(days=6)
+            after_probe = NOW + dt.timedelta(days=8)
+            return {
+                "before": await _segment(db_path, before_probe),
+                "after": await _segment(db_path, after_probe),
+                "counts": await reachability.counts(db_path, after_probe),
+                "second_failure": await _second_failure(db_path),
+                "cleared": await _cleared(db_path),
+            }
+        finally:
+            reachability.setup_reachability(None)
+
+    result = asyncio.run(scenario())
+
+    assert result["before"] == [2]
+    assert result["after"] == [1, 2]
+    assert result["counts"] == (1, 1)
+    assert result["second_failure"] == (2, (NOW + dt.timedelta(days=14)).isoformat())
+    assert result["cleared"] is None
+
+
+async def _segment(db_path, now):
+    sql, params = compile_segment(Segment(), now=now)
+    async with aiosqlite.connect(db_path) as conn:
+        async with conn.execute(f"SELECT user_id FROM ({sql}) ORDER BY user_id", params) as cursor:
+            return [row[0] for row in await cursor.fetchall()]
+
+
+async def _second_failure(db_path):
+    await reachability.record_failure(1, _forbidden(), now=NOW)
+    row = await db.get_user_reachability(db_path, 1)
+    return row["failures"], row["probe_after"]
+
+
+async def _cleared(db_path):
+    await reachability.record_success(1)
+    return await db.get_user_reachability(db_path, 1)
+
+
+def test_reachability_is_seeded_from_blocked_broadcasts(tmp_path):
+    db_path = tmp_path / "db.sqlite3"
+
+    async def scenario():
+        async with aiosqlite.connect(db_path) as conn:
+            await conn.execute(db.CREATE_CAMPAIGN_AUDIENCE_SQL)
+            await conn.executemany(
+                "INSERT INTO campaign_audience (campaign_id, user_id, status, error, updated_at) VALUES (?, ?, ?, ?, ?)",
+                [
+                    ("c1", 7, "failed", "blocked_by_user", "2026-04-01T10:00:00"),
+                    ("c1", 8, "sent", None, "2026-04-01T10:00:00"),
+                ],
+            )
+            await conn.commit()
+        await db.init_db(db_path)
+        seeded = await db.get_user_reachability(db_path, 7)
+        await db.mark_user_reachable(db_path, 7)
+        await db.init_db(db_path)
+        return seeded, await db.get_user_reachability(db_path, 7), await db.get_user_reachability(db_path, 8)
+
+    seeded, after_restart, other = asyncio.run(scenario())
+
+    assert seeded["probe_after"] == "2026-04-08T10:00:00"
+    assert after_restart is None
+    assert other is None
+
+
+def test_success_touches_the_database_only_for_unreachable_users(tmp_path, monkeypatch):
+    db_path = tmp_path / "db.sqlite3"
+    cleared = []
+    mark_user_reachable = db.mark_user_reachable
+
+    async def tracking(path, user_id):
+        cleared.append(user_id)
+        return await mark_user_reachable(path, user_id)
+
+    monkeypatch.setattr(db, "mark_user_reachable", tracking)
+
+    async def scenario():
+        await db.init_db(db_path)
+        reachability.setup_reachability(db_path)
+        try:
+            await reachability.record_failure(1, _forbidden(), now=NOW)
+            for user_id in (1, 2, 3, 1):
+                await reachability.record_success(user_id)
+            # Another worker process marks user 4 unreachable; it is picked up on reload.
+            await db.mark_user_unreachable(db_path, 4, "blocked_by_user", failures=1, probe_after=NOW.isoformat())
+            await reachability.record_success(4)
+            monkeypatch.setattr(reachability, "RELOAD_SECONDS", 0)
+            await reachability.record_success(4)
+            return await db.get_user_reachability(db_path, 4)
+        finally:
+            reachability.setup_reachability(None)
+
+    remaining = asyncio.run(scenario())
+
+    assert cleared == [1, 4]
+    assert remaining is None
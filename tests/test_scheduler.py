@@ -0,0 +1,154 @@
+import asyncio
+import datetime as dt
+from types import SimpleNamespace
+from zoneinfo import ZoneInfo
+
+import aiosqlite
+
+from app.config import Settings
+from app.services import broadcasts, db, scheduler, segments
+
+MOSCOW = ZoneInfo("Europe/Moscow")
+
+
+class RecordingBot:
+    def __init__(self) -> None:
+        self.sent: list[tuple[int, str]] = []
+
+    async def send_message(self, chat_id: int, text: str, **kwargs):
+        self.sent.append((chat_id, text))
+        return SimpleNamespace(message_id=len(self.sent))
+
+
+def test_parse_schedule_accepts_one_off_and_monthly():
+    now = dt.datetime(2026, 10, 19, 9, 0)
+
+    once = scheduler.parse_schedule("25.11.2026  10:00", MOSCOW, now)
+    monthly = scheduler.parse_schedule("Ежемесячно 25 10:00", MOSCOW, now)
+
+    assert once == scheduler.ScheduleSpec("once", dt.datetime(2026, 11, 25, 7, 0))
+    assert monthly == scheduler.ScheduleSpec("monthly", dt.datetime(2026, 10, 25, 7, 0), 25, "10:00")
+    assert scheduler.parse_schedule("01.01.2020 10:00", MOSCOW, now) is None
+    assert scheduler.parse_schedule("31.02.2027 10:00", MOSCOW, now) is None
+    assert scheduler.parse_schedule("завтра", MOSCOW, now) is None
+
+
+def test_next_monthly_run_clamps_to_month_end():
+    after = dt.datetime(2027, 1, 31, 8, 0)
+
+    assert scheduler.next_monthly_run(31, "10:00", MOSCOW, after) == dt.datetime(2027, 2, 28, 7, 0)
+
+
+def test_due_schedule_is_launched_once_and_moves_to_next_month(tmp_path):
+    db_path = tmp_path / "db.sqlite3"
+    settings = Settings(BOT_TOKEN="test", PROVIDER_TOKEN="test", DB_PATH=db_path)
+    bot = RecordingBot()
+    now = dt.datetime(2026, 10, 25, 7, 5)
+
+    async def scenario():
+        await db.init_db(db_path)
+        async with aiosqlite.connect(db_path) as conn:
+            await conn.executemany(
+                """
+                INSERT INTO orders (id, user_id, product_id, amount_kopeks, currency, status, created_at, paid_at)
+                VALUES (?, ?, 'month:2026-10:leo', 39000, 'RUB', 'paid', '2026-10-01T00:00:00', '2026-10-01T00:00:00')
+                """,
+                [("o1", 11), ("o2", 12)],
+            )
+            await conn.commit()
+        campaign = await db.create_campaign(db_path, "Promo", "Прогноз на {next_month}", 0, "")
+        await db.upsert_campaign_schedule(
+            db_path,
+            campaign["id"],
+            segment="all",
+            repeat="monthly",
+            run_at="2026-10-25T07:00:00",
+            spread_seconds=0,
+            day_of_month=25,
+            time_of_day="10:00",
+        )
+        first, second = await asyncio.gather(
+            scheduler.run_due(bot, settings, now),
+            scheduler.run_due(bot, settings, now),
+        )
+        await asyncio.gather(*first, *second)
+        return len(first) + len(second), await db.get_campaign_schedule(db_path, campaign["id"])
+
+    started, schedule = asyncio.run(scenario())
+
+    assert started == 1
+    assert sorted(chat_id for chat_id, _ in bot.sent) == [11, 12]
+    assert {text for _, text in bot.sent} == {"Прогноз на Ноябрь 2026"}
+    assert schedule["run_at"] == "2026-11-25T07:00:00"
+    assert schedule["last_run_at"]
+
+
+def test_interrupted_run_is_resumed_without_messaging_anyone_twice(tmp_path):
+    db_path = tmp_path / "db.sqlite3"
+    settings = Settings(BOT_TOKEN="test", PROVIDER_TOKEN="test", DB_PATH=db_path)
+    bot = RecordingBot()
+
+    async def scenario():
+        await db.init_db(db_path)
+        async with aiosqlite.connect(db_path) as conn:
+            await conn.executemany(
+                """
+                INSERT INTO orders (id, user_id, product_id, amount_kopeks, currency, status, created_at, paid_at)
+                VALUES (?, ?, 'month:2026-10:leo', 39000, 'RUB', 'paid', '2026-10-01T00:00:00', '2026-10-01T00:00:00')
+                """,
+                [("o1", 11), ("o2", 12), ("o3", 13)],
+            )
+            await conn.commit()
+        campaign = await db.create_campaign(db_path, "Promo", "Body", 0, "")
+        await db.upsert_campaign_schedule(
+            db_path, campaign["id"], segment="all", repeat="once", run_at="2026-10-25T07:00:00", spread_seconds=0
+        )
+        # A previous process claimed the run and reached user 11 before it was stopped.
+        started_at = await db.claim_campaign_schedule(db_path, campaign["id"], "2026-10-25T07:00:00", None)
+        await broadcasts.prepare(db_path, campaign["id"], segments.Segment(), launch_id=started_at)
+        await db.update_campaign_audience_status(db_path, campaign["id"], 11, "sent", message_id=1)
+        await asyncio.gather(*await scheduler.resume_unfinished(bot, settings))
+        return await db.fetch_running_campaign_schedules(db_path)
+
+    running = asyncio.run(scenario())
+
+    assert sorted(chat_id for chat_id, _ in bot.sent) == [12, 13]
+    assert running == []
+
+
+def test_second_launch_messages_only_its_own_segment(tmp_path):
+    db_path = tmp_path / "db.sqlite3"
+    bot = RecordingBot()
+
+    async def launch(campaign, segment):
+        launch_id, total = await broadcasts.prepare(db_path, campaign["id"], segment)
+        await broadcasts.send_campaign(bot, db_path, campaign, launch_id=launch_id, total=total, delay_seconds=0)
+        return total
+
+    async def scenario():
+        await db.init_db(db_path)
+        async with aiosqlite.connect(db_path) as conn:
+            await conn.executemany(
+                """
+                INSERT INTO orders (id, user_id, product_id, amount_kopeks, currency, status, created_at, paid_at)
+                VALUES (?, ?, ?, 39000, 'RUB', 'paid', '2026-10-01T00:00:00', '2026-10-01T00:00:00')
+                """,
+                [("o1", 11, "month:2026-10:leo"), ("o2", 12, "month:2026-10:leo"), ("o3", 21, "year:2026:leo")],
+            )
+            await conn.commit()
+        campaign = await db.create_campaign(db_path, "Promo", "Body", 0, "")
+        first = await launch(campaign, segments.Segment(kind="month"))
+        await db.update_campaign_audience_status(db_path, campaign["id"], 12, "declined")
+        second = await launch(campaign, segments.Segment(kind="year"))
+        third = await launch(campaign, segments.Segment(kind="month"))
+        return first, second, third
+
+    totals = asyncio.run(scenario())
+
+    assert totals == (2, 1, 1)
+    assert [chat_id for chat_id, _ in bot.sent] == [11, 12, 21, 11]
+
+
+def test_estimated_duration_is_stretched_by_the_minimum_delay():
+    assert broadcasts.estimated_duration(100, 3600) == dt.timedelta(hours=1)
+    assert broadcasts.estimated_duration(10_000, 3600) == dt.timedelta(seconds=5000)
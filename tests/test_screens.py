@@ -0,0 +1,62 @@
+import datetime as dt
+import json
+import os
+
+from app.features.user.buy_forecast.screens import ScreenCache
+from app.services import media
+from app.services.pricing import next_price_change
+
+
+def _write_pricing(path, month_kopeks: int, *, mtime_ns: int, rules=None) -> None:
+    path.write_text(
+        json.dumps(
+            {
+                "timezone": "Europe/Moscow",
+                "prices": {
+                    "month": {"default_kopeks": month_kopeks, "rules": rules or []},
+                    "year": {"default_kopeks": 99000, "rules": []},
+                },
+            }
+        ),
+        encoding="utf-8",
+    )
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_screens_follow_catalog_and_pricing_changes(tmp_path):
+    media_dir = tmp_path / "media"
+    (media_dir / "month" / "2026" / "04").mkdir(parents=True)
+    (media_dir / "month" / "2026" / "04" / "leo.jpg").write_bytes(b"x")
+    pricing_path = tmp_path / "pricing.json"
+    _write_pricing(pricing_path, 39000, mtime_ns=1_000_000_000)
+    cache = ScreenCache(media_dir, pricing_path)
+
+    price = cache.month_price("2026-04", "leo")
+    assert "390 ₽" in price.text
+    assert cache.month_price("2026-04", "leo") is price
+    assert cache.month_price("2026-04", "aries") is None
+
+    signs = cache.month_signs("2026-04")
+    _write_pricing(pricing_path, 49000, mtime_ns=2_000_000_000)
+    assert "490 ₽" in cache.month_price("2026-04", "leo").text
+    assert cache.month_signs("2026-04") is signs
+
+    (media_dir / "month" / "2026" / "04" / "aries.jpg").write_bytes(b"x")
+    media.invalidate_catalog(media_dir)
+    callbacks = [button.callback_data for row in cache.month_signs("2026-04").reply_markup.inline_keyboard for button in row]
+    assert callbacks == ["m-sign:2026-04:aries", "m-sign:2026-04:leo", "back:m-months:2026"]
+
+
+def test_next_price_change_is_the_nearest_rule_boundary(tmp_path):
+    pricing_path = tmp_path / "pricing.json"
+    rules = [{"type": "window", "start": "2026-06-10 21:00", "end": "2026-06-11 09:00", "price_kopeks": 1}]
+    _write_pricing(pricing_path, 39000, mtime_ns=1_000_000_000, rules=rules)
+    msk = dt.timezone(dt.timedelta(hours=3))
+
+    before = next_price_change(pricing_path, now=dt.datetime(2026, 6, 1, tzinfo=msk))
+    during = next_price_change(pricing_path, now=dt.datetime(2026, 6, 10, 22, 0, tzinfo=msk))
+    after = next_price_change(pricing_path, now=dt.datetime(2026, 6, 12, tzinfo=msk))
+
+    assert before == dt.datetime(2026, 6, 10, 21, 0, tzinfo=msk)
+    assert during == dt.datetime(2026, 6, 11, 9, 0, tzinfo=msk)
+    assert after is None
@@ -0,0 +1,98 @@
+import asyncio
+
+import aiosqlite
+
+from app.services import db, migrations, search
+
+
+async def _review(db_path, user_id: int, text: str) -> str:
+    order = await db.create_order(db_path, user_id, "month:2026-10:leo", 39000, "RUB")
+    await db.create_review_request(db_path, order["id"], user_id, "month:2026-10:leo")
+    await db.mark_review_submitted(db_path, order["id"], text)
+    return order["id"]
+
+
+def test_build_match_keeps_only_word_prefixes():
+    assert search.build_match('Иван "7999" OR NEAR(') == '"иван"* "7999"* "or"* "near"*'
+    assert search.build_match("  ;; ") is None
+    assert search.snippet_html(f"a<b> {db.SNIPPET_OPEN}x{db.SNIPPET_CLOSE}") == "a&lt;b&gt; <b>x</b>"
+
+
+def test_find_ranks_reviews_and_responses_and_follows_changes(tmp_path, monkeypatch):
+    db_path = tmp_path / "db.sqlite3"
+    monkeypatch.setattr(search, "PAGE_SIZE", 2)
+
+    async def scenario():
+        await db.init_db(db_path)
+        await _review(db_path, 1, "Очень точный прогноз, спасибо")
+        await _review(db_path, 2, "Прогноз прогноз прогноз")
+        campaign = await db.create_campaign(db_path, "Title", "Body", 1000, "")
+        await db.create_or_update_campaign_response(
+            db_path, campaign["id"], 3, full_name="Иванова Мария", phone="+7 999 123-45-67", raw_text="Хочу прогноз"
+        )
+        first, first_next = await search.find(db_path, "прогноз", 1)
+        second, second_next = await search.find(db_path, "прогноз", 2)
+        by_phone, _ = await search.find(db_path, "999 иван", 1)
+        await db.create_or_update_campaign_response(db_path, campaign["id"], 3, full_name="Петрова Мария")
+        renamed, _ = await search.find(db_path, "петров", 1)
+        old_name, _ = await search.find(db_path, "иванова", 1)
+        await db.delete_campaign(db_path, campaign["id"])
+        deleted, _ = await search.find(db_path, "петров", 1)
+        return first, first_next, second, second_next, by_phone, renamed, old_name, deleted
+
+    first, first_next, second, second_next, by_phone, renamed, old_name, deleted = asyncio.run(scenario())
+
+    assert [hit["user_id"] for hit in first] == [2, 3]
+    assert first_next is True
+    assert [hit["user_id"] for hit in second] == [1]
+    assert second_next is False
+    assert [(hit["source"], hit["user_id"]) for hit in by_phone] == [("response", 3)]
+    assert [hit["user_id"] for hit in renamed] == [3]
+    assert old_name == []
+    assert deleted == []
+
+
+def test_search_migration_indexes_existing_rows(tmp_path):
+    db_path = tmp_path / "db.sqlite3"
+
+    async def scenario():
+        await db.init_db(db_path)
+        async with aiosqlite.connect(db_path) as conn:
+            for name in ("reviews_fts_ai", "reviews_fts_ad", "reviews_fts_au"):
+                await conn.execute(f"DROP TRIGGER {name}")
+            await conn.execute("DROP TABLE reviews_fts")
+            await conn.execute("DELETE FROM schema_version WHERE version = 9")
+            await conn.commit()
+        await _review(db_path, 1, "Старый отзыв до индекса")
+        applied = await migrations.migrate(db_path)
+        hits, _ = await search.find(db_path, "старый", 1)
+        return applied, hits
+
+    applied, hits = asyncio.run(scenario())
+
+    assert applied == [9]
+    assert [hit["user_id"] for hit in hits] == [1]
+
+
+def test_matches_older_than_the_rank_window_follow_by_date(tmp_path, monkeypatch):
+    db_path = tmp_path / "db.sqlite3"
+    monkeypatch.setattr(db, "SEARCH_RANK_WINDOW", 2)
+    monkeypatch.setattr(search, "PAGE_SIZE", 3)
+
+    async def scenario():
+        await db.init_db(db_path)
+        await _review(db_path, 1, "Прогноз прогноз прогноз")
+        await _review(db_path, 2, "Прогноз сбылся, прогноз точный")
+        await _review(db_path, 3, "Хороший прогноз и подробный разбор")
+        await _review(db_path, 4, "Прогноз пришёл вовремя")
+        first, first_next = await search.find(db_path, "прогноз", 1)
+        second, second_next = await search.find(db_path, "прогноз", 2)
+        return first, first_next, second, second_next
+
+    first, first_next, second, second_next = asyncio.run(scenario())
+
+    # Users 3 and 4 are the ranked window; 1 would outrank both but is older.
+    assert [hit["user_id"] for hit in first] == [4, 3, 2]
+    assert first_next is True
+    assert [hit["user_id"] for hit in second] == [1]
+    assert second_next is False
@@ -0,0 +1,94 @@
+import asyncio
+import datetime as dt
+
+import aiosqlite
+import pytest
+
+from app.services import db
+from app.services.segments import Segment, compile_segment
+
+
+async def _seed(db_path):
+    await db.init_db(db_path)
+    rows = [
+        ("o1", 1, "month:2026-04:leo", 50000, "paid", "2026-04-02T10:00:00"),
+        ("o2", 1, "year:2026:leo", 90000, "paid", "2026-01-10T10:00:00"),
+        ("o3", 2, "month:2026-04:aries", 50000, "paid", "2026-04-05T10:00:00"),
+        ("o4", 3, "year:2026:aries", 90000, "paid", "2025-12-31T10:00:00"),
+        ("o5", 4, "month:2026-04:leo", 50000, "created", None),
+    ]
+    async with aiosqlite.connect(db_path) as conn:
+        await conn.executemany(
+            """
+            INSERT INTO orders (id, user_id, product_id, amount_kopeks, currency, status, created_at, paid_at)
+            VALUES (?, ?, ?, ?, 'RUB', ?, '2026-01-01T00:00:00', ?)
+            """,
+            rows,
+        )
+        for user_id in (1, 2, 3, 4, 5):
+            await conn.execute(
+                "INSERT INTO users (user_id, state, created_at, updated_at) VALUES (?, 'idle', '', '')",
+                (user_id,),
+            )
+        await conn.commit()
+    await db.mark_user_unreachable(db_path, 3, "blocked_by_user", failures=1, probe_after="2999-01-01T00:00:00")
+
+
+async def _ids(db_path, segment):
+    sql, params = compile_segment(segment)
+    async with aiosqlite.connect(db_path) as conn:
+        async with conn.execute(f"SELECT user_id FROM ({sql}) ORDER BY user_id", params) as cursor:
+            return [row[0] for row in await cursor.fetchall()]
+
+
+def test_segments_compile_filters_into_sql(tmp_path):
+    db_path = tmp_path / "db.sqlite3"
+
+    async def scenario():
+        await _seed(db_path)
+        return {
+            "all": await _ids(db_path, Segment()),
+            "all_with_blocked": await _ids(db_path, Segment(exclude_unreachable=False)),
+            "month": await _ids(db_path, Segment(kind="month")),
+            "product": await _ids(db_path, Segment(product_id="year:2026:leo")),
+            "range": await _ids(db_path, Segment(paid_from=dt.datetime(2026, 4, 1), paid_to=dt.datetime(2026, 4, 3))),
+            "spend": await _ids(db_path, Segment(min_spend_kopeks=100000)),
+            "never": await _ids(db_path, Segment(never_bought=True)),
+            "count": await db.count_segment(db_path, Segment()),
+        }
+
+    result = asyncio.run(scenario())
+
+    assert result["all"] == [1, 2]
+    assert result["all_with_blocked"] == [1, 2, 3]
+    assert result["month"] == [1, 2]
+    assert result["product"] == [1]
+    assert result["range"] == [1]
+    assert result["spend"] == [1]
+    assert result["never"] == [4, 5]
+    assert result["count"] == 2
+
+
+def test_segment_audience_is_inserted_and_streamed(tmp_path):
+    db_path = tmp_path / "db.sqlite3"
+
+    async def scenario():
+        await _seed(db_path)
+        campaign = await db.create_campaign(db_path, "New", "Body", 0, "")
+        added = await db.add_segment_to_campaign_audience(db_path, campaign["id"], Segment(never_bought=True), "l1")
+        await db.update_campaign_audience_status(db_path, campaign["id"], 5, "declined")
+        rows = [
+            row["user_id"]
+            async for row in db.iter_campaign_audience(db_path, campaign["id"], launch_id="l1", batch_size=1)
+        ]
+        return added, rows
+
+    added, rows = asyncio.run(scenario())
+
+    assert added == 2
+    assert rows == [4]
+
+
+def test_never_bought_rejects_purchase_filters():
+    with pytest.raises(ValueError):
+        compile_segment(Segment(never_bought=True, kind="month"))
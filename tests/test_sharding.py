@@ -0,0 +1,37 @@
+import asyncio
+
+from app.services.sharding import KeyedSerializer, extract_user_id, shard_for
+
+
+def test_shard_key_uses_acting_user():
+    message = {"update_id": 1, "message": {"from": {"id": 17}, "chat": {"id": 17}, "text": "/start"}}
+    callback = {"update_id": 2, "callback_query": {"id": "q", "from": {"id": 17}, "data": "mode:month"}}
+    poll_answer = {"update_id": 3, "poll_answer": {"user": {"id": 5}, "poll_id": "p"}}
+
+    assert extract_user_id(message) == 17
+    assert shard_for(message, 4) == shard_for(callback, 4) == 1
+    assert extract_user_id(poll_answer) == 5
+    assert shard_for({"update_id": 4}, 4) == 0
+
+
+def test_keyed_serializer_keeps_per_user_order():
+    async def scenario():
+        serializer = KeyedSerializer()
+        seen: list[tuple[int, int]] = []
+
+        async def step(user_id: int, index: int, delay: float):
+            await asyncio.sleep(delay)
+            seen.append((user_id, index))
+
+        tasks = [
+            asyncio.create_task(serializer.run(1, lambda: step(1, 0, 0.03))),
+            asyncio.create_task(serializer.run(2, lambda: step(2, 0, 0.0))),
+            asyncio.create_task(serializer.run(1, lambda: step(1, 1, 0.0))),
+        ]
+        await asyncio.gather(*tasks)
+        return seen, len(serializer)
+
+    seen, remaining = asyncio.run(scenario())
+
+    assert seen == [(2, 0), (1, 0), (1, 1)]
+    assert remaining == 0
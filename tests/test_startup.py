@@ -0,0 +1,56 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from app.features.admin.handlers import LAZY_FEATURE_MODULES
+from app.services.startup import parse_importtime
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+# Generous default so slow CI machines pass; tighten locally with STARTUP_BUDGET_SECONDS.
+STARTUP_BUDGET_SECONDS = float(os.getenv("STARTUP_BUDGET_SECONDS", "8"))
+
+_COLD_START_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from app.config import Settings
+from app.dispatcher import build_dispatcher
+build_dispatcher(Settings(BOT_TOKEN="test", PROVIDER_TOKEN="test", ADMIN_IDS="1"))
+elapsed = time.perf_counter() - started
+print(json.dumps({"elapsed": elapsed, "loaded": [m for m in %r if m in sys.modules]}))
+"""
+
+
+def test_cold_start_is_within_budget_and_skips_admin_features(tmp_path):
+    env = dict(os.environ, DB_PATH=str(tmp_path / "bot.sqlite3"))
+    result = subprocess.run(
+        [sys.executable, "-c", _COLD_START_SCRIPT % (LAZY_FEATURE_MODULES,)],
+        cwd=PROJECT_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    report = json.loads(result.stdout.strip().splitlines()[-1])
+
+    assert report["loaded"] == []
+    assert report["elapsed"] < STARTUP_BUDGET_SECONDS
+
+
+def test_parse_importtime_nests_children_under_parent():
+    output = "\n".join(
+        [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       100 |        100 |     child_a",
+            "import time:        50 |         50 |       grandchild",
+            "import time:        20 |         70 |     child_b",
+            "import time:        30 |        200 |   parent",
+        ]
+    )
+
+    roots = parse_importtime(output)
+
+    assert [node.name for node in roots] == ["parent"]
+    assert [child.name for child in roots[0].children] == ["child_a", "child_b"]
+    assert [node.name for node in roots[0].children[1].children] == ["grandchild"]
@@ -0,0 +1,50 @@
+import asyncio
+import datetime as dt
+
+import aiosqlite
+
+from app.services import db, state_machine, sweeper
+from app.services.state_machine import UserState
+
+
+def test_sweep_expires_orders_resets_users_and_clears_promocode_uses(tmp_path, monkeypatch):
+    db_path = tmp_path / "db.sqlite3"
+    monkeypatch.setattr(sweeper, "BATCH_SIZE", 2)
+
+    async def scenario():
+        await db.init_db(db_path)
+        stale = []
+        for user_id in (1, 2, 3):
+            order = await db.create_order(db_path, user_id, "month:2026-10:leo", 39000, "RUB")
+            await state_machine.set_order_initiated(db_path, user_id, order["id"])
+            await state_machine.set_payment_pending(db_path, user_id, order["id"])
+            await db.mark_invoice_sent(db_path, order["id"])
+            await db.create_promocode_use(db_path, order["id"], user_id, "pending")
+            stale.append(order["id"])
+        paid = await db.create_order(db_path, 4, "month:2026-10:leo", 39000, "RUB")
+        await db.create_promocode_use(db_path, paid["id"], 4, "pending")
+        await db.mark_paid(db_path, paid["id"], "charge-4")
+
+        later = dt.datetime.utcnow() + dt.timedelta(hours=2)
+        # A fresh order from user 5 must survive the sweep.
+        fresh = await db.create_order(db_path, 5, "month:2026-10:leo", 39000, "RUB")
+        async with aiosqlite.connect(db_path) as conn:
+            await conn.execute("UPDATE orders SET created_at = ? WHERE id = ?", (later.isoformat(), fresh["id"]))
+            await conn.commit()
+
+        result = await sweeper.sweep(db_path, dt.timedelta(hours=1), now=later)
+        again = await sweeper.sweep(db_path, dt.timedelta(hours=1), now=later)
+        statuses = {order_id: (await db.get_order(db_path, order_id))["status"] for order_id in stale}
+        states = [await state_machine.get_user_state(db_path, user_id) for user_id in (1, 2, 3)]
+        uses = [await db.get_promocode_use(db_path, order_id) for order_id in (*stale, paid["id"])]
+        return result, again, statuses, states, uses, (await db.get_order(db_path, fresh["id"]))["status"]
+
+    result, again, statuses, states, uses, fresh_status = asyncio.run(scenario())
+
+    assert result == sweeper.SweepResult(expired_orders=3, reset_users=3, deleted_promocode_uses=3)
+    assert again == sweeper.SweepResult()
+    assert set(statuses.values()) == {"expired"}
+    assert states == [UserState.IDLE] * 3
+    assert uses[:3] == [None, None, None]
+    assert uses[3] is not None
+    assert fresh_status == "created"